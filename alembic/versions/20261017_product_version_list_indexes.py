@@ -0,0 +1,44 @@
+"""product_record and version_record keyset pagination and keyword search indexes
+
+Revision ID: d0e1f2a3b4c5
+Revises: b3c4d5e6f7a8
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'd0e1f2a3b4c5'
+down_revision: Union[str, None] = 'b3c4d5e6f7a8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+_TRGM_INDEXES = [
+    ("idx_product_record_name_trgm", "product_record", "name"),
+    ("idx_product_record_description_trgm", "product_record", "description"),
+    ("idx_version_record_name_trgm", "version_record", "name"),
+]
+
+
+def upgrade() -> None:
+    op.create_index("idx_product_record_user_created", "product_record", ["create_user_id", "created_at", "id"], unique=False)
+    op.create_index("idx_version_record_user_created", "version_record", ["create_user_id", "created_at", "id"], unique=False)
+    op.create_index("idx_version_record_product_created", "version_record", ["product_id", "created_at", "id"], unique=False)
+
+    # 关键词为 LIKE '%kw%' 包含匹配，B-tree 无法使用；PostgreSQL 上用 pg_trgm GIN 索引加速
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        for index_name, table_name, column in _TRGM_INDEXES:
+            op.create_index(index_name, table_name, [sa.text(f"{column} gin_trgm_ops")], unique=False, postgresql_using="gin")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        for index_name, table_name, _ in reversed(_TRGM_INDEXES):
+            op.drop_index(index_name, table_name=table_name)
+    op.drop_index("idx_version_record_product_created", table_name="version_record")
+    op.drop_index("idx_version_record_user_created", table_name="version_record")
+    op.drop_index("idx_product_record_user_created", table_name="product_record")
@@ -32,12 +32,19 @@ class Settings(BaseSettings):
     auth_jwks_endpoint: str = Field(default="/.well-known/jwks.json", description="JWKS端点", env="AUTH_JWKS_ENDPOINT")
     auth_jwt_config_endpoint: str = Field(default="/jwt-config", description="JWT配置端点", env="AUTH_JWT_CONFIG_ENDPOINT")
     auth_blacklist_endpoint: str = Field(default="/blacklist", description="黑名单端点", env="AUTH_BLACKLIST_ENDPOINT")
+    auth_token_cache_max_entries: int = Field(default=10000, description="已验证令牌缓存条数上限(0表示禁用)", env="AUTH_TOKEN_CACHE_MAX_ENTRIES")
+    auth_refresh_retry_interval: int = Field(default=5, description="JWKS/配置/黑名单后台刷新失败后的重试间隔(秒)", env="AUTH_REFRESH_RETRY_INTERVAL")
     
     # 数据库配置
     db_name: str = Field(default="knowledge_service", description="数据库名称", env="DB_NAME")
     database_type: str = Field(default="postgresql", description="数据库类型: postgresql 或 mysql", env="DATABASE_TYPE")
     db_pool_size: int = Field(default=10, description="连接池大小", env="DB_POOL_SIZE")
     db_max_overflow: int = Field(default=20, description="最大溢出连接数", env="DB_MAX_OVERFLOW")
+    product_entity_cache_enabled: bool = Field(default=True, description="是否启用产品/版本实体缓存", env="PRODUCT_ENTITY_CACHE_ENABLED")
+    product_entity_cache_max_entries: int = Field(default=10000, description="产品/版本实体进程内缓存最大条目数", env="PRODUCT_ENTITY_CACHE_MAX_ENTRIES")
+    product_entity_cache_ttl: int = Field(default=60, description="产品/版本实体缓存有效期(秒)", env="PRODUCT_ENTITY_CACHE_TTL")
+    product_entity_cache_redis: bool = Field(default=False, description="产品/版本实体缓存是否启用Redis共享层", env="PRODUCT_ENTITY_CACHE_REDIS")
+    product_list_count_cache_ttl: int = Field(default=30, description="产品/版本列表总数缓存有效期(秒)，0表示每次精确计数", env="PRODUCT_LIST_COUNT_CACHE_TTL")
     
     # PostgreSQL 配置
     postgresql_host: str = Field(default="localhost", description="PostgreSQL主机地址", env="POSTGRESQL_HOST")
@@ -99,7 +106,13 @@ class Settings(BaseSettings):
     redis_socket_connect_timeout: int = Field(default=5, description="连接超时时间(秒)", env="REDIS_SOCKET_CONNECT_TIMEOUT")
     redis_socket_timeout: int = Field(default=5, description="读写超时时间(秒)", env="REDIS_SOCKET_TIMEOUT")
     redis_retry_on_timeout: bool = Field(default=True, description="超时时是否重试", env="REDIS_RETRY_ON_TIMEOUT")
-    redis_max_connections: int = Field(default=5, description="每个数据库的最大连接数", env="REDIS_MAX_CONNECTIONS")
+    redis_max_connections: int = Field(default=20, description="每个数据库的最大连接数（未单独配置的空间）", env="REDIS_MAX_CONNECTIONS")
+    redis_pool_sizes: str = Field(default="", description="按空间的连接池大小，如 BUSINESS:32,LLM:32", env="REDIS_POOL_SIZES")
+    redis_pool_timeout: float = Field(default=5, description="连接池用尽时等待空闲连接的最长时间(秒)", env="REDIS_POOL_TIMEOUT")
+    redis_client_cache_enabled: bool = Field(default=False, description="是否启用get/hget客户端缓存(服务端辅助失效)", env="REDIS_CLIENT_CACHE_ENABLED")
+    redis_client_cache_max_entries: int = Field(default=10000, description="客户端缓存最大条数", env="REDIS_CLIENT_CACHE_MAX_ENTRIES")
+    redis_client_cache_ttl: int = Field(default=300, description="客户端缓存条目最长存活时间(秒)", env="REDIS_CLIENT_CACHE_TTL")
+    redis_client_cache_prefixes: str = Field(default="", description="客户端缓存跟踪的键前缀(逗号分隔，空表示全部键)", env="REDIS_CLIENT_CACHE_PREFIXES")
 
 
     # =============================================================================
@@ -109,6 +122,19 @@ class Settings(BaseSettings):
     vector_store_engine: str = Field(default="elasticsearch", description="向量存储引擎类型", env="VECTOR_STORE_ENGINE")
     # 向量存储映射文件名称
     vector_store_mapping: str = Field(default="es_doc_mapping.json", description="向量存储映射文件名称", env="VECTOR_STORE_MAPPING")
+    # 检索结果缓存（写操作按空间自动失效）
+    vector_store_search_cache_enabled: bool = Field(default=False, description="是否启用检索结果缓存", env="VECTOR_STORE_SEARCH_CACHE_ENABLED")
+    vector_store_search_cache_max_entries: int = Field(default=1024, description="检索结果进程内缓存最大条目数", env="VECTOR_STORE_SEARCH_CACHE_MAX_ENTRIES")
+    vector_store_search_cache_ttl: int = Field(default=300, description="检索结果缓存有效期(秒)", env="VECTOR_STORE_SEARCH_CACHE_TTL")
+    vector_store_search_cache_redis: bool = Field(default=False, description="检索结果缓存是否启用Redis共享层", env="VECTOR_STORE_SEARCH_CACHE_REDIS")
+    # 查询追踪（采样或慢查询时将分阶段耗时与负载写入滚动文件）
+    vector_store_trace_sample_rate: float = Field(default=0.0, description="向量存储查询追踪采样率(0~1)", env="VECTOR_STORE_TRACE_SAMPLE_RATE")
+    vector_store_trace_slow_ms: float = Field(default=1000, description="向量存储慢查询阈值(毫秒)，0表示不记录慢查询", env="VECTOR_STORE_TRACE_SLOW_MS")
+    vector_store_trace_bulk_slow_ms: float = Field(default=30000, description="向量存储批量写入慢操作阈值(毫秒)，0表示不记录", env="VECTOR_STORE_TRACE_BULK_SLOW_MS")
+    vector_store_trace_result: bool = Field(default=False, description="追踪记录是否包含完整检索结果", env="VECTOR_STORE_TRACE_RESULT")
+    vector_store_trace_file: str = Field(default="logs/vector_store_trace.log", description="向量存储追踪日志文件", env="VECTOR_STORE_TRACE_FILE")
+    vector_store_trace_max_bytes: int = Field(default=50 * 1024 * 1024, description="追踪日志单文件最大字节数", env="VECTOR_STORE_TRACE_MAX_BYTES")
+    vector_store_trace_backup_count: int = Field(default=5, description="追踪日志保留文件数", env="VECTOR_STORE_TRACE_BACKUP_COUNT")
     
     # Elasticsearch配置
     es_hosts: str = Field(default="https://localhost:9200", description="Elasticsearch主机地址", env="ES_HOSTS")
@@ -123,6 +149,35 @@ class Settings(BaseSettings):
     # =============================================================================
     # 模型配置说明 见：app/config/xxx.json
     # =============================================================================
+    # 嵌入结果缓存（按 供应商 + 模型 + 文本哈希 寻址）
+    embedding_cache_enabled: bool = Field(default=True, description="是否启用嵌入结果缓存", env="EMBEDDING_CACHE_ENABLED")
+    embedding_cache_max_bytes: int = Field(default=256 * 1024 * 1024, description="嵌入结果进程内缓存最大字节数", env="EMBEDDING_CACHE_MAX_BYTES")
+    embedding_cache_redis: bool = Field(default=False, description="嵌入结果缓存是否启用Redis持久层", env="EMBEDDING_CACHE_REDIS")
+    embedding_cache_ttl: int = Field(default=7 * 24 * 3600, description="嵌入结果Redis缓存有效期(秒)", env="EMBEDDING_CACHE_TTL")
+    # 嵌入请求微批调度（按 供应商 + 模型 合并并发请求）
+    embedding_batch_max_size: int = Field(default=64, description="嵌入微批最大条数", env="EMBEDDING_BATCH_MAX_SIZE")
+    embedding_batch_max_tokens: int = Field(default=8192, description="嵌入微批最大估算token数", env="EMBEDDING_BATCH_MAX_TOKENS")
+    embedding_batch_max_wait_ms: float = Field(default=5, description="嵌入微批凑批等待窗口(毫秒)", env="EMBEDDING_BATCH_MAX_WAIT_MS")
+    embedding_batch_max_concurrency: int = Field(default=4, description="嵌入微批最大并发批次数", env="EMBEDDING_BATCH_MAX_CONCURRENCY")
+    # 模型实例复用（按 供应商 + 模型 + 密钥 + 生效配置 缓存实例，共享 HTTP 连接池）
+    llm_registry_max_instances: int = Field(default=256, description="每个模型工厂缓存的最大实例数", env="LLM_REGISTRY_MAX_INSTANCES")
+    llm_registry_idle_ttl: int = Field(default=1800, description="模型实例空闲多久后被回收(秒)", env="LLM_REGISTRY_IDLE_TTL")
+    llm_http_max_connections: int = Field(default=100, description="每个模型服务主机的最大HTTP连接数", env="LLM_HTTP_MAX_CONNECTIONS")
+    llm_http_max_keepalive: int = Field(default=20, description="每个模型服务主机保持的空闲HTTP连接数", env="LLM_HTTP_MAX_KEEPALIVE")
+    llm_http_keepalive_expiry: float = Field(default=60, description="空闲HTTP连接保持时间(秒)", env="LLM_HTTP_KEEPALIVE_EXPIRY")
+    llm_http2: bool = Field(default=True, description="是否启用HTTP/2（需安装h2，未安装时自动使用HTTP/1.1）", env="LLM_HTTP2")
+    llm_admission_enabled: bool = Field(default=True, description="是否启用模型调用准入控制（并发上限、限速、熔断）", env="LLM_ADMISSION_ENABLED")
+    llm_admission_queue_timeout: float = Field(default=30, description="模型调用排队等待上限(秒)，配置文件 limits.queue_timeout 可覆盖", env="LLM_ADMISSION_QUEUE_TIMEOUT")
+    llm_breaker_failures: int = Field(default=5, description="连续多少次供应商故障后熔断，0为不熔断", env="LLM_BREAKER_FAILURES")
+    llm_breaker_cooldown: float = Field(default=30, description="熔断后多久放行一次探测请求(秒)", env="LLM_BREAKER_COOLDOWN")
+    llm_response_cache_enabled: bool = Field(default=True, description="是否允许聊天响应缓存（调用时还需传 use_cache=True）", env="LLM_RESPONSE_CACHE_ENABLED")
+    llm_response_cache_max_entries: int = Field(default=2000, description="聊天响应进程内缓存最大条目数", env="LLM_RESPONSE_CACHE_MAX_ENTRIES")
+    llm_response_cache_redis: bool = Field(default=False, description="聊天响应缓存是否启用Redis层", env="LLM_RESPONSE_CACHE_REDIS")
+    llm_response_cache_ttl: int = Field(default=24 * 3600, description="聊天响应Redis缓存有效期(秒)", env="LLM_RESPONSE_CACHE_TTL")
+    llm_semantic_cache_enabled: bool = Field(default=False, description="是否启用聊天响应语义缓存（近似问题复用回答）", env="LLM_SEMANTIC_CACHE_ENABLED")
+    llm_semantic_cache_threshold: float = Field(default=0.95, description="语义缓存命中的最低余弦相似度", env="LLM_SEMANTIC_CACHE_THRESHOLD")
+    llm_semantic_cache_max_entries: int = Field(default=1000, description="语义缓存每个上下文的最大条目数", env="LLM_SEMANTIC_CACHE_MAX_ENTRIES")
+    llm_semantic_cache_embedding_model: str = Field(default="", description="语义缓存使用的嵌入模型，为空时使用默认嵌入模型", env="LLM_SEMANTIC_CACHE_EMBEDDING_MODEL")
     
     class Config:
         env_file = os.path.join(PROJECT_BASE_DIR, "env")
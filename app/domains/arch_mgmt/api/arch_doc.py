@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from fastapi.responses import PlainTextResponse
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.infrastructure.database import get_db
 from app.domains.arch_mgmt.services.arch_doc_service import ArchDocService
@@ -13,10 +13,11 @@ async def get_version_arch_doc(
     user_id: str = Query(..., description="用户ID"),
     db: AsyncSession = Depends(get_db),
 ):
-    """根据当前架构元素生成该版本的完整架构设计 Markdown 文档"""
+    """根据当前架构元素生成该版本的完整架构设计 Markdown 文档（分块流式返回）"""
     try:
-        content = await ArchDocService.build_arch_doc(db, version_id)
-        return content
+        # 数据加载在开始响应前完成，渲染过程边生成边发送
+        chunks = await ArchDocService.stream_arch_doc(db, version_id)
+        return StreamingResponse(chunks, media_type="text/plain; charset=utf-8")
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -3,6 +3,7 @@ from app.domains.arch_mgmt.services.interfaces_service import InterfacesService
 from app.domains.arch_mgmt.services.build_service import BuildService
 from app.domains.arch_mgmt.services.deployment_service import DeploymentService
 from app.domains.arch_mgmt.services.decision_service import DecisionService
+from app.domains.arch_mgmt.services.snapshot_service import ArchSnapshotService, ArchVersionSnapshot
 from app.domains.arch_mgmt.services.arch_doc_service import ArchDocService
 
 
@@ -74,6 +75,9 @@ class ArchMgmtService:
     update_artifact_to_deployment = DeploymentService.update_artifact_to_deployment
     delete_artifact_to_deployment = DeploymentService.delete_artifact_to_deployment
 
+    # 版本快照
+    load_snapshot = ArchSnapshotService.load_snapshot
+
 
 __all__ = [
     "ArchMgmtService",
@@ -82,5 +86,7 @@ __all__ = [
     "BuildService",
     "DeploymentService",
     "DecisionService",
+    "ArchSnapshotService",
+    "ArchVersionSnapshot",
     "ArchDocService",
 ]
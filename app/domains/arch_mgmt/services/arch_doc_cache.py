@@ -0,0 +1,122 @@
+"""
+架构设计文档缓存：基于 Redis 的整篇文档缓存 + 分节缓存
+
+- 整篇文档：key = arch_doc:{version_id}，值为 {fingerprint, content}；
+  fingerprint 由各 arch_mgmt 表在该版本下的行数与 max(updated_at) 计算，一次聚合查询得到，
+  即使有绕过服务层的写入（如版本级联删除），指纹变化也能识别出缓存失效。
+- 分节：key = arch_doc:{version_id}:sections（Hash），field 为章节键，值为 {sig, content}；
+  sig 由该章节实际用到的行的全部列值（及引用的名称）计算，不依赖只精确到秒的 updated_at，
+  整篇失效后只重新渲染 sig 变化的章节。
+- 各服务的写操作提交后调用 ArchDocCache.invalidate(version_id) 主动失效整篇文档。
+"""
+import hashlib
+import json
+from typing import Dict, Optional
+from sqlalchemy import func, literal, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.infrastructure.redis import REDIS_CONN, RedisSpaceEnum
+from app.domains.arch_mgmt.models.architecture import ArchOverview, ArchElement, ArchDependency
+from app.domains.arch_mgmt.models.decision import ArchDecision
+from app.domains.arch_mgmt.models.interfaces import ArchInterface, ArchElementInterface
+from app.domains.arch_mgmt.models.build import ArchBuildArtifact, ArchElementToArtifact, ArchArtifactToArtifact
+from app.domains.arch_mgmt.models.deployment import ArchDeploymentUnit, ArchArtifactToDeployment
+
+
+# 参与文档生成的全部表
+_FINGERPRINT_MODELS = (
+    ArchOverview,
+    ArchElement,
+    ArchDependency,
+    ArchDecision,
+    ArchInterface,
+    ArchElementInterface,
+    ArchBuildArtifact,
+    ArchElementToArtifact,
+    ArchArtifactToArtifact,
+    ArchDeploymentUnit,
+    ArchArtifactToDeployment,
+)
+
+
+def make_signature(*items) -> str:
+    """根据任意可 repr 的数据计算短签名"""
+    return hashlib.sha1(repr(items).encode("utf-8")).hexdigest()
+
+
+class ArchDocCache:
+    """架构设计文档 Redis 缓存"""
+
+    SPACE = RedisSpaceEnum.BUSINESS
+    EXPIRE_SECONDS = 24 * 3600
+
+    @staticmethod
+    def _doc_key(version_id: str) -> str:
+        return f"arch_doc:{version_id}"
+
+    @staticmethod
+    def _sections_key(version_id: str) -> str:
+        return f"arch_doc:{version_id}:sections"
+
+    @staticmethod
+    async def compute_fingerprint(session: AsyncSession, version_id: str) -> str:
+        """单次 UNION ALL 聚合查询各表行数与最近更新时间，生成内容指纹"""
+        queries = [
+            select(
+                literal(model.__tablename__).label("table_name"),
+                func.count(model.id).label("row_count"),
+                func.max(func.coalesce(model.updated_at, model.created_at)).label("last_updated"),
+            ).where(model.version_id == version_id)
+            for model in _FINGERPRINT_MODELS
+        ]
+        result = await session.execute(union_all(*queries))
+        rows = sorted((r.table_name, r.row_count, str(r.last_updated)) for r in result)
+        return make_signature(version_id, rows)
+
+    @staticmethod
+    async def get_document(version_id: str, fingerprint: str) -> Optional[str]:
+        """获取整篇文档缓存，指纹不一致视为未命中"""
+        cached = await REDIS_CONN.get(ArchDocCache._doc_key(version_id), ArchDocCache.SPACE)
+        if not cached:
+            return None
+        try:
+            data = json.loads(cached)
+        except (ValueError, TypeError):
+            return None
+        if data.get("fingerprint") != fingerprint:
+            return None
+        return data.get("content")
+
+    @staticmethod
+    async def set_document(version_id: str, fingerprint: str, content: str) -> bool:
+        return await REDIS_CONN.set_obj(
+            ArchDocCache._doc_key(version_id),
+            {"fingerprint": fingerprint, "content": content},
+            ArchDocCache.EXPIRE_SECONDS,
+            ArchDocCache.SPACE,
+        )
+
+    @staticmethod
+    async def get_sections(version_id: str) -> Dict[str, dict]:
+        """获取分节缓存：章节键 -> {sig, content}"""
+        return await REDIS_CONN.hgetall(ArchDocCache._sections_key(version_id), ArchDocCache.SPACE)
+
+    @staticmethod
+    async def save_sections(version_id: str, changed: Dict[str, dict], stale_keys) -> bool:
+        """写入变化的章节并删除已不存在的章节，单个管道一次往返"""
+        if not changed and not stale_keys:
+            return True
+        key = ArchDocCache._sections_key(version_id)
+        async with REDIS_CONN.batch(ArchDocCache.SPACE) as batch:
+            if stale_keys:
+                batch.hdel(key, *stale_keys)
+            if changed:
+                batch.hset_many(key, changed)
+            batch.expire(key, ArchDocCache.EXPIRE_SECONDS)
+        return batch.errors == 0
+
+    @staticmethod
+    async def invalidate(version_id: Optional[str]) -> None:
+        """写操作后失效整篇文档缓存；分节缓存按列值签名自动判定，无需删除"""
+        if not version_id:
+            return
+        await REDIS_CONN.delete(ArchDocCache._doc_key(version_id), ArchDocCache.SPACE)
@@ -15,16 +15,17 @@
       ## 构建模型：构建产物、元素-产物映射、产物构建关系
   # 部署视图
       部署单元、产物-部署映射
+
+各章节以生成器方式逐段产出，既可拼接为完整字符串，也可通过 stream_arch_doc 以流式响应边生成边发送。
 """
 import re
-from typing import List, Optional
+import logging
+from typing import AsyncIterator, Callable, Dict, Iterable, Iterator, List, NamedTuple
+from sqlalchemy import inspect as sa_inspect
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.domains.arch_mgmt.models.architecture import ArchOverviewSectionKey
-from app.domains.arch_mgmt.services.architecture_service import ArchitectureService
-from app.domains.arch_mgmt.services.interfaces_service import InterfacesService
-from app.domains.arch_mgmt.services.build_service import BuildService
-from app.domains.arch_mgmt.services.deployment_service import DeploymentService
-from app.domains.arch_mgmt.services.decision_service import DecisionService
+from app.domains.arch_mgmt.services.snapshot_service import ArchSnapshotService, ArchVersionSnapshot
+from app.domains.arch_mgmt.services.arch_doc_cache import ArchDocCache, make_signature
 from app.domains.arch_mgmt.schemes.architecture import ArchElementTree
 
 
@@ -40,15 +41,40 @@ def _section_title(section_key: str) -> str:
     return SECTION_KEY_TITLES.get(section_key, section_key.replace("_", " ").title())
 
 
-def _downgrade_headings(content: str) -> str:
+# 匹配 Markdown 标题行：行首的 # 后跟空白和标题文本；[^\S\n] 保证空白不跨行，与逐行匹配语义一致
+_HEADING_PATTERN = re.compile(r'^(\#{1,6})[^\S\n]+(.+)$', re.MULTILINE)
+
+# 命中整篇缓存时按该大小分块发送
+_STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def _iter_downgrade_headings(content: str) -> Iterator[str]:
     """
-    将用户内容中的 Markdown 标题降级，避免与文档结构冲突。
-    
+    流式标题降级：只在标题行处切分，非标题文本按原始切片整段产出，不对全文做 split/join。
+
     文档结构使用到 ####（四级标题），用户内容中的标题统一降级 3 级：
     - #（一级）-> ####（四级）
     - ##（二级）-> #####（五级）
     - ###（三级）-> ######（六级）
     - ####（四级）-> ######（六级，Markdown 最多支持 6 级）
+    """
+    if not content:
+        return
+    pos = 0
+    for match in _HEADING_PATTERN.finditer(content):
+        if match.start() > pos:
+            yield content[pos:match.start()]
+        # 统一降级 3 级，但不超过 6 级（Markdown 最多支持 6 级标题）
+        new_level = min(len(match.group(1)) + 3, 6)
+        yield f"{'#' * new_level} {match.group(2)}"
+        pos = match.end()
+    if pos < len(content):
+        yield content[pos:]
+
+
+def _downgrade_headings(content: str) -> str:
+    """
+    将用户内容中的 Markdown 标题降级，避免与文档结构冲突。
     
     Args:
         content: 用户输入的 Markdown 内容
@@ -58,57 +84,25 @@ def _downgrade_headings(content: str) -> str:
     """
     if not content:
         return content
-    
-    def replace_heading(match):
-        hashes = match.group(1)
-        text = match.group(2)
-        current_level = len(hashes)
-        # 统一降级 3 级，但不超过 6 级（Markdown 最多支持 6 级标题）
-        new_level = min(current_level + 3, 6)
-        return f"{'#' * new_level} {text}"
-    
-    # 匹配 Markdown 标题格式：行首的 # 后跟空格和标题文本
-    pattern = r'^(\#{1,6})\s+(.+)$'
-    lines = content.split('\n')
-    result_lines = []
-    
-    for line in lines:
-        if re.match(pattern, line):
-            result_lines.append(re.sub(pattern, replace_heading, line))
-        else:
-            result_lines.append(line)
-    
-    return '\n'.join(result_lines)
-
+    return "".join(_iter_downgrade_headings(content))
 
-def _flatten_element_tree(nodes: List[ArchElementTree]) -> List[ArchElementTree]:
-    """将元素树按先序遍历压平为列表，便于表格展示。"""
-    out: List[ArchElementTree] = []
-    for n in nodes:
-        out.append(n)
-        out.extend(_flatten_element_tree(n.children or []))
-    return out
 
+def _iter_element_tree(nodes: List[ArchElementTree]) -> Iterator[ArchElementTree]:
+    """按先序遍历逐个产出元素，便于表格展示。"""
+    stack = list(reversed(nodes))
+    while stack:
+        n = stack.pop()
+        yield n
+        stack.extend(reversed(n.children or []))
 
-def _element_parent_map(nodes: List[ArchElementTree], parent_name: Optional[str] = None) -> dict:
-    """返回 element_id -> 父元素名称（根节点无父）。"""
-    m: dict = {}
-    for n in nodes:
-        if parent_name is not None:
-            m[n.id] = parent_name
-        for child in n.children or []:
-            m[child.id] = n.name
-            m.update(_element_parent_map([child], n.name))
-    return m
 
-
-def _render_logical_element_section(
+def _iter_logical_element_section(
     node: ArchElementTree,
     level: int,
     element_provides: dict,
     element_uses: dict,
     interface_names: dict,
-) -> str:
+) -> Iterator[str]:
     """按父子关系渲染单个架构元素章节：提供的接口、调用的接口、职责与定义等。"""
     heading = "#" * (level + 3)
     lines = [f"{heading} {node.name}\n"]
@@ -136,172 +130,350 @@ def _render_logical_element_section(
         for iface_id in uses:
             lines.append(f"- {interface_names.get(iface_id, iface_id)}")
         lines.append("")
+    yield "\n".join(lines)
     for child in node.children or []:
-        lines.append(
-            _render_logical_element_section(child, level + 1, element_provides, element_uses, interface_names)
+        yield "\n"
+        yield from _iter_logical_element_section(child, level + 1, element_provides, element_uses, interface_names)
+
+
+def _row_values(row) -> tuple:
+    """ORM 行的全部列值（updated_at 精度只到秒，同一秒内的修改只能靠列值本身区分）"""
+    return tuple((attr.key, str(getattr(row, attr.key))) for attr in sa_inspect(type(row)).column_attrs)
+
+
+def _row_sig(rows) -> tuple:
+    """行签名：各行全部列值，任一行增删改都会改变签名"""
+    return tuple(_row_values(r) for r in rows)
+
+
+def _escape_cell(text: str) -> str:
+    return text.replace("|", "\\|").replace("\n", " ")
+
+
+def _strip_stream(chunks: Iterable[str]) -> Iterator[str]:
+    """对分块输出做与整体 str.strip() 等价的处理：去掉开头空白，并暂存尾部空白直到后面还有内容"""
+    started = False
+    pending = ""
+    for chunk in chunks:
+        if not started:
+            chunk = chunk.lstrip()
+            if not chunk:
+                continue
+            started = True
+        stripped = chunk.rstrip()
+        if stripped:
+            yield pending + stripped
+            pending = chunk[len(stripped):]
+        else:
+            pending += chunk
+
+
+# ---------- 各章节渲染 ----------
+
+def _iter_header(snapshot: ArchVersionSnapshot) -> Iterator[str]:
+    yield f"架构设计文档\n\n版本 ID: `{snapshot.version_id}`\n\n---\n\n# 总体设计\n"
+
+
+def _iter_overall(snapshot: ArchVersionSnapshot) -> Iterator[str]:
+    overall_section_keys = ("context_and_scope", "solution_strategy", "glossary")
+    overviews_for_overall = [o for o in snapshot.overviews if o.section_key in overall_section_keys]
+    if overviews_for_overall:
+        ordered = sorted(
+            overviews_for_overall,
+            key=lambda o: (ArchOverviewSectionKey.order_for_key(o.section_key), o.section_key),
         )
-    return "\n".join(lines)
+        for o in ordered:
+            title = _section_title(o.section_key)
+            yield f"## {title}\n\n"
+            yield from _iter_downgrade_headings((o.content or "").strip())
+            yield "\n\n"
+    if snapshot.decisions:
+        yield "## 架构决策（ADR）\n\n"
+        for adr in snapshot.decisions:
+            num = f"ADR-{adr.adr_number}" if adr.adr_number is not None else adr.id[:8]
+            yield f"### {num} {adr.title}\n\n"
+            yield f"- **状态**: {adr.status}\n\n"
+            for label, text in (
+                ("背景", adr.context),
+                ("决策", adr.decision),
+                ("后果", adr.consequences),
+                ("备选方案", adr.alternatives_considered),
+            ):
+                if text:
+                    yield f"**{label}**\n\n"
+                    yield from _iter_downgrade_headings(text)
+                    yield "\n\n"
+            yield "\n"
+
+
+def _iter_logical_table(snapshot: ArchVersionSnapshot) -> Iterator[str]:
+    yield "\n---\n\n# 逻辑视图\n"
+    elements_tree = snapshot.elements_tree
+    if elements_tree:
+        parent_map = snapshot.element_parent_names
+        yield "## 逻辑架构\n\n"
+        yield "| 名称 | 类型 | 编码 | 父元素 | 职责 |\n"
+        yield "|------|------|------|--------|------|\n"
+        for n in _iter_element_tree(elements_tree):
+            parent = parent_map.get(n.id, "-")
+            resp = _escape_cell((n.responsibility or "")[:80]) if n.responsibility else "-"
+            yield f"| {n.name} | {n.element_type or '-'} | {n.code or '-'} | {parent} | {resp} |\n"
+        yield "\n"
+
+
+def _iter_logical_element(snapshot: ArchVersionSnapshot, root: ArchElementTree) -> Iterator[str]:
+    yield from _iter_logical_element_section(
+        root, 0, snapshot.element_provides, snapshot.element_uses, snapshot.interface_names
+    )
+    yield "\n"
+
+
+def _iter_dependencies(snapshot: ArchVersionSnapshot) -> Iterator[str]:
+    if not snapshot.dependencies:
+        return
+    element_names = snapshot.element_names
+    yield "### 依赖关系\n\n"
+    yield "| 源元素 | 目标元素 | 类型 | 说明 |\n"
+    yield "|--------|----------|------|------|\n"
+    for d in snapshot.dependencies:
+        src = element_names.get(d.source_element_id, d.source_element_id)
+        tgt = element_names.get(d.target_element_id, d.target_element_id)
+        dtype = d.dependency_type or "-"
+        desc = _escape_cell(d.description or "")
+        yield f"| {src} | {tgt} | {dtype} | {desc} |\n"
+    yield "\n"
+
+
+def _iter_coding_model(snapshot: ArchVersionSnapshot) -> Iterator[str]:
+    yield "\n---\n\n# 实现视图\n"
+    elements_tree = snapshot.elements_tree
+    if elements_tree:
+        yield "## 编码模型\n\n"
+        yield "| 架构元素 | 代码仓 | 技术栈 |\n"
+        yield "|----------|--------|--------|\n"
+        for n in _iter_element_tree(elements_tree):
+            repo = (n.code_repo_url or "-").replace("|", "\\|")
+            tech = _escape_cell(n.tech_stack or "-")
+            yield f"| {n.name} | {repo} | {tech} |\n"
+        yield "\n"
+
+
+def _iter_build_model(snapshot: ArchVersionSnapshot) -> Iterator[str]:
+    build_artifacts = snapshot.build_artifacts
+    element_to_artifacts = snapshot.element_to_artifacts
+    artifact_to_artifacts = snapshot.artifact_to_artifacts
+    if not (build_artifacts or element_to_artifacts or artifact_to_artifacts):
+        return
+    element_names = snapshot.element_names
+    artifact_names = snapshot.artifact_names
+    yield "## 构建模型\n\n"
+    if build_artifacts:
+        yield "**构建产物**\n\n"
+        for a in build_artifacts:
+            yield f"- **{a.name}** ({a.artifact_type})"
+            if a.description:
+                yield f" — {a.description}"
+            yield "\n"
+            if a.build_command:
+                yield f"  - 构建命令: `{a.build_command}`\n"
+            if a.build_environment:
+                yield f"  - 构建环境: {a.build_environment}\n"
+    if element_to_artifacts:
+        yield "\n**元素-产物映射**\n\n"
+        for ea in element_to_artifacts:
+            elem = element_names.get(ea.element_id, ea.element_id)
+            art = artifact_names.get(ea.build_artifact_id, ea.build_artifact_id)
+            yield f"- {elem} → {art}\n"
+    if artifact_to_artifacts:
+        yield "\n**产物构建关系**\n\n"
+        for aa in artifact_to_artifacts:
+            inp = artifact_names.get(aa.input_artifact_id, aa.input_artifact_id)
+            tgt = artifact_names.get(aa.target_artifact_id, aa.target_artifact_id)
+            yield f"- {inp} → {tgt}\n"
+    yield "\n"
+
+
+def _iter_deployment(snapshot: ArchVersionSnapshot) -> Iterator[str]:
+    artifact_names = snapshot.artifact_names
+    unit_names = snapshot.unit_names
+    yield "\n---\n\n# 部署视图\n\n"
+    if snapshot.deployment_units:
+        yield "**部署单元**\n\n"
+        for u in snapshot.deployment_units:
+            yield f"- **{u.name}** ({u.unit_type})"
+            if u.description:
+                yield f" — {u.description}"
+            yield "\n"
+    if snapshot.artifact_to_deployments:
+        yield "\n**产物-部署映射**\n\n"
+        for ad in snapshot.artifact_to_deployments:
+            art = artifact_names.get(ad.build_artifact_id, ad.build_artifact_id)
+            unit = unit_names.get(ad.deployment_unit_id, ad.deployment_unit_id)
+            yield f"- {art} → {unit}\n"
+
+
+def _subtree_sig(snapshot: ArchVersionSnapshot, root: ArchElementTree) -> str:
+    """逻辑元素子章节签名：子树内元素行 + 其接口关系 + 引用接口名称"""
+    element_rows = []
+    element_ids = set()
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        element_rows.append(tuple(sorted((k, str(v)) for k, v in node.model_dump(exclude={"children"}).items())))
+        element_ids.add(node.id)
+        stack.extend(node.children or [])
+    relations = [
+        (ei.id, ei.element_id, ei.interface_id, ei.relation_type)
+        for ei in snapshot.element_interfaces
+        if ei.element_id in element_ids
+    ]
+    interface_names = snapshot.interface_names
+    names = sorted((iid, interface_names.get(iid)) for _, _, iid, _ in relations)
+    return make_signature(element_rows, relations, names)
+
+
+class ArchDocSection(NamedTuple):
+    """文档章节：key 唯一标识章节，sig 为渲染输入签名，chunks 逐段产出该章节 Markdown"""
+    key: str
+    sig: str
+    chunks: Callable[[], Iterator[str]]
+
+    def render(self) -> str:
+        return "".join(self.chunks())
 
 
 class ArchDocService:
     """将架构元素组装为完整架构设计 Markdown 文档"""
 
     @staticmethod
-    async def build_arch_doc(session: AsyncSession, version_id: str) -> str:
-        overviews = await ArchitectureService.list_overviews(session, version_id)
-        elements_tree = await ArchitectureService.get_elements_tree(session, version_id)
-        dependencies = await ArchitectureService.get_dependencies(session, version_id)
-        decisions = await DecisionService.list_decisions(session, version_id)
-        interfaces = await InterfacesService.list_interfaces(session, version_id)
-        element_interfaces = await InterfacesService.list_element_interfaces(session, version_id)
-        build_artifacts = await BuildService.list_build_artifacts(session, version_id)
-        element_to_artifacts = await BuildService.list_element_to_artifacts(session, version_id)
-        artifact_to_artifacts = await BuildService.list_artifact_to_artifacts(session, version_id)
-        deployment_units = await DeploymentService.list_deployment_units(session, version_id)
-        artifact_to_deployments = await DeploymentService.list_artifact_to_deployments(session, version_id)
-
-        element_names = {}
-        if elements_tree:
-            def collect_names(nodes: List[ArchElementTree]) -> None:
-                for n in nodes:
-                    element_names[n.id] = n.name
-                    if n.children:
-                        collect_names(n.children)
-            collect_names(elements_tree)
-
-        interface_names = {i.id: i.name for i in interfaces}
-        artifact_names = {a.id: a.name for a in build_artifacts}
-        unit_names = {u.id: u.name for u in deployment_units}
-
-        element_provides: dict = {}
-        element_uses: dict = {}
-        for ei in element_interfaces:
-            eid = ei.element_id
-            iid = ei.interface_id
-            if ei.relation_type == "provides":
-                element_provides.setdefault(eid, []).append(iid)
-            else:
-                element_uses.setdefault(eid, []).append(iid)
-
-        parent_map: dict = {}
-        if elements_tree:
-            parent_map = _element_parent_map(elements_tree)
-
-        parts = [f"架构设计文档\n\n版本 ID: `{version_id}`\n"]
-
-        # ---------- 总体设计 ----------
-        parts.append("\n---\n\n# 总体设计\n")
-        overall_section_keys = ("context_and_scope", "solution_strategy", "glossary")
-        overviews_for_overall = [o for o in overviews if o.section_key in overall_section_keys]
-        if overviews_for_overall:
-            ordered = sorted(
-                overviews_for_overall,
-                key=lambda o: (ArchOverviewSectionKey.order_for_key(o.section_key), o.section_key),
+    def iter_sections(snapshot: ArchVersionSnapshot) -> Iterator[ArchDocSection]:
+        """按文档顺序产出各章节；签名只覆盖该章节实际用到的数据"""
+        element_names = sorted(snapshot.element_names.items())
+        artifact_names = sorted(snapshot.artifact_names.items())
+
+        yield ArchDocSection("header", make_signature(snapshot.version_id), lambda: _iter_header(snapshot))
+        yield ArchDocSection(
+            "overall",
+            make_signature(_row_sig(snapshot.overviews), _row_sig(snapshot.decisions)),
+            lambda: _iter_overall(snapshot),
+        )
+        yield ArchDocSection(
+            "logical_table", make_signature(_row_sig(snapshot.elements)), lambda: _iter_logical_table(snapshot)
+        )
+        for root in snapshot.elements_tree:
+            yield ArchDocSection(
+                f"logical_element:{root.id}",
+                _subtree_sig(snapshot, root),
+                lambda root=root: _iter_logical_element(snapshot, root),
             )
-            for o in ordered:
-                title = _section_title(o.section_key)
-                parts.append(f"## {title}\n\n")
-                content = _downgrade_headings((o.content or "").strip())
-                parts.append(content)
-                parts.append("\n\n")
-        if decisions:
-            parts.append("## 架构决策（ADR）\n\n")
-            for adr in decisions:
-                num = f"ADR-{adr.adr_number}" if adr.adr_number is not None else adr.id[:8]
-                parts.append(f"### {num} {adr.title}\n\n")
-                parts.append(f"- **状态**: {adr.status}\n\n")
-                if adr.context:
-                    parts.append(f"**背景**\n\n{_downgrade_headings(adr.context)}\n\n")
-                if adr.decision:
-                    parts.append(f"**决策**\n\n{_downgrade_headings(adr.decision)}\n\n")
-                if adr.consequences:
-                    parts.append(f"**后果**\n\n{_downgrade_headings(adr.consequences)}\n\n")
-                if adr.alternatives_considered:
-                    parts.append(f"**备选方案**\n\n{_downgrade_headings(adr.alternatives_considered)}\n\n")
-                parts.append("\n")
-
-        # ---------- 逻辑视图 ----------
-        parts.append("\n---\n\n# 逻辑视图\n")
-        if elements_tree:
-            parts.append("## 逻辑架构\n\n")
-            flat_elements = _flatten_element_tree(elements_tree)
-            parts.append("| 名称 | 类型 | 编码 | 父元素 | 职责 |\n")
-            parts.append("|------|------|------|--------|------|\n")
-            for n in flat_elements:
-                parent = parent_map.get(n.id, "-")
-                resp = (n.responsibility or "")[:80].replace("|", "\\|").replace("\n", " ") if n.responsibility else "-"
-                parts.append(f"| {n.name} | {n.element_type or '-'} | {n.code or '-'} | {parent} | {resp} |\n")
-            parts.append("\n")
-            for root in elements_tree:
-                parts.append(
-                    _render_logical_element_section(root, 0, element_provides, element_uses, interface_names)
-                )
-                parts.append("\n")
-        if dependencies:
-            parts.append("### 依赖关系\n\n")
-            parts.append("| 源元素 | 目标元素 | 类型 | 说明 |\n")
-            parts.append("|--------|----------|------|------|\n")
-            for d in dependencies:
-                src = element_names.get(d.source_element_id, d.source_element_id)
-                tgt = element_names.get(d.target_element_id, d.target_element_id)
-                dtype = d.dependency_type or "-"
-                desc = (d.description or "").replace("|", "\\|").replace("\n", " ")
-                parts.append(f"| {src} | {tgt} | {dtype} | {desc} |\n")
-            parts.append("\n")
-
-        # ---------- 实现视图 ----------
-        parts.append("\n---\n\n# 实现视图\n")
-        if elements_tree:
-            flat_elements = _flatten_element_tree(elements_tree)
-            parts.append("## 编码模型\n\n")
-            parts.append("| 架构元素 | 代码仓 | 技术栈 |\n")
-            parts.append("|----------|--------|--------|\n")
-            for n in flat_elements:
-                repo = (n.code_repo_url or "-").replace("|", "\\|")
-                tech = (n.tech_stack or "-").replace("|", "\\|").replace("\n", " ")
-                parts.append(f"| {n.name} | {repo} | {tech} |\n")
-            parts.append("\n")
-        if build_artifacts or element_to_artifacts or artifact_to_artifacts:
-            parts.append("## 构建模型\n\n")
-            if build_artifacts:
-                parts.append("**构建产物**\n\n")
-                for a in build_artifacts:
-                    parts.append(f"- **{a.name}** ({a.artifact_type})")
-                    if a.description:
-                        parts.append(f" — {a.description}")
-                    parts.append("\n")
-                    if a.build_command:
-                        parts.append(f"  - 构建命令: `{a.build_command}`\n")
-                    if a.build_environment:
-                        parts.append(f"  - 构建环境: {a.build_environment}\n")
-            if element_to_artifacts:
-                parts.append("\n**元素-产物映射**\n\n")
-                for ea in element_to_artifacts:
-                    elem = element_names.get(ea.element_id, ea.element_id)
-                    art = artifact_names.get(ea.build_artifact_id, ea.build_artifact_id)
-                    parts.append(f"- {elem} → {art}\n")
-            if artifact_to_artifacts:
-                parts.append("\n**产物构建关系**\n\n")
-                for aa in artifact_to_artifacts:
-                    inp = artifact_names.get(aa.input_artifact_id, aa.input_artifact_id)
-                    tgt = artifact_names.get(aa.target_artifact_id, aa.target_artifact_id)
-                    parts.append(f"- {inp} → {tgt}\n")
-            parts.append("\n")
-
-        # ---------- 部署视图 ----------
-        parts.append("\n---\n\n# 部署视图\n\n")
-        if deployment_units:
-            parts.append("**部署单元**\n\n")
-            for u in deployment_units:
-                parts.append(f"- **{u.name}** ({u.unit_type})")
-                if u.description:
-                    parts.append(f" — {u.description}")
-                parts.append("\n")
-        if artifact_to_deployments:
-            parts.append("\n**产物-部署映射**\n\n")
-            for ad in artifact_to_deployments:
-                art = artifact_names.get(ad.build_artifact_id, ad.build_artifact_id)
-                unit = unit_names.get(ad.deployment_unit_id, ad.deployment_unit_id)
-                parts.append(f"- {art} → {unit}\n")
-
-        return "".join(parts).strip()
+        yield ArchDocSection(
+            "dependencies",
+            make_signature(_row_sig(snapshot.dependencies), element_names),
+            lambda: _iter_dependencies(snapshot),
+        )
+        yield ArchDocSection(
+            "coding_model", make_signature(_row_sig(snapshot.elements)), lambda: _iter_coding_model(snapshot)
+        )
+        yield ArchDocSection(
+            "build_model",
+            make_signature(
+                _row_sig(snapshot.build_artifacts),
+                _row_sig(snapshot.element_to_artifacts),
+                _row_sig(snapshot.artifact_to_artifacts),
+                element_names,
+            ),
+            lambda: _iter_build_model(snapshot),
+        )
+        yield ArchDocSection(
+            "deployment",
+            make_signature(
+                _row_sig(snapshot.deployment_units), _row_sig(snapshot.artifact_to_deployments), artifact_names
+            ),
+            lambda: _iter_deployment(snapshot),
+        )
+
+    @staticmethod
+    def iter_arch_doc(snapshot: ArchVersionSnapshot) -> Iterator[str]:
+        """不使用缓存，逐段产出完整文档"""
+        return _strip_stream(
+            chunk for section in ArchDocService.iter_sections(snapshot) for chunk in section.chunks()
+        )
+
+    @staticmethod
+    def render_arch_doc(snapshot: ArchVersionSnapshot) -> str:
+        """不使用缓存，完整渲染文档"""
+        return "".join(ArchDocService.iter_arch_doc(snapshot))
+
+    @staticmethod
+    async def _iter_arch_doc_cached(snapshot: ArchVersionSnapshot, fingerprint: str) -> AsyncIterator[str]:
+        """
+        按章节签名复用 Redis 中的分节缓存逐段产出文档，只重新渲染签名变化的章节；
+        完整输出后回写分节缓存与整篇缓存（中途断开则不回写）。
+        """
+        version_id = snapshot.version_id
+        cached_sections = await ArchDocCache.get_sections(version_id)
+        changed: Dict[str, dict] = {}
+        contents: List[str] = []
+        current_keys = set()
+
+        def iter_chunks() -> Iterator[str]:
+            for section in ArchDocService.iter_sections(snapshot):
+                current_keys.add(section.key)
+                cached = cached_sections.get(section.key)
+                if isinstance(cached, dict) and cached.get("sig") == section.sig:
+                    yield cached.get("content") or ""
+                    continue
+                section_chunks: List[str] = []
+                for chunk in section.chunks():
+                    section_chunks.append(chunk)
+                    yield chunk
+                changed[section.key] = {"sig": section.sig, "content": "".join(section_chunks)}
+
+        for chunk in _strip_stream(iter_chunks()):
+            contents.append(chunk)
+            yield chunk
+
+        stale_keys = [k for k in cached_sections if k not in current_keys]
+        await ArchDocCache.save_sections(version_id, changed, stale_keys)
+        await ArchDocCache.set_document(version_id, fingerprint, "".join(contents))
+        if changed:
+            logging.info(f"架构文档增量渲染 version_id={version_id} 重新渲染章节数={len(changed)}")
+
+    @staticmethod
+    async def stream_arch_doc(
+        session: AsyncSession,
+        version_id: str,
+        max_concurrency: int = ArchSnapshotService.DEFAULT_MAX_CONCURRENCY,
+        use_cache: bool = True,
+    ) -> AsyncIterator[str]:
+        """
+        准备流式文档：数据加载与缓存检查在返回前完成（出错可正常返回错误码），
+        返回的异步迭代器只做渲染，不再访问数据库。
+
+        use_cache=False 时不保留已发送内容，峰值内存最低；启用缓存时需在结束后回写整篇文档。
+        """
+        if not use_cache:
+            snapshot = await ArchSnapshotService.load_snapshot(version_id, session, max_concurrency)
+            return _aiter(ArchDocService.iter_arch_doc(snapshot))
+
+        fingerprint = await ArchDocCache.compute_fingerprint(session, version_id)
+        content = await ArchDocCache.get_document(version_id, fingerprint)
+        if content is not None:
+            return _aiter(content[i:i + _STREAM_CHUNK_SIZE] for i in range(0, len(content), _STREAM_CHUNK_SIZE))
+        snapshot = await ArchSnapshotService.load_snapshot(version_id, session, max_concurrency)
+        return ArchDocService._iter_arch_doc_cached(snapshot, fingerprint)
+
+    @staticmethod
+    async def build_arch_doc(
+        session: AsyncSession,
+        version_id: str,
+        max_concurrency: int = ArchSnapshotService.DEFAULT_MAX_CONCURRENCY,
+        use_cache: bool = True,
+    ) -> str:
+        chunks = await ArchDocService.stream_arch_doc(session, version_id, max_concurrency, use_cache)
+        return "".join([chunk async for chunk in chunks])
+
+
+async def _aiter(chunks: Iterable[str]) -> AsyncIterator[str]:
+    for chunk in chunks:
+        yield chunk
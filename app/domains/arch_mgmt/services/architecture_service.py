@@ -17,8 +17,9 @@ from app.domains.arch_mgmt.schemes.architecture import (
     ArchDependencyCreate,
     ArchDependencyUpdate,
     ArchElementTree,
-    ArchElementInfo,
 )
+from app.utils.tree import build_tree
+from app.domains.arch_mgmt.services.arch_doc_cache import ArchDocCache
 
 
 class ArchitectureService:
@@ -43,6 +44,7 @@ class ArchitectureService:
         )
         session.add(overview)
         await session.commit()
+        await ArchDocCache.invalidate(overview.version_id)
         await session.refresh(overview)
         logging.info(f"创建架构概览 version_id={data.version_id} section_key={section_key}")
         return overview
@@ -60,6 +62,7 @@ class ArchitectureService:
             overview.owner_id = data.owner_id
         overview.updated_at = datetime.utcnow()
         await session.commit()
+        await ArchDocCache.invalidate(overview.version_id)
         await session.refresh(overview)
         return overview
 
@@ -108,6 +111,7 @@ class ArchitectureService:
         )
         session.add(elem)
         await session.commit()
+        await ArchDocCache.invalidate(elem.version_id)
         await session.refresh(elem)
         logging.info(f"创建架构元素 version_id={data.version_id} name={data.name} type={data.element_type}")
         return elem
@@ -126,6 +130,7 @@ class ArchitectureService:
             setattr(elem, k, v)
         elem.updated_at = datetime.utcnow()
         await session.commit()
+        await ArchDocCache.invalidate(elem.version_id)
         await session.refresh(elem)
         return elem
 
@@ -136,6 +141,7 @@ class ArchitectureService:
             return False
         await session.delete(elem)
         await session.commit()
+        await ArchDocCache.invalidate(elem.version_id)
         logging.info(f"删除架构元素 element_id={element_id}")
         return True
 
@@ -154,25 +160,12 @@ class ArchitectureService:
         result = await session.execute(q)
         return list(result.scalars().all())
 
-    @staticmethod
-    def _element_to_tree(node: ArchElement, all_elements: List[ArchElement]) -> ArchElementTree:
-        children = [e for e in all_elements if e.parent_id == node.id]
-        sorted_children = sorted(children, key=lambda x: x.created_at or datetime.min)
-        data = ArchElementInfo.model_validate(node).model_dump()
-        data["children"] = [ArchitectureService._element_to_tree(c, all_elements) for c in sorted_children]
-        return ArchElementTree(**data)
-
     @staticmethod
     async def get_elements_tree(session: AsyncSession, version_id: str) -> List[ArchElementTree]:
         result = await session.execute(
             select(ArchElement).where(ArchElement.version_id == version_id).order_by(ArchElement.created_at)
         )
-        all_elements = list(result.scalars().all())
-        roots = [e for e in all_elements if e.parent_id is None]
-        return [
-            ArchitectureService._element_to_tree(r, all_elements)
-            for r in sorted(roots, key=lambda x: x.created_at or datetime.min)
-        ]
+        return build_tree(result.scalars().all(), ArchElementTree)
 
     @staticmethod
     async def get_element_by_id(session: AsyncSession, element_id: str) -> Optional[ArchElement]:
@@ -202,6 +195,7 @@ class ArchitectureService:
         )
         session.add(dep)
         await session.commit()
+        await ArchDocCache.invalidate(dep.version_id)
         await session.refresh(dep)
         logging.info(f"创建架构依赖 version_id={data.version_id} source_element={data.source_element_id} target_element={data.target_element_id}")
         return dep
@@ -220,6 +214,7 @@ class ArchitectureService:
         if data.owner_id is not None:
             dep.owner_id = data.owner_id
         await session.commit()
+        await ArchDocCache.invalidate(dep.version_id)
         await session.refresh(dep)
         return dep
 
@@ -230,6 +225,7 @@ class ArchitectureService:
             return False
         await session.delete(dep)
         await session.commit()
+        await ArchDocCache.invalidate(dep.version_id)
         logging.info(f"删除架构依赖 dependency_id={dependency_id}")
         return True
 
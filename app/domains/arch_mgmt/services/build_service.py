@@ -20,6 +20,7 @@ from app.domains.arch_mgmt.schemes.build import (
     ArchArtifactToArtifactUpdate,
 )
 from app.domains.arch_mgmt.services.architecture_service import ArchitectureService
+from app.domains.arch_mgmt.services.arch_doc_cache import ArchDocCache
 
 
 class BuildService:
@@ -44,6 +45,7 @@ class BuildService:
         )
         session.add(artifact)
         await session.commit()
+        await ArchDocCache.invalidate(artifact.version_id)
         await session.refresh(artifact)
         logging.info(f"创建构建产物 version_id={data.version_id} name={data.name} type={data.artifact_type}")
         return artifact
@@ -60,6 +62,7 @@ class BuildService:
             setattr(artifact, k, v)
         artifact.updated_at = datetime.utcnow()
         await session.commit()
+        await ArchDocCache.invalidate(artifact.version_id)
         await session.refresh(artifact)
         return artifact
 
@@ -70,6 +73,7 @@ class BuildService:
             return False
         await session.delete(artifact)
         await session.commit()
+        await ArchDocCache.invalidate(artifact.version_id)
         logging.info(f"删除构建产物 artifact_id={artifact_id}")
         return True
 
@@ -112,6 +116,7 @@ class BuildService:
         )
         session.add(element_artifact)
         await session.commit()
+        await ArchDocCache.invalidate(element_artifact.version_id)
         await session.refresh(element_artifact)
         logging.info(f"创建架构元素-构建产物映射 version_id={data.version_id} element_id={data.element_id} build_artifact_id={data.build_artifact_id}")
         return element_artifact
@@ -129,6 +134,7 @@ class BuildService:
             setattr(element_artifact, k, v)
         element_artifact.updated_at = datetime.utcnow()
         await session.commit()
+        await ArchDocCache.invalidate(element_artifact.version_id)
         await session.refresh(element_artifact)
         return element_artifact
 
@@ -140,6 +146,7 @@ class BuildService:
         
         await session.delete(element_artifact)
         await session.commit()
+        await ArchDocCache.invalidate(element_artifact.version_id)
         logging.info(f"删除架构元素-构建产物映射 element_artifact_id={element_artifact_id}")
         return True
 
@@ -184,6 +191,7 @@ class BuildService:
         )
         session.add(artifact_to_artifact)
         await session.commit()
+        await ArchDocCache.invalidate(artifact_to_artifact.version_id)
         await session.refresh(artifact_to_artifact)
         logging.info(f"创建构建产物关系 version_id={data.version_id} input_artifact_id={data.input_artifact_id} target_artifact_id={data.target_artifact_id}")
         return artifact_to_artifact
@@ -201,6 +209,7 @@ class BuildService:
             setattr(artifact_to_artifact, k, v)
         artifact_to_artifact.updated_at = datetime.utcnow()
         await session.commit()
+        await ArchDocCache.invalidate(artifact_to_artifact.version_id)
         await session.refresh(artifact_to_artifact)
         return artifact_to_artifact
 
@@ -212,6 +221,7 @@ class BuildService:
         
         await session.delete(artifact_to_artifact)
         await session.commit()
+        await ArchDocCache.invalidate(artifact_to_artifact.version_id)
         logging.info(f"删除构建产物关系 artifact_to_artifact_id={artifact_to_artifact_id}")
         return True
 
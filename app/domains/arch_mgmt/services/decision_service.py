@@ -9,6 +9,7 @@ from app.domains.arch_mgmt.schemes.decision import (
     ArchDecisionCreate,
     ArchDecisionUpdate,
 )
+from app.domains.arch_mgmt.services.arch_doc_cache import ArchDocCache
 
 
 class DecisionService:
@@ -33,6 +34,7 @@ class DecisionService:
         )
         session.add(rec)
         await session.commit()
+        await ArchDocCache.invalidate(rec.version_id)
         await session.refresh(rec)
         logging.info(f"创建架构决策 version_id={data.version_id} title={data.title}")
         return rec
@@ -49,6 +51,7 @@ class DecisionService:
             setattr(rec, k, v)
         rec.updated_at = datetime.utcnow()
         await session.commit()
+        await ArchDocCache.invalidate(rec.version_id)
         await session.refresh(rec)
         return rec
 
@@ -59,6 +62,7 @@ class DecisionService:
             return False
         await session.delete(rec)
         await session.commit()
+        await ArchDocCache.invalidate(rec.version_id)
         logging.info(f"删除架构决策 decision_id={decision_id}")
         return True
 
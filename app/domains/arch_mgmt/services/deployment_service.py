@@ -15,6 +15,7 @@ from app.domains.arch_mgmt.schemes.deployment import (
     ArchArtifactToDeploymentUpdate,
 )
 from app.domains.arch_mgmt.services.build_service import BuildService
+from app.domains.arch_mgmt.services.arch_doc_cache import ArchDocCache
 
 
 class DeploymentService:
@@ -39,6 +40,7 @@ class DeploymentService:
         )
         session.add(unit)
         await session.commit()
+        await ArchDocCache.invalidate(unit.version_id)
         await session.refresh(unit)
         logging.info(f"创建部署单元 version_id={data.version_id} name={data.name} type={data.unit_type}")
         return unit
@@ -57,6 +59,7 @@ class DeploymentService:
             setattr(unit, k, v)
         unit.updated_at = datetime.utcnow()
         await session.commit()
+        await ArchDocCache.invalidate(unit.version_id)
         await session.refresh(unit)
         return unit
 
@@ -67,6 +70,7 @@ class DeploymentService:
             return False
         await session.delete(unit)
         await session.commit()
+        await ArchDocCache.invalidate(unit.version_id)
         logging.info(f"删除部署单元 unit_id={unit_id}")
         return True
 
@@ -111,6 +115,7 @@ class DeploymentService:
         )
         session.add(artifact_deploy)
         await session.commit()
+        await ArchDocCache.invalidate(artifact_deploy.version_id)
         await session.refresh(artifact_deploy)
         logging.info(f"创建构建产物-部署单元映射 version_id={data.version_id} build_artifact_id={data.build_artifact_id} deployment_unit_id={data.deployment_unit_id}")
         return artifact_deploy
@@ -127,6 +132,7 @@ class DeploymentService:
             setattr(artifact_deploy, k, v)
         artifact_deploy.updated_at = datetime.utcnow()
         await session.commit()
+        await ArchDocCache.invalidate(artifact_deploy.version_id)
         await session.refresh(artifact_deploy)
         return artifact_deploy
 
@@ -137,6 +143,7 @@ class DeploymentService:
             return False
         await session.delete(artifact_deploy)
         await session.commit()
+        await ArchDocCache.invalidate(artifact_deploy.version_id)
         logging.info(f"删除构建产物-部署单元映射 artifact_deploy_id={artifact_deploy_id}")
         return True
 
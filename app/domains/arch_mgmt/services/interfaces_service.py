@@ -16,6 +16,7 @@ from app.domains.arch_mgmt.schemes.interfaces import (
     ArchElementInterfaceUpdate,
 )
 from app.domains.arch_mgmt.services.architecture_service import ArchitectureService
+from app.domains.arch_mgmt.services.arch_doc_cache import ArchDocCache
 
 
 class InterfacesService:
@@ -60,6 +61,7 @@ class InterfacesService:
         )
         session.add(interface)
         await session.commit()
+        await ArchDocCache.invalidate(interface.version_id)
         await session.refresh(interface)
         logging.info(f"创建接口 version_id={data.version_id} category={data.interface_category} name={data.name}")
         return interface
@@ -78,6 +80,7 @@ class InterfacesService:
             setattr(interface, k, v)
         interface.updated_at = datetime.utcnow()
         await session.commit()
+        await ArchDocCache.invalidate(interface.version_id)
         await session.refresh(interface)
         return interface
 
@@ -88,6 +91,7 @@ class InterfacesService:
             return False
         await session.delete(interface)
         await session.commit()
+        await ArchDocCache.invalidate(interface.version_id)
         logging.info(f"删除接口 interface_id={interface_id}")
         return True
 
@@ -134,6 +138,7 @@ class InterfacesService:
         )
         session.add(elem_iface)
         await session.commit()
+        await ArchDocCache.invalidate(elem_iface.version_id)
         await session.refresh(elem_iface)
         logging.info(f"创建元素-接口关系 version_id={data.version_id} element_id={data.element_id} interface_id={data.interface_id} relation_type={data.relation_type}")
         return elem_iface
@@ -149,6 +154,7 @@ class InterfacesService:
             elem_iface.description = data.description
         elem_iface.updated_at = datetime.utcnow()
         await session.commit()
+        await ArchDocCache.invalidate(elem_iface.version_id)
         await session.refresh(elem_iface)
         return elem_iface
 
@@ -159,6 +165,7 @@ class InterfacesService:
             return False
         await session.delete(elem_iface)
         await session.commit()
+        await ArchDocCache.invalidate(elem_iface.version_id)
         logging.info(f"删除元素-接口关系 elem_iface_id={elem_iface_id}")
         return True
 
@@ -0,0 +1,160 @@
+"""
+版本架构快照：一次性加载某版本下全部 arch_mgmt 表数据，供文档生成等聚合读取方使用
+
+各表查询相互独立，默认在连接池的多个会话上有界并发执行（AsyncSession 不可并发复用），
+结果组装为不可变的内存视图 ArchVersionSnapshot，派生的名称映射、父子关系等按需计算并缓存。
+"""
+import asyncio
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.infrastructure.database import db_session
+from app.domains.arch_mgmt.models.architecture import ArchOverview, ArchElement, ArchDependency
+from app.domains.arch_mgmt.models.decision import ArchDecision
+from app.domains.arch_mgmt.models.interfaces import ArchInterface, ArchElementInterface
+from app.domains.arch_mgmt.models.build import ArchBuildArtifact, ArchElementToArtifact, ArchArtifactToArtifact
+from app.domains.arch_mgmt.models.deployment import ArchDeploymentUnit, ArchArtifactToDeployment
+from app.domains.arch_mgmt.schemes.architecture import (
+    ArchElementTree,
+    ArchOverviewInfo,
+    ArchElementInfo,
+    ArchDependencyInfo,
+    ArchVersionSummary,
+)
+from app.domains.arch_mgmt.services.architecture_service import ArchitectureService
+from app.domains.arch_mgmt.services.interfaces_service import InterfacesService
+from app.domains.arch_mgmt.services.build_service import BuildService
+from app.domains.arch_mgmt.services.deployment_service import DeploymentService
+from app.domains.arch_mgmt.services.decision_service import DecisionService
+from app.utils.tree import build_tree
+
+
+@dataclass(frozen=True)
+class ArchVersionSnapshot:
+    """某版本架构数据的不可变内存视图（ORM 记录已脱离会话，仅可读取列属性）"""
+    version_id: str
+    overviews: Tuple[ArchOverview, ...]
+    elements: Tuple[ArchElement, ...]
+    dependencies: Tuple[ArchDependency, ...]
+    decisions: Tuple[ArchDecision, ...]
+    interfaces: Tuple[ArchInterface, ...]
+    element_interfaces: Tuple[ArchElementInterface, ...]
+    build_artifacts: Tuple[ArchBuildArtifact, ...]
+    element_to_artifacts: Tuple[ArchElementToArtifact, ...]
+    artifact_to_artifacts: Tuple[ArchArtifactToArtifact, ...]
+    deployment_units: Tuple[ArchDeploymentUnit, ...]
+    artifact_to_deployments: Tuple[ArchArtifactToDeployment, ...]
+
+    @cached_property
+    def elements_tree(self) -> List[ArchElementTree]:
+        return build_tree(self.elements, ArchElementTree)
+
+    @cached_property
+    def element_names(self) -> Dict[str, str]:
+        return {e.id: e.name for e in self.elements}
+
+    @cached_property
+    def element_parent_names(self) -> Dict[str, str]:
+        """element_id -> 父元素名称（根节点无父）"""
+        names = self.element_names
+        return {e.id: names[e.parent_id] for e in self.elements if e.parent_id in names}
+
+    @cached_property
+    def interface_names(self) -> Dict[str, str]:
+        return {i.id: i.name for i in self.interfaces}
+
+    @cached_property
+    def artifact_names(self) -> Dict[str, str]:
+        return {a.id: a.name for a in self.build_artifacts}
+
+    @cached_property
+    def unit_names(self) -> Dict[str, str]:
+        return {u.id: u.name for u in self.deployment_units}
+
+    @cached_property
+    def element_provides(self) -> Dict[str, List[str]]:
+        """element_id -> 提供的接口ID列表"""
+        return self._element_interface_map(provides=True)
+
+    @cached_property
+    def element_uses(self) -> Dict[str, List[str]]:
+        """element_id -> 调用的接口ID列表"""
+        return self._element_interface_map(provides=False)
+
+    def _element_interface_map(self, provides: bool) -> Dict[str, List[str]]:
+        m: Dict[str, List[str]] = {}
+        for ei in self.element_interfaces:
+            if (ei.relation_type == "provides") == provides:
+                m.setdefault(ei.element_id, []).append(ei.interface_id)
+        return m
+
+    def to_summary(self, with_tree: bool = False) -> ArchVersionSummary:
+        """转换为逻辑架构层摘要"""
+        return ArchVersionSummary(
+            overviews=[ArchOverviewInfo.model_validate(o) for o in self.overviews],
+            elements=[ArchElementInfo.model_validate(e) for e in self.elements],
+            elements_tree=self.elements_tree if with_tree else None,
+            dependencies=[ArchDependencyInfo.model_validate(d) for d in self.dependencies],
+        )
+
+
+Loader = Callable[[AsyncSession, str], Awaitable[list]]
+
+# 快照字段 -> 加载函数；均为按 version_id 的单表查询，彼此独立
+_SNAPSHOT_LOADERS: Dict[str, Loader] = {
+    "overviews": ArchitectureService.list_overviews,
+    "elements": ArchitectureService.get_elements,
+    "dependencies": ArchitectureService.get_dependencies,
+    "decisions": DecisionService.list_decisions,
+    "interfaces": InterfacesService.list_interfaces,
+    "element_interfaces": InterfacesService.list_element_interfaces,
+    "build_artifacts": BuildService.list_build_artifacts,
+    "element_to_artifacts": BuildService.list_element_to_artifacts,
+    "artifact_to_artifacts": BuildService.list_artifact_to_artifacts,
+    "deployment_units": DeploymentService.list_deployment_units,
+    "artifact_to_deployments": DeploymentService.list_artifact_to_deployments,
+}
+
+
+class ArchSnapshotService:
+    """版本架构快照加载服务"""
+
+    DEFAULT_MAX_CONCURRENCY = 4
+
+    @staticmethod
+    async def load_snapshot(
+        version_id: str,
+        session: Optional[AsyncSession] = None,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    ) -> ArchVersionSnapshot:
+        """
+        加载版本快照
+
+        Args:
+            version_id: 版本ID
+            session: 传入会话且 max_concurrency <= 1 时，在该会话上顺序查询（如需与当前事务保持一致）
+            max_concurrency: 最大并发查询数，每个并发查询占用连接池中的一个独立会话
+
+        Returns:
+            ArchVersionSnapshot: 不可变快照
+        """
+        if session is not None and max_concurrency <= 1:
+            results = {}
+            for field, loader in _SNAPSHOT_LOADERS.items():
+                results[field] = await loader(session, version_id)
+        else:
+            semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+            async def run(loader: Loader) -> list:
+                async with semaphore:
+                    async with db_session() as s:
+                        return await loader(s, version_id)
+
+            values = await asyncio.gather(*(run(loader) for loader in _SNAPSHOT_LOADERS.values()))
+            results = dict(zip(_SNAPSHOT_LOADERS.keys(), values))
+
+        return ArchVersionSnapshot(
+            version_id=version_id,
+            **{field: tuple(rows) for field, rows in results.items()},
+        )
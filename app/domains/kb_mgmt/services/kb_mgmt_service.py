@@ -7,6 +7,7 @@ from sqlalchemy.exc import IntegrityError
 from app.domains.kb_mgmt.models.knowledge_base import KbCategory,VersionKbRecord
 from app.domains.kb_mgmt.schemes.kb_mgmt import CreateVersionKb,UpdateVersionKb,VersionKbInfo,VersionKbCategoryGroup,VersionKbListResponse
 from app.domains.product_mgmt.models.products import VersionRecord
+from app.domains.product_mgmt.services.entity_cache import PRODUCT_ENTITY_CACHE
 
 
 class KbMgmtService:
@@ -14,8 +15,7 @@ class KbMgmtService:
 
     @staticmethod
     async def _get_version(db:AsyncSession,version_id:str)->Optional[VersionRecord]:
-        result=await db.execute(select(VersionRecord).where(VersionRecord.id==version_id))
-        return result.scalar_one_or_none()
+        return await PRODUCT_ENTITY_CACHE.get_version(db,version_id)
 
     @staticmethod
     def _to_info(rec:VersionKbRecord)->VersionKbInfo:
@@ -47,6 +47,12 @@ class KbMgmtService:
             return rec
         except IntegrityError:
             await db.rollback()
+            # 版本存在性来自实体缓存，其他进程删除版本后本地缓存可能仍在有效期内：
+            # 绕过缓存确认版本，外键失败时按版本不存在处理，而不是误报重复绑定
+            exists=await db.execute(select(VersionRecord.id).where(VersionRecord.id==version_id))
+            if exists.scalar_one_or_none() is None:
+                await PRODUCT_ENTITY_CACHE.invalidate_version(version_id)
+                return None
             raise ValueError("该版本下已存在相同知识库，不可重复绑定")
 
     @staticmethod
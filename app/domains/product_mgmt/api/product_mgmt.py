@@ -36,15 +36,17 @@ async def create_product(
 @product_router.get("/list")
 async def get_product_list(
     user_id: str = Query(..., description="用户ID"),
-    page: int = Query(1, ge=1, description="页码"),
+    page: int = Query(1, ge=1, description="页码（传入cursor时忽略）"),
     page_size: int = Query(10, ge=1, le=100, description="每页数量"),
     keyword: str = Query(None, description="搜索关键词"),
+    cursor: str = Query(None, description="分页游标，取上一页返回的next_cursor，深分页时优先使用"),
+    with_total: bool = Query(True, description="是否返回总数（总数有短时缓存）"),
     db: AsyncSession = Depends(get_db),
 ):
     """查询产品列表（含每个产品下的版本子列表）"""
     try:
-        products, versions_by_product, total = await ProductMgmtService.get_product_and_version_list(
-            db, user_id, page, page_size, keyword
+        products, versions_by_product, total, next_cursor = await ProductMgmtService.get_product_and_version_list(
+            db, user_id, page, page_size, keyword, cursor, with_total
         )
         items = [
             ProductWithVersionsInfo(
@@ -53,7 +55,9 @@ async def get_product_list(
             )
             for p in products
         ]
-        return {"items": items, "total": total}
+        return {"items": items, "total": total, "next_cursor": next_cursor}
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -61,6 +65,32 @@ async def get_product_list(
         )
 
 
+@product_router.get("/tree")
+async def get_product_tree(
+    user_id: str = Query(..., description="用户ID"),
+    page: int = Query(1, ge=1, description="页码（传入cursor时忽略）"),
+    page_size: int = Query(10, ge=1, le=100, description="每页数量"),
+    keyword: str = Query(None, description="搜索关键词"),
+    cursor: str = Query(None, description="分页游标，取上一页返回的next_cursor"),
+    with_total: bool = Query(True, description="是否返回总数（总数有短时缓存）"),
+    versions_per_product: int = Query(None, ge=0, description="每个产品最多返回的版本数，为空表示全部"),
+    db: AsyncSession = Depends(get_db),
+):
+    """查询产品目录树（列表模式：单条SQL，不含描述与产品定义）"""
+    try:
+        items, total, next_cursor = await ProductMgmtService.get_product_tree(
+            db, user_id, page, page_size, keyword, cursor, with_total, versions_per_product
+        )
+        return {"items": items, "total": total, "next_cursor": next_cursor}
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"查询产品目录树失败: {str(e)}",
+        )
+
+
 @product_router.get("/{product_id}", response_model=ProductInfo)
 async def get_product(
     product_id: str,
@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, Text, ForeignKey
+from sqlalchemy import Column, String, DateTime, Text, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.infrastructure.database.models_base import Base
 
@@ -20,6 +20,9 @@ class ProductRecord(Base):
 
     versions = relationship("VersionRecord", back_populates="product", cascade="all, delete-orphan")
 
+    # 列表按 (created_at, id) 倒序键集分页；PostgreSQL 上另有 name/description 的 pg_trgm 索引（见迁移脚本）
+    __table_args__ = (Index("idx_product_record_user_created", "create_user_id", "created_at", "id"),)
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -47,6 +50,11 @@ class VersionRecord(Base):
 
     product = relationship("ProductRecord", back_populates="versions")
 
+    __table_args__ = (
+        Index("idx_version_record_user_created", "create_user_id", "created_at", "id"),
+        Index("idx_version_record_product_created", "product_id", "created_at", "id"),
+    )
+
     def to_dict(self):
         return {
             "id": self.id,
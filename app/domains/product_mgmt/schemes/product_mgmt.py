@@ -47,6 +47,17 @@ class ProductWithVersionsInfo(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class ProductTreeItem(BaseModel):
+    """产品目录树节点（列表模式：不含 description/product_define 大字段）"""
+    id: str = Field(..., description="产品ID")
+    name: str = Field(..., description="产品名称")
+    create_user_id: str = Field(..., description="创建人ID")
+    owner_id: Optional[str] = Field(None, description="数据Owner ID")
+    created_at: Optional[datetime] = Field(None, description="创建时间")
+    updated_at: Optional[datetime] = Field(None, description="更新时间")
+    versions: List["VersionInfo"] = Field(default_factory=list, description="该产品下的版本列表")
+
+
 class CreateVersion(BaseModel):
     """新增版本"""
     name: str = Field(..., description="版本名称")
@@ -72,4 +83,5 @@ class VersionInfo(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
-ProductWithVersionsInfo.model_rebuild()
\ No newline at end of file
+ProductWithVersionsInfo.model_rebuild()
+ProductTreeItem.model_rebuild()
\ No newline at end of file
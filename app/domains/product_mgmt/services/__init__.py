@@ -1,3 +1,4 @@
 from app.domains.product_mgmt.services.product_mgmt import ProductMgmtService
+from app.domains.product_mgmt.services.entity_cache import PRODUCT_ENTITY_CACHE, ProductEntityCache
 
-__all__ = ["ProductMgmtService"]
+__all__ = ["ProductMgmtService", "PRODUCT_ENTITY_CACHE", "ProductEntityCache"]
@@ -0,0 +1,186 @@
+"""
+产品/版本实体缓存：按主键读穿透缓存 ProductRecord / VersionRecord
+
+- 两级缓存：进程内 LRU（条数上限 + TTL），可选 Redis 层（多进程共享）；
+- 缓存内容为列值快照（JSON 可序列化的字典），命中、未命中（以及关闭缓存时）都返回由快照重建、
+  不属于任何会话的实例，调用方只读使用，修改不会随会话提交；需要修改并提交的路径请在会话中直接查询，不要走缓存；
+- 失效：ProductMgmtService 的写操作提交后显式失效（删除产品时连同其版本）；
+  查询前记录失效序号，查询期间若发生失效则不写入缓存，避免把旧行缓存下来；
+- 只缓存存在的实体，不存在的结果不缓存；其他进程的本地缓存最长在 TTL 内可见旧值。
+"""
+import json
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type, TypeVar
+from sqlalchemy import DateTime, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config.settings import settings
+from app.domains.product_mgmt.models.products import ProductRecord, VersionRecord
+from app.infrastructure.redis import REDIS_CONN, RedisSpaceEnum
+
+T = TypeVar("T", ProductRecord, VersionRecord)
+
+_KINDS: Dict[type, str] = {ProductRecord: "product", VersionRecord: "version"}
+
+
+def _columns(model: type) -> List[Tuple[str, bool]]:
+    """列名及是否为时间列"""
+    return [(c.key, isinstance(c.type, DateTime)) for c in model.__table__.columns]
+
+
+_MODEL_COLUMNS: Dict[type, List[Tuple[str, bool]]] = {model: _columns(model) for model in _KINDS}
+
+
+def _dump(record: Any) -> Dict[str, Any]:
+    data = {}
+    for name, is_datetime in _MODEL_COLUMNS[type(record)]:
+        value = getattr(record, name)
+        data[name] = value.isoformat() if is_datetime and value is not None else value
+    return data
+
+
+def _load(model: Type[T], data: Dict[str, Any]) -> T:
+    kwargs = {}
+    for name, is_datetime in _MODEL_COLUMNS[model]:
+        value = data.get(name)
+        kwargs[name] = datetime.fromisoformat(value) if is_datetime and value else value
+    return model(**kwargs)
+
+
+class ProductEntityCache:
+    """产品/版本实体两级缓存（进程内 LRU + 可选 Redis）"""
+
+    SPACE = RedisSpaceEnum.BUSINESS
+
+    def __init__(self, max_entries: int = 10000, ttl: int = 60, use_redis: bool = False, enabled: bool = True):
+        """
+        Args:
+            max_entries: 进程内 LRU 最大条目数
+            ttl: 缓存有效期（秒），两级共用
+            use_redis: 是否启用 Redis 共享层
+            enabled: 是否启用，关闭时每次直接查询数据库
+        """
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self.use_redis = use_redis
+        self.enabled = enabled
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._seq = 0
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _redis_key(kind: str, entity_id: str) -> str:
+        return f"product_entity:{kind}:{entity_id}"
+
+    async def get_product(self, db: AsyncSession, product_id: str) -> Optional[ProductRecord]:
+        """按ID获取产品（只读快照）"""
+        return await self._get(db, ProductRecord, product_id)
+
+    async def get_version(self, db: AsyncSession, version_id: str) -> Optional[VersionRecord]:
+        """按ID获取版本（只读快照）"""
+        return await self._get(db, VersionRecord, version_id)
+
+    async def _get(self, db: AsyncSession, model: Type[T], entity_id: str) -> Optional[T]:
+        if not self.enabled:
+            result = await db.execute(select(model).where(model.id == entity_id))
+            record = result.scalar_one_or_none()
+            return _load(model, _dump(record)) if record is not None else None
+
+        kind = _KINDS[model]
+        key = (kind, entity_id)
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, data = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return _load(model, data)
+            del self._entries[key]
+
+        seq = self._seq
+        if self.use_redis:
+            payload = await REDIS_CONN.get(self._redis_key(kind, entity_id), self.SPACE)
+            if payload:
+                try:
+                    data = json.loads(payload)
+                    self._put_local(key, data, seq)
+                    self.redis_hits += 1
+                    return _load(model, data)
+                except (TypeError, ValueError) as e:
+                    logging.warning(f"实体缓存数据无法解析，改为查询数据库 {kind}:{entity_id}: {e}")
+
+        self.misses += 1
+        result = await db.execute(select(model).where(model.id == entity_id))
+        record = result.scalar_one_or_none()
+        if record is None:
+            return None
+        data = _dump(record)
+        if self._put_local(key, data, seq) and self.use_redis:
+            await REDIS_CONN.set(self._redis_key(kind, entity_id), json.dumps(data, ensure_ascii=False), self.ttl, self.SPACE)
+        # 与命中路径一致返回脱离会话的快照，避免调用方的修改随会话提交
+        return _load(model, data)
+
+    def _put_local(self, key: Tuple[str, str], data: Dict[str, Any], seq: int) -> bool:
+        """读取期间没有发生失效才写入"""
+        if seq != self._seq:
+            return False
+        self._entries[key] = (time.monotonic() + self.ttl, data)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return True
+
+    async def invalidate_product(self, product_id: str, version_ids: Iterable[str] = ()) -> None:
+        """失效产品及其版本（删除产品时级联删除的版本需一并传入）"""
+        await self._invalidate([("product", product_id)] + [("version", vid) for vid in version_ids])
+
+    async def invalidate_version(self, version_id: str) -> None:
+        """失效版本"""
+        await self._invalidate([("version", version_id)])
+
+    async def _invalidate(self, keys: List[Tuple[str, str]]) -> None:
+        if not self.enabled:
+            return
+        self._seq += 1
+        for key in keys:
+            self._entries.pop(key, None)
+        self.invalidations += len(keys)
+        if self.use_redis:
+            async with REDIS_CONN.batch(self.SPACE) as batch:
+                batch.delete(*(self._redis_key(kind, entity_id) for kind, entity_id in keys))
+
+    def clear(self) -> None:
+        self._seq += 1
+        self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取缓存统计"""
+        lookups = self.hits + self.redis_hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "use_redis": self.use_redis,
+            "hits": self.hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "hit_rate": (self.hits + self.redis_hits) / lookups if lookups else 0.0,
+        }
+
+
+PRODUCT_ENTITY_CACHE = ProductEntityCache(
+    max_entries=settings.product_entity_cache_max_entries,
+    ttl=settings.product_entity_cache_ttl,
+    use_redis=settings.product_entity_cache_redis,
+    enabled=settings.product_entity_cache_enabled,
+)
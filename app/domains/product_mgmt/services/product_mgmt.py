@@ -1,16 +1,62 @@
 import uuid
+import hashlib
 import logging
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete, func
+from sqlalchemy import select, delete, func, and_
+from sqlalchemy.sql import Select
+from app.config.settings import settings
 from app.domains.product_mgmt.models.products import ProductRecord, VersionRecord
-from app.domains.product_mgmt.schemes.product_mgmt import CreateProduct, UpdateProduct, CreateVersion, UpdateVersion
+from app.domains.product_mgmt.schemes.product_mgmt import CreateProduct, UpdateProduct, CreateVersion, UpdateVersion, ProductTreeItem, VersionInfo
+from app.domains.product_mgmt.services.entity_cache import PRODUCT_ENTITY_CACHE
+from app.infrastructure.redis import REDIS_CONN, RedisSpaceEnum
+from app.utils.pagination import keyset_page, split_page
 
 
 class ProductMgmtService:
     """产品配置管理服务"""
 
+    COUNT_CACHE_SPACE = RedisSpaceEnum.BUSINESS
+
+    # 目录树列表模式投影的列（不含 description/product_define 大字段）
+    TREE_PRODUCT_COLUMNS = ("id", "name", "create_user_id", "owner_id", "created_at", "updated_at")
+    TREE_VERSION_COLUMNS = ("id", "name", "product_id", "create_user_id", "owner_id", "created_at", "updated_at")
+
+    @staticmethod
+    def _product_filters(user_id: str, keyword: Optional[str]) -> list:
+        conditions = [ProductRecord.create_user_id == user_id]
+        if keyword:
+            conditions.append(
+                ProductRecord.name.contains(keyword) | (ProductRecord.description.isnot(None) & ProductRecord.description.contains(keyword))
+            )
+        return conditions
+
+    @staticmethod
+    def _count_key(kind: str, user_id: str, product_id: Optional[str] = None, keyword: Optional[str] = None) -> str:
+        scope = hashlib.sha1(f"{product_id or ''}\x00{keyword or ''}".encode("utf-8")).hexdigest()
+        return f"product_list_count:{kind}:{user_id}:{scope}"
+
+    @staticmethod
+    async def _cached_count(db: AsyncSession, filtered: Select, key: str) -> int:
+        """列表总数：缓存 product_list_count_cache_ttl 秒，期间新增/删除只精确失效无关键词的计数"""
+        ttl = settings.product_list_count_cache_ttl
+        if ttl > 0:
+            cached = await REDIS_CONN.get(key, ProductMgmtService.COUNT_CACHE_SPACE)
+            if cached is not None:
+                return int(cached)
+        total_result = await db.execute(select(func.count()).select_from(filtered.order_by(None).subquery()))
+        total = total_result.scalar() or 0
+        if ttl > 0:
+            await REDIS_CONN.set(key, total, ttl, ProductMgmtService.COUNT_CACHE_SPACE)
+        return total
+
+    @staticmethod
+    async def _invalidate_counts(*keys: str) -> None:
+        if settings.product_list_count_cache_ttl > 0:
+            async with REDIS_CONN.batch(ProductMgmtService.COUNT_CACHE_SPACE) as batch:
+                batch.delete(*keys)
+
     @staticmethod
     async def create_product(db: AsyncSession, user_id: str, data: CreateProduct) -> ProductRecord:
         """新增产品"""
@@ -28,6 +74,7 @@ class ProductMgmtService:
             db.add(record)
             await db.commit()
             await db.refresh(record)
+            await ProductMgmtService._invalidate_counts(ProductMgmtService._count_key("product", user_id))
             logging.info(f"创建产品: {record.name}, 创建人: {user_id}")
             return record
             
@@ -38,19 +85,24 @@ class ProductMgmtService:
 
     @staticmethod
     async def get_product_by_id(db: AsyncSession, product_id: str) -> Optional[ProductRecord]:
-        """根据ID查询产品"""
+        """根据ID查询产品（经实体缓存，返回只读快照）"""
         try:
-            result = await db.execute(select(ProductRecord).where(ProductRecord.id == product_id))
-            return result.scalar_one_or_none()
+            return await PRODUCT_ENTITY_CACHE.get_product(db, product_id)
         except Exception as e:
             logging.error(f"查询产品失败: {e}")
             raise
 
+    @staticmethod
+    async def _load_product(db: AsyncSession, product_id: str) -> Optional[ProductRecord]:
+        """在当前会话中查询产品（供修改路径使用，不经缓存）"""
+        result = await db.execute(select(ProductRecord).where(ProductRecord.id == product_id))
+        return result.scalar_one_or_none()
+
     @staticmethod
     async def update_product(db: AsyncSession, product_id: str, user_id: str, data: UpdateProduct) -> Optional[ProductRecord]:
         """修改产品"""
         try:
-            record = await ProductMgmtService.get_product_by_id(db, product_id)
+            record = await ProductMgmtService._load_product(db, product_id)
             if not record:
                 return None
             if record.create_user_id != user_id:
@@ -65,6 +117,7 @@ class ProductMgmtService:
                 record.owner_id = data.owner_id
             record.updated_at = datetime.utcnow()
             await db.commit()
+            await PRODUCT_ENTITY_CACHE.invalidate_product(product_id)
             await db.refresh(record)
             logging.info(f"更新产品: {record.name}")
             return record
@@ -79,13 +132,21 @@ class ProductMgmtService:
     async def delete_product(db: AsyncSession, product_id: str, user_id: str) -> bool:
         """删除产品"""
         try:
-            record = await ProductMgmtService.get_product_by_id(db, product_id)
+            record = await ProductMgmtService._load_product(db, product_id)
             if not record:
                 return False
             if record.create_user_id != user_id:
                 raise ValueError("无权限删除该产品")
+            version_result = await db.execute(select(VersionRecord.id).where(VersionRecord.product_id == product_id))
+            version_ids = version_result.scalars().all()
             await db.execute(delete(ProductRecord).where(ProductRecord.id == product_id))
             await db.commit()
+            await PRODUCT_ENTITY_CACHE.invalidate_product(product_id, version_ids)
+            await ProductMgmtService._invalidate_counts(
+                ProductMgmtService._count_key("product", user_id),
+                ProductMgmtService._count_key("version", user_id),
+                ProductMgmtService._count_key("version", user_id, product_id),
+            )
             logging.info(f"删除产品: {record.name}")
             return True
         except ValueError:
@@ -102,21 +163,30 @@ class ProductMgmtService:
         page: int = 1,
         page_size: int = 10,
         keyword: Optional[str] = None,
-    ) -> tuple[List[ProductRecord], int]:
-        """查询产品列表（按创建人过滤）"""
+        cursor: Optional[str] = None,
+        with_total: bool = True,
+    ) -> Tuple[List[ProductRecord], Optional[int], Optional[str]]:
+        """
+        查询产品列表（按创建人过滤，按 created_at、id 倒序）
+
+        传入 cursor 时按键集分页（忽略 page），否则按页码分页；两种方式都返回下一页游标。
+        关键词为 LIKE 包含匹配，PostgreSQL 上由 pg_trgm 索引加速。
+
+        Returns:
+            (本页记录, 总数（with_total=False 时为 None）, 下一页游标)
+        """
         try:
-            filtered = select(ProductRecord).where(ProductRecord.create_user_id == user_id)
-            if keyword and keyword.strip():
-                filtered = filtered.where(
-                    ProductRecord.name.contains(keyword) | (ProductRecord.description.isnot(None) & ProductRecord.description.contains(keyword))
-                )
-            total_result = await db.execute(select(func.count()).select_from(filtered.subquery()))
-            total = total_result.scalar() or 0
-            result = await db.execute(
-                filtered.order_by(ProductRecord.created_at.desc()).offset((page - 1) * page_size).limit(page_size)
-            )
-            items = result.scalars().all()
-            return items, total
+            keyword = keyword.strip() if keyword else None
+            filtered = select(ProductRecord).where(*ProductMgmtService._product_filters(user_id, keyword))
+            total = None
+            if with_total:
+                total = await ProductMgmtService._cached_count(db, filtered, ProductMgmtService._count_key("product", user_id, keyword=keyword))
+            query = keyset_page(filtered, ProductRecord, page_size, cursor)
+            if not cursor:
+                query = query.offset((page - 1) * page_size)
+            result = await db.execute(query)
+            items, next_cursor = split_page(result.scalars().all(), page_size)
+            return items, total, next_cursor
         except Exception as e:
             logging.error(f"查询产品列表失败: {e}")
             raise
@@ -125,8 +195,7 @@ class ProductMgmtService:
     async def create_version(db: AsyncSession, user_id: str, data: CreateVersion) -> VersionRecord:
         """新增版本"""
         try:
-            result = await db.execute(select(ProductRecord).where(ProductRecord.id == data.product_id))
-            product = result.scalar_one_or_none()
+            product = await PRODUCT_ENTITY_CACHE.get_product(db, data.product_id)
             if not product:
                 raise ValueError("所属产品不存在")
             if product.create_user_id != user_id:
@@ -142,6 +211,10 @@ class ProductMgmtService:
             db.add(record)
             await db.commit()
             await db.refresh(record)
+            await ProductMgmtService._invalidate_counts(
+                ProductMgmtService._count_key("version", user_id),
+                ProductMgmtService._count_key("version", user_id, data.product_id),
+            )
             logging.info(f"创建版本: {record.name}, 产品: {data.product_id}, 创建人: {user_id}")
             return record
         except ValueError:
@@ -153,19 +226,24 @@ class ProductMgmtService:
 
     @staticmethod
     async def get_version_by_id(db: AsyncSession, version_id: str) -> Optional[VersionRecord]:
-        """根据ID查询版本"""
+        """根据ID查询版本（经实体缓存，返回只读快照）"""
         try:
-            result = await db.execute(select(VersionRecord).where(VersionRecord.id == version_id))
-            return result.scalar_one_or_none()
+            return await PRODUCT_ENTITY_CACHE.get_version(db, version_id)
         except Exception as e:
             logging.error(f"查询版本失败: {e}")
             raise
 
+    @staticmethod
+    async def _load_version(db: AsyncSession, version_id: str) -> Optional[VersionRecord]:
+        """在当前会话中查询版本（供修改路径使用，不经缓存）"""
+        result = await db.execute(select(VersionRecord).where(VersionRecord.id == version_id))
+        return result.scalar_one_or_none()
+
     @staticmethod
     async def update_version(db: AsyncSession, version_id: str, user_id: str, data: UpdateVersion) -> Optional[VersionRecord]:
         """修改版本"""
         try:
-            record = await ProductMgmtService.get_version_by_id(db, version_id)
+            record = await ProductMgmtService._load_version(db, version_id)
             if not record:
                 return None
             if record.create_user_id != user_id:
@@ -176,6 +254,7 @@ class ProductMgmtService:
                 record.owner_id = data.owner_id
             record.updated_at = datetime.utcnow()
             await db.commit()
+            await PRODUCT_ENTITY_CACHE.invalidate_version(version_id)
             await db.refresh(record)
             logging.info(f"更新版本: {record.name}")
             return record
@@ -190,13 +269,18 @@ class ProductMgmtService:
     async def delete_version(db: AsyncSession, version_id: str, user_id: str) -> bool:
         """删除版本"""
         try:
-            record = await ProductMgmtService.get_version_by_id(db, version_id)
+            record = await ProductMgmtService._load_version(db, version_id)
             if not record:
                 return False
             if record.create_user_id != user_id:
                 raise ValueError("无权限删除该版本")
             await db.execute(delete(VersionRecord).where(VersionRecord.id == version_id))
             await db.commit()
+            await PRODUCT_ENTITY_CACHE.invalidate_version(version_id)
+            await ProductMgmtService._invalidate_counts(
+                ProductMgmtService._count_key("version", user_id),
+                ProductMgmtService._count_key("version", user_id, record.product_id),
+            )
             logging.info(f"删除版本: {record.name}")
             return True
         except ValueError:
@@ -214,21 +298,26 @@ class ProductMgmtService:
         page: int = 1,
         page_size: int = 10,
         keyword: Optional[str] = None,
-    ) -> tuple[List[VersionRecord], int]:
-        """查询版本列表（按创建人过滤，可选按产品过滤）"""
+        cursor: Optional[str] = None,
+        with_total: bool = True,
+    ) -> Tuple[List[VersionRecord], Optional[int], Optional[str]]:
+        """查询版本列表（按创建人过滤，可选按产品过滤；分页方式同 get_product_list）"""
         try:
             filtered = select(VersionRecord).where(VersionRecord.create_user_id == user_id)
             if product_id:
                 filtered = filtered.where(VersionRecord.product_id == product_id)
-            if keyword and keyword.strip():
+            keyword = keyword.strip() if keyword else None
+            if keyword:
                 filtered = filtered.where(VersionRecord.name.contains(keyword))
-            total_result = await db.execute(select(func.count()).select_from(filtered.subquery()))
-            total = total_result.scalar() or 0
-            result = await db.execute(
-                filtered.order_by(VersionRecord.created_at.desc()).offset((page - 1) * page_size).limit(page_size)
-            )
-            items = result.scalars().all()
-            return items, total
+            total = None
+            if with_total:
+                total = await ProductMgmtService._cached_count(db, filtered, ProductMgmtService._count_key("version", user_id, product_id, keyword))
+            query = keyset_page(filtered, VersionRecord, page_size, cursor)
+            if not cursor:
+                query = query.offset((page - 1) * page_size)
+            result = await db.execute(query)
+            items, next_cursor = split_page(result.scalars().all(), page_size)
+            return items, total, next_cursor
         except Exception as e:
             logging.error(f"查询版本列表失败: {e}")
             raise
@@ -240,11 +329,13 @@ class ProductMgmtService:
         page: int = 1,
         page_size: int = 10,
         keyword: Optional[str] = None,
-    ) -> Tuple[List[ProductRecord], Dict[str, List[VersionRecord]], int]:
+        cursor: Optional[str] = None,
+        with_total: bool = True,
+    ) -> Tuple[List[ProductRecord], Dict[str, List[VersionRecord]], Optional[int], Optional[str]]:
         """查询产品列表及每个产品下的版本列表（按创建人过滤）"""
-        products, total = await ProductMgmtService.get_product_list(db, user_id, page, page_size, keyword)
+        products, total, next_cursor = await ProductMgmtService.get_product_list(db, user_id, page, page_size, keyword, cursor, with_total)
         if not products:
-            return [], {}, total
+            return [], {}, total, next_cursor
         product_ids = [p.id for p in products]
         
         result = await db.execute(
@@ -256,4 +347,81 @@ class ProductMgmtService:
         versions_by_product: Dict[str, List[VersionRecord]] = {pid: [] for pid in product_ids}
         for v in all_versions:
             versions_by_product[v.product_id].append(v)
-        return products, versions_by_product, total
\ No newline at end of file
+        return products, versions_by_product, total, next_cursor
+
+    @staticmethod
+    async def get_product_tree(
+        db: AsyncSession,
+        user_id: str,
+        page: int = 1,
+        page_size: int = 10,
+        keyword: Optional[str] = None,
+        cursor: Optional[str] = None,
+        with_total: bool = True,
+        versions_per_product: Optional[int] = None,
+    ) -> Tuple[List[ProductTreeItem], Optional[int], Optional[str]]:
+        """
+        产品目录树（列表模式）：一条 SQL 取回本页产品及其版本
+
+        本页产品作为 CTE（只投影列表所需列，不读 description/product_define），
+        版本按产品内 (created_at, id) 倒序编号后左连接，versions_per_product 限制每个产品返回的版本数；
+        CTE 中多取的一条只用于判断是否有下一页，按页内序号排除，不连接其版本；
+        结果行直接组装为响应模型，不构造 ORM 实体。分页方式同 get_product_list。
+
+        Returns:
+            (本页产品树, 总数（with_total=False 时为 None）, 下一页游标)
+        """
+        try:
+            keyword = keyword.strip() if keyword else None
+            conditions = ProductMgmtService._product_filters(user_id, keyword)
+            total = None
+            if with_total:
+                total = await ProductMgmtService._cached_count(
+                    db, select(ProductRecord.id).where(*conditions), ProductMgmtService._count_key("product", user_id, keyword=keyword)
+                )
+
+            product_columns = [getattr(ProductRecord, name) for name in ProductMgmtService.TREE_PRODUCT_COLUMNS]
+            # 序号在 LIMIT/OFFSET 之前计算，OFFSET 分页时从 offset + 1 开始
+            page_rank = func.row_number().over(order_by=(ProductRecord.created_at.desc(), ProductRecord.id.desc()))
+            page_query = keyset_page(select(*product_columns, page_rank.label("page_rank")).where(*conditions), ProductRecord, page_size, cursor)
+            offset = 0
+            if not cursor:
+                offset = (page - 1) * page_size
+                page_query = page_query.offset(offset)
+            page_cte = page_query.cte("product_page")
+
+            rank = func.row_number().over(
+                partition_by=VersionRecord.product_id,
+                order_by=(VersionRecord.created_at.desc(), VersionRecord.id.desc()),
+            )
+            ranked = (
+                select(*[getattr(VersionRecord, name).label(f"v_{name}") for name in ProductMgmtService.TREE_VERSION_COLUMNS], rank.label("v_rank"))
+                .select_from(VersionRecord.__table__.join(page_cte, VersionRecord.product_id == page_cte.c.id))
+                .where(VersionRecord.create_user_id == user_id, page_cte.c.page_rank <= offset + page_size)
+                .subquery("ranked_versions")
+            )
+            on_clause = ranked.c.v_product_id == page_cte.c.id
+            if versions_per_product is not None:
+                on_clause = and_(on_clause, ranked.c.v_rank <= versions_per_product)
+
+            version_columns = [ranked.c[f"v_{name}"] for name in ProductMgmtService.TREE_VERSION_COLUMNS]
+            result = await db.execute(
+                select(*[page_cte.c[name] for name in ProductMgmtService.TREE_PRODUCT_COLUMNS], *version_columns)
+                .select_from(page_cte.outerjoin(ranked, on_clause))
+                .order_by(page_cte.c.created_at.desc(), page_cte.c.id.desc(), ranked.c.v_rank)
+            )
+
+            products: Dict[str, ProductTreeItem] = {}
+            split = len(ProductMgmtService.TREE_PRODUCT_COLUMNS)
+            for row in result.all():
+                product = products.get(row[0])
+                if product is None:
+                    product = ProductTreeItem(**dict(zip(ProductMgmtService.TREE_PRODUCT_COLUMNS, row[:split])))
+                    products[product.id] = product
+                if row[split] is not None:
+                    product.versions.append(VersionInfo(**dict(zip(ProductMgmtService.TREE_VERSION_COLUMNS, row[split:]))))
+            items, next_cursor = split_page(list(products.values()), page_size)
+            return items, total, next_cursor
+        except Exception as e:
+            logging.error(f"查询产品目录树失败: {e}")
+            raise
@@ -6,7 +6,8 @@ from sqlalchemy import delete,or_,select
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.domains.arch_mgmt.models.architecture import ArchElement
 from app.domains.scene_mgmt.models.scene import SceneFlowElementRecord,SceneFlowRecord,SceneFlowType,SceneRecord
-from app.domains.scene_mgmt.schemes.scene_mgmt import CreateScene,CreateSceneFlow,SceneFlowInfo,SceneInfo,SceneTree,UpdateScene,UpdateSceneFlow
+from app.domains.scene_mgmt.schemes.scene_mgmt import CreateScene,CreateSceneFlow,SceneFlowInfo,SceneTree,UpdateScene,UpdateSceneFlow
+from app.utils.tree import build_tree
 
 
 class SceneMgmtService:
@@ -80,14 +81,6 @@ class SceneMgmtService:
         result=await db.execute(q)
         return list(result.scalars().all())
 
-    @staticmethod
-    def _scene_to_tree(node:SceneRecord,all_scenes:List[SceneRecord])->SceneTree:
-        children=[s for s in all_scenes if s.parent_id==node.id]
-        sorted_children=sorted(children,key=lambda x:x.created_at or datetime.min)
-        data=SceneInfo.model_validate(node).model_dump()
-        data["children"]=[SceneMgmtService._scene_to_tree(c,all_scenes) for c in sorted_children]
-        return SceneTree(**data)
-
     @staticmethod
     async def get_scenes_tree(db:AsyncSession,version_id:str,user_id:str)->List[SceneTree]:
         result=await db.execute(
@@ -96,9 +89,7 @@ class SceneMgmtService:
                 or_(SceneRecord.owner_id==user_id,SceneRecord.create_user_id==user_id),
             ).order_by(SceneRecord.created_at)
         )
-        all_scenes=list(result.scalars().all())
-        roots=[s for s in all_scenes if s.parent_id is None]
-        return [SceneMgmtService._scene_to_tree(r,all_scenes) for r in sorted(roots,key=lambda x:x.created_at or datetime.min)]
+        return build_tree(result.scalars().all(),SceneTree)
 
     @staticmethod
     async def _validate_elements(db:AsyncSession,version_id:str,element_ids:List[str])->bool:
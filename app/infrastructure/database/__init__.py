@@ -1,9 +1,11 @@
-from app.infrastructure.database.factory import get_db, close_db, health_check_db
+from app.infrastructure.database.factory import get_db, db_session, close_db, health_check_db, get_db_stats
 from app.infrastructure.database.models_base import Base
 
 __all__ = [
     "Base",
     "get_db",
+    "db_session",
     "close_db",
     "health_check_db",
+    "get_db_stats",
 ]
@@ -1,15 +1,20 @@
-from typing import Optional, AsyncGenerator
+from typing import Optional, AsyncGenerator, Dict, Any
 from sqlalchemy.ext.asyncio import AsyncSession
 import logging
 import time
 import asyncio
+from contextlib import asynccontextmanager
 from app.infrastructure.database.base import AsyncBaseConnection, DatabaseConfig
 from app.infrastructure.database.sql_connect import SQLConnection
 from app.config.settings import settings
 
 
 class DatabaseFactory:
-    """数据库工厂类 - 懒加载 + 健康检查 + 自动重连"""
+    """数据库工厂类 - 懒加载 + 后台健康检查 + 自动重连
+
+    连接创建后 get_connection 走无锁快路径，健康检查由后台任务周期执行，
+    发现连接不健康时先创建新连接再原子替换，旧连接随后关闭，请求路径不再被检查阻塞。
+    """
     
     def __init__(self):
         self._connection_type: Optional[str] = None
@@ -17,22 +22,23 @@ class DatabaseFactory:
         self._connection_lock = asyncio.Lock()
         self._last_health_check: float = 0
         self._health_check_interval: int = 30  # 健康检查间隔（秒）
+        self._health_check_task: Optional[asyncio.Task] = None
+        # 指标：快路径命中次数、加锁次数及等待耗时
+        self._fast_path_hits: int = 0
+        self._lock_acquisitions: int = 0
+        self._lock_wait_total: float = 0.0
+        self._lock_wait_max: float = 0.0
+        self._reconnects: int = 0
     
     async def _create_connection(self) -> AsyncBaseConnection:
         """
         创建数据库连接（内部方法）
+
+        只负责创建新连接，不修改当前连接，由调用方决定何时替换
         
         Returns:
             AsyncBaseConnection: 数据库连接实例
         """
-        # 如果已存在，先关闭旧连接
-        if self._connection:
-            try:
-                await self._connection.close()
-            except Exception as e:
-                logging.warning(f"关闭旧数据库连接失败: {e}")
-            self._connection = None
-        
         # 使用配置中的默认值
         actual_db_type = settings.database_type
         db_type_lower = actual_db_type.lower()
@@ -57,10 +63,6 @@ class DatabaseFactory:
             connection = SQLConnection(db_type_lower)
             await connection.create_engine(config)
             
-            # 保存连接信息
-            self._connection = connection
-            self._connection_type = db_type_lower
-            
             logging.info(f"数据库连接创建成功: {actual_db_type}")
             return connection
             
@@ -68,9 +70,19 @@ class DatabaseFactory:
             logging.error(f"创建数据库连接失败: {e}")
             raise
     
-    def _should_check_health(self) -> bool:
-        """判断是否需要健康检查"""
-        return time.time() - self._last_health_check > self._health_check_interval
+    async def _swap_connection(self, connection: AsyncBaseConnection):
+        """原子替换当前连接，并关闭旧连接"""
+        old_connection = self._connection
+        # 单次赋值即完成替换，无锁读取方要么拿到旧连接，要么拿到新连接
+        self._connection = connection
+        self._connection_type = settings.database_type.lower()
+        if old_connection and old_connection is not connection:
+            self._reconnects += 1
+            try:
+                # 已借出的会话在归还时由连接池丢弃，不会被强制中断
+                await old_connection.close()
+            except Exception as e:
+                logging.warning(f"关闭旧数据库连接失败: {e}")
     
     async def _health_check(self) -> bool:
         """健康检查"""
@@ -82,22 +94,97 @@ class DatabaseFactory:
             logging.warning(f"数据库健康检查失败: {e}")
             return False
     
+    async def _health_check_loop(self):
+        """后台健康检查任务：定期检查，不健康时创建新连接并原子替换"""
+        while True:
+            try:
+                await asyncio.sleep(self._health_check_interval)
+                if not self._connection:
+                    continue
+                healthy = await self._health_check()
+                self._last_health_check = time.time()
+                if healthy:
+                    continue
+                logging.warning("数据库连接不健康，后台重新创建")
+                async with self._connection_lock:
+                    # 等锁期间可能已被其他协程替换，重新确认一次
+                    if await self._health_check():
+                        continue
+                    connection = await self._create_connection()
+                    await self._swap_connection(connection)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"数据库后台健康检查异常: {e}")
+    
+    def _ensure_health_check_task(self):
+        """确保后台健康检查任务在当前事件循环中运行"""
+        task = self._health_check_task
+        if task and not task.done():
+            return
+        try:
+            self._health_check_task = asyncio.get_running_loop().create_task(self._health_check_loop())
+        except RuntimeError:
+            # 无运行中的事件循环（如同步脚本），跳过后台检查
+            self._health_check_task = None
+    
     async def get_connection(self, db_type: str = None) -> Optional[AsyncBaseConnection]:
-        """获取连接（懒加载 + 健康检查）"""
+        """获取连接（无锁快路径 + 懒加载）"""
+        # 快路径：连接已存在时直接返回，不经过锁
+        connection = self._connection
+        if connection is not None:
+            self._fast_path_hits += 1
+            return connection
+        
+        # 慢路径：首次创建，加锁后双重检查
+        wait_start = time.perf_counter()
         async with self._connection_lock:
-            # 懒加载：如果不存在则创建
-            if not self._connection:
-                await self._create_connection()
+            wait = time.perf_counter() - wait_start
+            self._lock_acquisitions += 1
+            self._lock_wait_total += wait
+            self._lock_wait_max = max(self._lock_wait_max, wait)
             
-            # 健康检查：如果连接存在，定期检查健康状态
-            if self._connection:
-                if self._should_check_health():
-                    if not await self._health_check():
-                        logging.warning("数据库连接不健康，重新创建")
-                        await self._create_connection()
-                    self._last_health_check = time.time()
+            if not self._connection:
+                connection = await self._create_connection()
+                await self._swap_connection(connection)
+                self._last_health_check = time.time()
+                self._ensure_health_check_task()
             
             return self._connection
+    
+    async def close(self):
+        """停止后台健康检查并关闭当前连接"""
+        task = self._health_check_task
+        self._health_check_task = None
+        if task and not task.done():
+            task.cancel()
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+        
+        async with self._connection_lock:
+            connection = self._connection
+            self._connection = None
+            if connection:
+                await connection.close()
+                logging.info("数据库连接已关闭")
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """获取连接管理指标"""
+        acquisitions = self._lock_acquisitions
+        return {
+            "connection_type": self._connection_type,
+            "connected": self._connection is not None,
+            "fast_path_hits": self._fast_path_hits,
+            "lock_acquisitions": acquisitions,
+            "lock_wait_total_ms": round(self._lock_wait_total * 1000, 3),
+            "lock_wait_avg_ms": round(self._lock_wait_total * 1000 / acquisitions, 3) if acquisitions else 0.0,
+            "lock_wait_max_ms": round(self._lock_wait_max * 1000, 3),
+            "reconnects": self._reconnects,
+            "last_health_check": self._last_health_check,
+            "health_check_running": bool(self._health_check_task and not self._health_check_task.done()),
+        }
 
 # 全局工厂实例
 _database_factory = DatabaseFactory()
@@ -115,14 +202,21 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async with conn.get_session() as session:
         yield session
 
+@asynccontextmanager
+async def db_session() -> AsyncGenerator[AsyncSession, None]:
+    """从连接池获取独立会话 - 供需要并发查询的服务内部使用（AsyncSession 不可并发复用）"""
+    conn = await _database_factory.get_connection()
+    if not conn:
+        raise RuntimeError("数据库连接不可用")
+    
+    async with conn.get_session() as session:
+        yield session
+
 async def close_db():
     """关闭数据库连接"""
     global _database_factory
     
-    if _database_factory._connection:
-        await _database_factory._connection.close()
-        _database_factory._connection = None
-        logging.info("数据库连接已关闭")
+    await _database_factory.close()
 
 async def health_check_db() -> bool:
     """数据库健康检查"""
@@ -139,3 +233,7 @@ async def health_check_db() -> bool:
     except Exception as e:
         logging.error(f"数据库健康检查失败: {e}")
         return False
+
+def get_db_stats() -> Dict[str, Any]:
+    """获取数据库连接管理指标"""
+    return _database_factory.get_stats()
@@ -17,6 +17,15 @@ from .text2speech_models.factory import tts_factory
 from .embedding_models.factory import embedding_factory
 from .rerank_models.factory import rerank_factory
 from .speech2text_models.factory import stt_factory
+from .http_pool import close_http_clients
+from .admission import ModelAdmissionError
+
+
+async def close_model_clients():
+    """应用关闭时清空各工厂的实例注册表并关闭共享HTTP连接池"""
+    for factory in (llm_factory, cv_factory, tts_factory, embedding_factory, rerank_factory, stt_factory):
+        factory.clear_instances()
+    await close_http_clients()
 
 
 __all__ = [
@@ -34,5 +43,11 @@ __all__ = [
     "tts_factory",
     "embedding_factory",
     "rerank_factory",
-    "stt_factory"
+    "stt_factory",
+
+    # 准入控制
+    "ModelAdmissionError",
+
+    # 资源释放
+    "close_model_clients",
 ]
\ No newline at end of file
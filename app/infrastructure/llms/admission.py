@@ -0,0 +1,507 @@
+"""
+模型调用准入控制：按供应商/模型限制并发、限速，并在供应商故障时熔断
+
+配置写在各 *_models.json 中，供应商级 limits 由该供应商的全部模型共用一个控制器，
+模型级 limits（instances.<model>.limits，在供应商级配置上覆盖）使该模型单独计数：
+
+    "limits": {
+        "max_concurrency": 8,      # 同时在途的请求数，0 不限
+        "max_queue": 100,          # 排队等待的请求数上限，超出直接拒绝，0 不限
+        "queue_timeout": 30,       # 排队（等并发名额与限速令牌）最长时间(秒)
+        "rpm": 600,                # 每分钟请求数（令牌桶），0 不限
+        "tpm": 200000,             # 每分钟token数（令牌桶），0 不限
+        "breaker_failures": 5,     # 连续多少次供应商故障后熔断，0 不熔断
+        "breaker_cooldown": 30     # 熔断多久后放行一次探测请求(秒)
+    }
+
+- 一次模型方法调用（含其内部重试）占一个并发名额、消耗一个 RPM 令牌；
+- TPM 令牌在调用结束后按实际 token 数扣除（即 _total_token_count 的结果，流式按输出估算），
+  余额不为正时后续请求排队，直到令牌桶按速率回填；
+- 熔断只统计供应商故障：调用失败且失败原因是可重试错误（限流、5xx、超时、连接失败等，
+  按实例自身的 _is_retryable_error / _should_retry 判断抛出的异常或错误结果中的信息，
+  判断只在本模块调用一次、不带副作用）；参数错误等不影响熔断状态；
+- 流式调用在流读完或关闭时才归还名额，未消费就被丢弃的流在回收时归还；
+- 被拒绝时按各方法原有的失败约定返回（如 ChatResponse(success=False)），原本抛异常的方法抛出 ModelAdmissionError。
+"""
+import asyncio
+import functools
+import logging
+import time
+import weakref
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+from app.config.settings import settings
+from app.infrastructure.llms.utils import num_tokens_from_string
+
+
+class ModelAdmissionError(Exception):
+    """模型调用未获准入（熔断中、排队已满或排队超时）"""
+
+    def __init__(self, reason: str, message: str):
+        super().__init__(message)
+        self.reason = reason
+
+
+class _CallRecord:
+    """一次已准入调用的状态，调用期间通过上下文变量对各基类可见"""
+
+    __slots__ = ("probe", "provider_errors", "failed", "error", "released")
+
+    def __init__(self, probe: bool = False):
+        self.probe = probe
+        self.provider_errors = 0
+        self.failed = False
+        self.error: Optional[str] = None
+        self.released = False
+
+
+_CURRENT_CALL: ContextVar[Optional[_CallRecord]] = ContextVar("model_admission_call", default=None)
+
+
+def record_call_failed(message: str = "") -> None:
+    """标记当前调用以失败告终（不抛异常、以错误结果返回的路径中调用），message 用于判断是否供应商故障"""
+    record = _CURRENT_CALL.get()
+    if record is not None:
+        record.failed = True
+        if message and record.error is None:
+            record.error = str(message)
+
+
+class _TokenBucket:
+    """按分钟额度匀速回填的令牌桶，余额允许为负（事后按实际用量扣除）"""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now: float) -> float:
+        """余额至少为 1 还需等待的时间"""
+        self._refill(now)
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self, amount: float) -> None:
+        self.tokens -= amount
+
+
+class AdmissionController:
+    """单个供应商（或单个模型）的并发上限、RPM/TPM 令牌桶与熔断器"""
+
+    def __init__(self, name: str, limits: Dict[str, Any]):
+        self.name = name
+        self.limits: Optional[Dict[str, Any]] = None
+        self.in_flight = 0
+        self.queued = 0
+        self._waiters: "deque[asyncio.Future]" = deque()
+        self.state = "closed"
+        self._opened_at = 0.0
+        self._consecutive_failures = 0
+        self._probing = False
+        self.admitted = 0
+        self.rejected: Dict[str, int] = {"circuit_open": 0, "queue_full": 0, "queue_timeout": 0}
+        self.successes = 0
+        self.failures = 0
+        self.breaker_opens = 0
+        self.tokens = 0
+        self.queue_wait_total = 0.0
+        self.queue_wait_max = 0.0
+        self.peak_in_flight = 0
+        self.configure(limits)
+
+    def configure(self, limits: Dict[str, Any]) -> None:
+        """应用 limits 配置；配置未变时保持令牌桶与熔断状态"""
+        if limits == self.limits:
+            return
+        self.limits = dict(limits)
+        self.max_concurrency = int(limits.get("max_concurrency") or 0)
+        self.max_queue = int(limits.get("max_queue") or 0)
+        self.queue_timeout = float(limits.get("queue_timeout", settings.llm_admission_queue_timeout))
+        self.breaker_failures = int(limits.get("breaker_failures", settings.llm_breaker_failures))
+        self.breaker_cooldown = float(limits.get("breaker_cooldown", settings.llm_breaker_cooldown))
+        rpm, tpm = int(limits.get("rpm") or 0), int(limits.get("tpm") or 0)
+        self._rpm = _TokenBucket(rpm) if rpm > 0 else None
+        self._tpm = _TokenBucket(tpm) if tpm > 0 else None
+        self._wake()
+
+    async def acquire(self) -> _CallRecord:
+        """排队直到获得并发名额与限速令牌，未获准入时抛出 ModelAdmissionError"""
+        start = time.monotonic()
+        record = _CallRecord(probe=self._check_breaker(start))
+        if self.max_queue and self.queued >= self.max_queue:
+            self._reject(record, "queue_full", f"模型服务 {self.name} 排队请求已满（{self.max_queue}），请稍后重试")
+
+        deadline = start + self.queue_timeout
+        self.queued += 1
+        try:
+            await self._wait_rate(deadline)
+            await self._acquire_slot(deadline)
+        except asyncio.TimeoutError:
+            self._reject(record, "queue_timeout", f"模型服务 {self.name} 排队超过 {self.queue_timeout:g} 秒，请稍后重试")
+        except BaseException:
+            self._probing = self._probing and not record.probe
+            raise
+        finally:
+            self.queued -= 1
+
+        waited = time.monotonic() - start
+        self.admitted += 1
+        self.queue_wait_total += waited
+        self.queue_wait_max = max(self.queue_wait_max, waited)
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        return record
+
+    def release(self, record: _CallRecord, failed: Optional[bool], tokens: int = 0) -> None:
+        """
+        归还名额并记录结果
+
+        Args:
+            record: acquire 返回的调用记录
+            failed: 调用是否失败，None 表示结果未知（如被取消）
+            tokens: 本次调用实际消耗的token数
+        """
+        if record.released:
+            return
+        record.released = True
+        self.in_flight -= 1
+        self._wake()
+
+        if tokens > 0:
+            self.tokens += tokens
+            if self._tpm is not None:
+                self._tpm.take(tokens)
+
+        if failed and record.provider_errors:
+            self.failures += 1
+            self._consecutive_failures += 1
+            if record.probe or (self.state == "closed" and self.breaker_failures and self._consecutive_failures >= self.breaker_failures):
+                self._open()
+        else:
+            if failed is False:
+                self.successes += 1
+                self._consecutive_failures = 0
+            if record.probe:
+                self.state = "closed"
+                self._consecutive_failures = 0
+        if record.probe:
+            self._probing = False
+
+    def _check_breaker(self, now: float) -> bool:
+        """熔断中直接拒绝；冷却期过后只放行一个探测请求，返回本次是否为探测"""
+        if self.state == "open":
+            if now - self._opened_at < self.breaker_cooldown:
+                self._reject(None, "circuit_open", f"模型服务 {self.name} 暂时不可用（已熔断），请稍后重试")
+            self.state = "half_open"
+        if self.state == "half_open":
+            if self._probing:
+                self._reject(None, "circuit_open", f"模型服务 {self.name} 正在恢复探测，请稍后重试")
+            self._probing = True
+            return True
+        return False
+
+    def _open(self) -> None:
+        if self.state != "open":
+            self.breaker_opens += 1
+            logging.warning(f"模型服务 {self.name} 连续 {self._consecutive_failures} 次调用失败，熔断 {self.breaker_cooldown:g} 秒")
+        self.state = "open"
+        self._opened_at = time.monotonic()
+
+    def _reject(self, record: Optional[_CallRecord], reason: str, message: str) -> None:
+        if record is not None and record.probe:
+            self._probing = False
+        self.rejected[reason] += 1
+        raise ModelAdmissionError(reason, message)
+
+    async def _wait_rate(self, deadline: float) -> None:
+        while True:
+            now = time.monotonic()
+            delay = max(
+                self._rpm.wait_time(now) if self._rpm is not None else 0.0,
+                self._tpm.wait_time(now) if self._tpm is not None else 0.0,
+            )
+            if delay <= 0:
+                if self._rpm is not None:
+                    self._rpm.take(1)
+                return
+            # 截止前等不到令牌就不再空等
+            if now + delay > deadline:
+                raise asyncio.TimeoutError()
+            await asyncio.sleep(delay)
+
+    async def _acquire_slot(self, deadline: float) -> None:
+        if not self._waiters and self._has_slot():
+            self.in_flight += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, max(0.0, deadline - time.monotonic()))
+        except BaseException:
+            if waiter.done() and not waiter.cancelled():
+                # 名额已移交给本请求，退还
+                self.in_flight -= 1
+                self._wake()
+            else:
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    pass
+            raise
+
+    def _has_slot(self) -> bool:
+        return not self.max_concurrency or self.in_flight < self.max_concurrency
+
+    def _wake(self) -> None:
+        """按先来后到把空出的名额移交给排队者"""
+        while self._waiters and self._has_slot():
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "limits": self.limits,
+            "state": self.state,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "peak_in_flight": self.peak_in_flight,
+            "admitted": self.admitted,
+            "rejected": dict(self.rejected),
+            "successes": self.successes,
+            "failures": self.failures,
+            "breaker_opens": self.breaker_opens,
+            "tokens": self.tokens,
+            "avg_queue_wait_ms": round(self.queue_wait_total / self.admitted * 1000, 2) if self.admitted else 0.0,
+            "max_queue_wait_ms": round(self.queue_wait_max * 1000, 2),
+            "rpm_available": round(self._rpm.tokens, 1) if self._rpm is not None else None,
+            "tpm_available": round(self._tpm.tokens, 1) if self._tpm is not None else None,
+        }
+
+
+_CONTROLLERS: Dict[Tuple[str, str, Optional[str]], AdmissionController] = {}
+
+
+def get_controller(scope: str, provider: str, model: Optional[str], limits: Dict[str, Any]) -> Optional[AdmissionController]:
+    """
+    获取（必要时创建）控制器，已存在时按最新配置更新
+
+    Args:
+        scope: 模型类别（配置文件名），如 chat_models
+        provider: 供应商名称
+        model: 模型名称，为 None 时为供应商级控制器
+        limits: 生效的 limits 配置
+    """
+    if not settings.llm_admission_enabled:
+        return None
+    key = (scope, provider, model)
+    controller = _CONTROLLERS.get(key)
+    if controller is None:
+        name = f"{provider}/{model}" if model else provider
+        controller = _CONTROLLERS[key] = AdmissionController(name, limits)
+    else:
+        controller.configure(limits)
+    return controller
+
+
+def get_admission_stats() -> Dict[str, Dict[str, Any]]:
+    """各控制器的准入统计，键为 类别/供应商[/模型]"""
+    return {
+        "/".join(part for part in key if part): controller.get_stats()
+        for key, controller in _CONTROLLERS.items()
+    }
+
+
+@dataclass(frozen=True)
+class AdmittedMethod:
+    """
+    需要准入控制的模型方法
+
+    Attributes:
+        kind: call 返回 (结果, token数)；stream 返回 (异步生成器, token数)，名额保持到流结束；
+            generator 本身是异步生成器函数
+        on_reject: 未获准入时的返回值构造 (self, 提示信息) -> 结果，为 None 时抛出 ModelAdmissionError
+        is_failure: 判断结果（或流式的每一项）是否代表失败
+    """
+    kind: str = "call"
+    on_reject: Optional[Callable[[Any, str], Any]] = None
+    is_failure: Optional[Callable[[Any], bool]] = None
+
+
+def admit_methods(cls: type, methods: Dict[str, AdmittedMethod]) -> None:
+    """为子类自身实现的模型方法接入准入控制（各基类的 __init_subclass__ 中调用）"""
+    wrappers = {"call": _admitted_call, "stream": _admitted_stream, "generator": _admitted_generator}
+    for name, method in methods.items():
+        if name in cls.__dict__:
+            setattr(cls, name, wrappers[method.kind](cls.__dict__[name], method))
+
+
+def _controller_for(instance: Any) -> Optional[AdmissionController]:
+    # 同一调用链内的嵌套调用（如 encode_queries 内部调用 encode）不重复占用名额
+    if _CURRENT_CALL.get() is not None:
+        return None
+    return getattr(instance, "_admission", None)
+
+
+def _token_count(result: Any) -> int:
+    if isinstance(result, tuple) and len(result) == 2 and isinstance(result[1], int):
+        return result[1]
+    return 0
+
+
+def _failure_text(result: Any) -> Optional[str]:
+    """从错误结果中取出错误信息：(响应, token数) 取响应，响应取 content"""
+    if isinstance(result, tuple) and result:
+        result = result[0]
+    if isinstance(result, str):
+        return result
+    content = getattr(result, "content", None)
+    return content if isinstance(content, str) else None
+
+
+def _note_exception(instance: Any, record: _CallRecord, error: Exception) -> None:
+    """调用抛出的异常按实例自身的重试判断归类为供应商故障（供应商故障只在这里计数）"""
+    predicate = getattr(instance, "_is_retryable_error", None) or getattr(instance, "_should_retry", None)
+    try:
+        if predicate is not None and predicate(error):
+            record.provider_errors += 1
+    except Exception:
+        pass
+
+
+def _note_failure(instance: Any, record: _CallRecord, result: Any = None) -> None:
+    """以错误结果返回的失败，按错误信息同样归类（重试判断只看异常文本）"""
+    message = record.error or _failure_text(result)
+    if message:
+        _note_exception(instance, record, Exception(message))
+
+
+def _admitted_call(func: Callable, method: AdmittedMethod) -> Callable:
+    @functools.wraps(func)
+    async def wrapper(self, *args, **kwargs):
+        controller = _controller_for(self)
+        if controller is None:
+            return await func(self, *args, **kwargs)
+        try:
+            record = await controller.acquire()
+        except ModelAdmissionError as e:
+            if method.on_reject is None:
+                raise
+            return method.on_reject(self, str(e))
+
+        token = _CURRENT_CALL.set(record)
+        failed, tokens = None, 0
+        try:
+            result = await func(self, *args, **kwargs)
+            tokens = _token_count(result)
+            failed = record.failed or bool(method.is_failure and method.is_failure(result))
+            if failed:
+                _note_failure(self, record, result)
+            return result
+        except Exception as e:
+            failed = True
+            _note_exception(self, record, e)
+            raise
+        finally:
+            _CURRENT_CALL.reset(token)
+            controller.release(record, failed, tokens)
+    return wrapper
+
+
+def _admitted_stream(func: Callable, method: AdmittedMethod) -> Callable:
+    @functools.wraps(func)
+    async def wrapper(self, *args, **kwargs):
+        controller = _controller_for(self)
+        if controller is None:
+            return await func(self, *args, **kwargs)
+        try:
+            record = await controller.acquire()
+        except ModelAdmissionError as e:
+            if method.on_reject is None:
+                raise
+            return method.on_reject(self, str(e))
+
+        token = _CURRENT_CALL.set(record)
+        try:
+            stream, tokens = await func(self, *args, **kwargs)
+        except Exception as e:
+            _note_exception(self, record, e)
+            controller.release(record, True)
+            raise
+        except BaseException:
+            controller.release(record, None)
+            raise
+        finally:
+            _CURRENT_CALL.reset(token)
+        return _guarded(self, controller, record, stream, method, tokens), tokens
+    return wrapper
+
+
+def _admitted_generator(func: Callable, method: AdmittedMethod) -> Callable:
+    @functools.wraps(func)
+    async def wrapper(self, *args, **kwargs):
+        controller = _controller_for(self)
+        if controller is None:
+            async for item in func(self, *args, **kwargs):
+                yield item
+            return
+        try:
+            record = await controller.acquire()
+        except ModelAdmissionError as e:
+            if method.on_reject is None:
+                raise
+            yield method.on_reject(self, str(e))
+            return
+
+        async for item in _guarded(self, controller, record, func(self, *args, **kwargs), method, 0):
+            yield item
+    return wrapper
+
+
+def _guarded(instance: Any, controller: AdmissionController, record: _CallRecord, stream: Any, method: AdmittedMethod, tokens: int):
+    """包装流：迭代期间保持名额与调用记录，结束、出错或关闭时归还"""
+    async def guarded():
+        failed, output_tokens = None, 0
+        try:
+            while True:
+                token = _CURRENT_CALL.set(record)
+                try:
+                    item = await stream.__anext__()
+                except StopAsyncIteration:
+                    break
+                finally:
+                    _CURRENT_CALL.reset(token)
+                if isinstance(item, str):
+                    output_tokens += num_tokens_from_string(item)
+                elif _token_count(item):
+                    output_tokens = _token_count(item)
+                if method.is_failure and method.is_failure(item):
+                    record.failed = True
+                    if record.error is None:
+                        record.error = _failure_text(item)
+                yield item
+            failed = record.failed
+            if failed:
+                _note_failure(instance, record)
+        except Exception as e:
+            failed = True
+            _note_exception(instance, record, e)
+            raise
+        finally:
+            controller.release(record, failed, tokens or output_tokens)
+            if hasattr(stream, "aclose"):
+                try:
+                    await stream.aclose()
+                except Exception:
+                    pass
+
+    generator = guarded()
+    # 流未被消费就被丢弃时 finally 不会执行，回收时归还名额
+    weakref.finalize(generator, controller.release, record, None)
+    return generator
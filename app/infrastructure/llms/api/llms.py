@@ -5,11 +5,16 @@ import io
 import base64
 from fastapi import APIRouter, HTTPException, UploadFile, File, Form
 from fastapi.responses import StreamingResponse
-from app.infrastructure.llms import llm_factory, cv_factory, embedding_factory, rerank_factory, stt_factory, tts_factory
+from app.infrastructure.llms import LLM, BaseEmbedding, llm_factory, cv_factory, embedding_factory, rerank_factory, stt_factory, tts_factory, close_model_clients
+from app.infrastructure.llms.embedding_models.batcher import get_embedding_batcher, get_embedding_batcher_stats
+from app.infrastructure.llms.http_pool import get_http_pool_stats
+from app.infrastructure.llms.admission import get_admission_stats
 
 
 # 主路由
 router = APIRouter(prefix="/models", tags=["模型管理"])
+# 挂载到应用后，应用关闭时释放复用的模型实例与共享连接池
+router.add_event_handler("shutdown", close_model_clients)
 
 
 # ==================== 数据模型 ====================
@@ -136,8 +141,42 @@ async def get_tts_models():
     return tts_factory.get_supported_models()
 
 
+@router.get("/pool/stats", summary="模型实例注册表与HTTP连接池统计")
+async def get_pool_stats():
+    """各模型工厂的实例复用情况与各模型服务主机的共享连接池状态"""
+    return {
+        "registries": {
+            "chat": llm_factory.get_registry_stats(),
+            "cv": cv_factory.get_registry_stats(),
+            "embedding": embedding_factory.get_registry_stats(),
+            "rerank": rerank_factory.get_registry_stats(),
+            "stt": stt_factory.get_registry_stats(),
+            "tts": tts_factory.get_registry_stats(),
+        },
+        "http_pools": get_http_pool_stats(),
+    }
+
+
+@router.get("/admission/stats", summary="模型调用准入控制统计")
+async def get_admission_control_stats():
+    """各供应商/模型的在途与排队数、排队等待时间、拒绝次数、令牌桶余额与熔断状态"""
+    return get_admission_stats()
+
+
+@router.get("/routes/stats", summary="聊天模型路由统计")
+async def get_route_stats():
+    """各路由目标的 EWMA 时延、错误率、p95 时延，以及对冲与故障转移次数"""
+    return llm_factory.router.get_stats()
+
+
 # ==================== 聊天模型API ====================
 
+@router.get("/chat/cache/stats", summary="聊天响应缓存统计", tags=["聊天模型"])
+async def get_chat_cache_stats():
+    """聊天响应缓存各层命中次数与节省的 token 数"""
+    return LLM.get_response_cache_stats()
+
+
 @router.post("/chat", response_model=ChatResponse, summary="聊天对话", tags=["聊天模型"])
 async def chat(request: ChatRequest):
     """聊天对话接口"""
@@ -287,11 +326,12 @@ async def encode_texts(request: EmbeddingRequest):
         if not model:
             raise HTTPException(status_code=400, detail="无法创建模型实例")
         
-        embeddings = await model.encode_texts(request.texts)
+        # 同一 (供应商, 模型) 的并发请求由微批调度器合并 / 拆分后发送
+        embeddings, token_count = await get_embedding_batcher(model).encode(request.texts)
         
         return EmbeddingResponse(
-            embeddings=embeddings,
-            token_count=sum(len(text.split()) for text in request.texts)
+            embeddings=embeddings.tolist(),
+            token_count=token_count
         )
         
     except Exception as e:
@@ -307,17 +347,26 @@ async def encode_query(request: ModelRequest, query: str = Form(...)):
         if not model:
             raise HTTPException(status_code=400, detail="无法创建模型实例")
         
-        embedding = await model.encode_query(query)
+        embeddings, token_count = await get_embedding_batcher(model, query=True).encode([query])
         
         return {
-            "embedding": embedding,
-            "token_count": len(query.split()),
+            "embedding": embeddings[0].tolist(),
+            "token_count": token_count,
         }
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"查询文本编码失败: {str(e)}")
 
 
+@router.get("/embedding/stats", summary="嵌入缓存与微批调度统计", tags=["嵌入模型"])
+async def get_embedding_stats():
+    """嵌入结果缓存命中率与各微批调度器状态"""
+    return {
+        "cache": BaseEmbedding.get_cache_stats(),
+        "batchers": get_embedding_batcher_stats(),
+    }
+
+
 # ==================== 重排序模型API ====================
 
 @router.post("/rerank/similarity", response_model=RerankResponse, summary="相似度计算", tags=["重排序模型"])
@@ -1,14 +1,30 @@
+import hashlib
 import json
 import os
+import time
 from abc import ABC, abstractmethod
+from collections import OrderedDict
 from copy import copy
-from typing import Dict, Any, Optional, Type, TypeVar, Generic
+from typing import Dict, Any, List, Optional, Tuple, Type, TypeVar, Generic
+from app.config.settings import settings
+from app.infrastructure.llms.admission import AdmissionController, get_controller
 from app.utils.common import get_project_base_directory
 
 T = TypeVar('T')
 
 class BaseModelFactory(ABC, Generic[T]):
-    """模型工厂基类，提供通用的模型管理功能"""
+    """
+    模型工厂基类，提供通用的模型管理功能
+
+    create_model 默认复用实例：按 (供应商, 模型, 密钥指纹, base_url, 语言, 生效配置) 缓存，
+    实例及其 SDK 客户端、连接池长期存活，不再每个请求重新建连；空闲超过 llm_registry_idle_ttl
+    或超出 llm_registry_max_instances（LRU）的实例被移出注册表。
+    移出时不主动关闭实例，正在使用它的请求不受影响；模型类可设置 shareable = False 退出复用。
+
+    创建的实例都会挂上所属供应商/模型的准入控制器（见 admission 模块），limits 在配置文件中设置。
+    """
+
+    SWEEP_INTERVAL = 60     # 空闲实例清理间隔（秒）
     
     @property
     @abstractmethod
@@ -24,7 +40,13 @@ class BaseModelFactory(ABC, Generic[T]):
             config_filename: 配置文件名称
         """
         self.config_path = os.path.join(get_project_base_directory(), "app", "config", config_filename)
+        self.config_name = config_filename.split(".")[0]
         self._config = None
+        self._instances: "OrderedDict[Tuple, List[Any]]" = OrderedDict()   # key -> [实例, 最近使用时间, 使用次数]
+        self._last_sweep = time.monotonic()
+        self.instance_hits = 0
+        self.instance_misses = 0
+        self.instance_evictions = 0
         self.load_config()
     
     def load_config(self):
@@ -206,14 +228,16 @@ class BaseModelFactory(ABC, Generic[T]):
         model: Optional[str] = None, 
         api_key: Optional[str] = None, 
         language: Optional[str] = "Chinese", 
+        shared: bool = True,
         **kwargs) -> T:
         """
-        创建模型实例
+        创建模型实例（默认从注册表复用）
         
         Args:
             provider: 供应商名称，如果为None则使用默认值
             model: 模型名称，如果为None则使用默认值
             api_key: API密钥，如果为None则使用配置中的值
+            shared: 是否复用注册表中的实例，False 时总是新建
             **kwargs: 其他参数
             
         Returns:
@@ -253,11 +277,85 @@ class BaseModelFactory(ABC, Generic[T]):
         if not model_class:
             raise ValueError(f"未知的模型类: {provider}")
         
+        api_key = api_key or model_para["api_key"]
+        if not shared or not getattr(model_class, "shareable", True):
+            instance = model_class(api_key=api_key, model_name=model, base_url=model_para["base_url"], language=language, **kwargs)
+            instance._admission = self.get_admission_controller(provider, model)
+            return instance
+
+        now = time.monotonic()
+        if now - self._last_sweep >= self.SWEEP_INTERVAL:
+            self._evict_idle(now)
+        key = self._instance_key(provider, model, api_key, model_para, language, kwargs)
+        entry = self._instances.get(key)
+        if entry is not None:
+            entry[1] = now
+            entry[2] += 1
+            self._instances.move_to_end(key)
+            self.instance_hits += 1
+            return entry[0]
+
         # 创建模型实例
-        return model_class(
-            api_key = api_key or model_para["api_key"],
+        instance = model_class(
+            api_key = api_key,
             model_name = model,
             base_url = model_para["base_url"],
             language = language,
             **kwargs
-        )
\ No newline at end of file
+        )
+        instance._admission = self.get_admission_controller(provider, model)
+        self.instance_misses += 1
+        self._instances[key] = [instance, now, 1]
+        while len(self._instances) > max(1, settings.llm_registry_max_instances):
+            self._instances.popitem(last=False)
+            self.instance_evictions += 1
+        return instance
+
+    def get_admission_controller(self, provider: str, model: str) -> Optional[AdmissionController]:
+        """
+        获取模型的准入控制器：模型配置了 limits 时单独计数（在供应商级 limits 上覆盖），
+        否则与同一供应商的其他模型共用供应商级控制器；未配置 limits 时仍统计并按默认参数熔断
+        """
+        provider_config = self._config.get("models", {}).get(provider, {})
+        limits = dict(provider_config.get("limits") or {})
+        model_limits = provider_config.get("instances", {}).get(model, {}).get("limits")
+        if model_limits:
+            limits.update(model_limits)
+            return get_controller(self.config_name, provider, model, limits)
+        return get_controller(self.config_name, provider, None, limits)
+
+    @staticmethod
+    def _instance_key(provider: str, model: str, api_key: str, model_para: Dict[str, Any], language: Optional[str], kwargs: Dict[str, Any]) -> Tuple:
+        """实例缓存键：密钥只保留指纹，配置规范化为 JSON 字符串"""
+        key_fingerprint = hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:16]
+        config = json.dumps([model_para["model_params"], kwargs], sort_keys=True, ensure_ascii=False, default=repr)
+        return provider, model, key_fingerprint, model_para["base_url"], language, config
+
+    def _evict_idle(self, now: float) -> None:
+        self._last_sweep = now
+        idle_ttl = settings.llm_registry_idle_ttl
+        for key in [k for k, entry in self._instances.items() if now - entry[1] > idle_ttl]:
+            del self._instances[key]
+            self.instance_evictions += 1
+
+    def clear_instances(self) -> None:
+        """清空实例注册表（共享连接池由 http_pool.close_http_clients 关闭）"""
+        self._instances.clear()
+
+    def get_registry_stats(self) -> Dict[str, Any]:
+        """实例注册表统计"""
+        now = time.monotonic()
+        lookups = self.instance_hits + self.instance_misses
+        return {
+            "instances": len(self._instances),
+            "max_instances": settings.llm_registry_max_instances,
+            "idle_ttl": settings.llm_registry_idle_ttl,
+            "hits": self.instance_hits,
+            "misses": self.instance_misses,
+            "evictions": self.instance_evictions,
+            "hit_rate": self.instance_hits / lookups if lookups else 0.0,
+            "models": [
+                {"provider": key[0], "model": key[1], "uses": entry[2], "idle_seconds": round(now - entry[1], 1)}
+                for key, entry in self._instances.items()
+            ],
+        }
\ No newline at end of file
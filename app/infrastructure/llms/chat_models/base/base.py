@@ -16,6 +16,8 @@ from pydantic import BaseModel
 import asyncio
 import logging
 from app.utils.common import is_chinese
+from app.infrastructure.llms.admission import AdmittedMethod, admit_methods, record_call_failed
+from app.infrastructure.llms.chat_models.response_cache import LLM_RESPONSE_CACHE, cached_response
 from app.infrastructure.llms.chat_models.schemes import ChatResponse, AskToolResponse
 
 
@@ -27,6 +29,27 @@ CONNECTION_TIMEOUT = 30  # 连接超时（秒）
 
 class LLM(ABC):
     """LLM基类，提供通用的聊天功能和工具调用支持"""
+
+    def __init_subclass__(cls, **kwargs):
+        # 子类实现的调用方法自动接入供应商准入控制（并发上限、限速、熔断），拒绝时按失败响应返回
+        super().__init_subclass__(**kwargs)
+        admit_methods(cls, {
+            "chat": AdmittedMethod(
+                on_reject=lambda self, message: (ChatResponse(content=message, success=False), 0),
+                is_failure=lambda result: not result[0].success,
+            ),
+            "ask_tools": AdmittedMethod(
+                on_reject=lambda self, message: (AskToolResponse(content=message, success=False), 0),
+                is_failure=lambda result: not result[0].success,
+            ),
+            "chat_stream": AdmittedMethod(kind="stream", on_reject=lambda self, message: (self._create_error_stream(message), 0)),
+            "ask_tools_stream": AdmittedMethod(kind="stream", on_reject=lambda self, message: (self._create_error_stream(message), 0)),
+        })
+        # chat / ask_tools 再套一层响应缓存（调用方传 use_cache=True 开启），命中缓存的请求不占准入名额
+        if "chat" in cls.__dict__:
+            cls.chat = cached_response(cls.__dict__["chat"], "chat")
+        if "ask_tools" in cls.__dict__:
+            cls.ask_tools = cached_response(cls.__dict__["ask_tools"], "tools")
     
     def __init__(self, api_key: str, model_name: str, base_url: Optional[str] = None, language: str = "Chinese", **kwargs):
         """
@@ -153,6 +176,11 @@ class LLM(ABC):
         pass
     
     
+    @staticmethod
+    def get_response_cache_stats() -> Dict[str, Any]:
+        """聊天响应缓存统计（全部聊天模型共享）"""
+        return LLM_RESPONSE_CACHE.get_stats()
+
     def _is_retryable_error(self, error: Exception) -> bool:
         """判断错误是否可重试）"""
         error_str = str(error).lower()
@@ -186,6 +214,7 @@ class LLM(ABC):
     
     def _create_error_stream(self, error_message: str):
         """创建错误流"""
+        record_call_failed(error_message)
         async def error_stream():
             yield str(error_message)
         return error_stream()
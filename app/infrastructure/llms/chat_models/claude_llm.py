@@ -3,6 +3,7 @@ import json
 from typing import Dict, Optional, List, Literal, Union, AsyncGenerator, Any, Tuple
 import logging
 from anthropic import AsyncAnthropic
+from app.infrastructure.llms.http_pool import get_http_client
 from app.infrastructure.llms.chat_models.base.openai_base import OpenAIBase
 from app.infrastructure.llms.chat_models.base.base import MAX_RETRY_ATTEMPTS
 from app.infrastructure.llms.chat_models.schemes import ChatResponse, AskToolResponse, ToolInfo
@@ -28,7 +29,8 @@ class ClaudeModels(OpenAIBase):
         self.client = AsyncAnthropic(
             api_key=api_key,
             base_url=base_url,
-            timeout=60.0
+            timeout=60.0,
+            http_client=get_http_client(base_url),  # 同主机的实例共享连接池
         )
 
     def _format_message(
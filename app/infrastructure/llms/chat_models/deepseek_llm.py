@@ -1,4 +1,5 @@
 from openai import AsyncOpenAI
+from app.infrastructure.llms.http_pool import get_http_client
 from app.infrastructure.llms.chat_models.base.openai_base import OpenAIBase
 from app.infrastructure.llms.chat_models.base.base import CONNECTION_TIMEOUT, MAX_RETRY_ATTEMPTS
 
@@ -23,5 +24,6 @@ class DeepSeekModels(OpenAIBase):
             api_key=api_key,
             base_url=base_url,
             timeout=CONNECTION_TIMEOUT,  # 使用统一超时配置
-            max_retries=MAX_RETRY_ATTEMPTS
+            max_retries=MAX_RETRY_ATTEMPTS,
+            http_client=get_http_client(base_url),  # 同主机的实例共享连接池
         )
\ No newline at end of file
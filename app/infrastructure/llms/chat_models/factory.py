@@ -1,4 +1,4 @@
-from typing import Dict, Type
+from typing import Dict, Optional, Type
 from app.infrastructure.llms.base_factory import BaseModelFactory
 from app.infrastructure.llms.chat_models.base.base import LLM
 from app.infrastructure.llms.chat_models.deepseek_llm import DeepSeekModels
@@ -7,6 +7,7 @@ from app.infrastructure.llms.chat_models.openai_llm import OpenAIModels
 from app.infrastructure.llms.chat_models.qwen_llm import QwenModels
 from app.infrastructure.llms.chat_models.siliconflow_llm import SiliconFlowModels
 from app.infrastructure.llms.chat_models.fuyao_llm import FuYaoModels
+from app.infrastructure.llms.chat_models.router import ChatRouter
 
 # =============================================================================
 # 聊天模型工厂
@@ -28,6 +29,22 @@ class LLMFactory(BaseModelFactory):
     
     def __init__(self):
         super().__init__("chat_models.json")
+        self.router = ChatRouter(self)
+
+    def create_model(self,
+        provider: Optional[str] = None,
+        model: Optional[str] = None,
+        api_key: Optional[str] = None,
+        language: Optional[str] = "Chinese",
+        shared: bool = True,
+        **kwargs) -> LLM:
+        """
+        创建聊天模型实例；未指定供应商且模型名为 routes 中的路由名时，返回在多个目标间路由的模型
+        （路由目标使用各自配置中的 api_key）
+        """
+        if not provider and self.router.has_route(model):
+            return self.router.create_model(model, language=language, **kwargs)
+        return super().create_model(provider, model, api_key, language, shared, **kwargs)
     
 
 # 全局工厂实例
@@ -1,10 +1,9 @@
 import asyncio
 import json
-import httpx
 import logging
-from typing import Dict, Optional, List, Literal, Union, AsyncGenerator, Any, Tuple
-from openai import OpenAI
-from app.infrastructure.llms.chat_models.base.base import CONNECTION_TIMEOUT, MAX_RETRY_ATTEMPTS
+from typing import Dict, Optional, List, Literal, AsyncGenerator, Any, Tuple
+from openai import AsyncOpenAI, DEFAULT_TIMEOUT
+from app.infrastructure.llms.http_pool import get_http_client
 from app.infrastructure.llms.chat_models.base.base import LLM, MAX_RETRY_ATTEMPTS
 from app.infrastructure.llms.chat_models.schemes import ChatResponse, AskToolResponse, ToolInfo
 from app.infrastructure.llms.utils import num_tokens_from_string
@@ -23,15 +22,12 @@ class FuYaoModels(LLM):
         """
         super().__init__(api_key, model_name, base_url, language, **kwargs)
         
-        # 创建OpenAI客户端
-        transport = httpx.HTTPTransport(proxy=None, verify=False)
-        http_client = httpx.Client(transport=transport)
-
-
-        self.client = OpenAI(
+        # 创建OpenAI客户端：平台为内网自签证书且不走代理，连接池按相同选项在实例间共享
+        self.client = AsyncOpenAI(
             base_url=base_url,
             api_key=api_key,
-            http_client=http_client
+            timeout=DEFAULT_TIMEOUT,  # 沿用SDK默认超时，深度思考模式响应较慢
+            http_client=get_http_client(base_url, verify=False, trust_env=False),
         )
 
     def _format_message(
@@ -103,8 +99,7 @@ class FuYaoModels(LLM):
         # 实现重试策略
         for attempt in range(MAX_RETRY_ATTEMPTS):
             try:
-                response = await asyncio.to_thread(
-                    self.client.chat.completions.create,
+                response = await self.client.chat.completions.create(
                     model=self.model_name, 
                     messages=messages, 
                     extra_headers=extra_headers,
@@ -190,8 +185,7 @@ class FuYaoModels(LLM):
         for attempt in range(MAX_RETRY_ATTEMPTS):
             try:
                 # 调用模型接口
-                response = await asyncio.to_thread(
-                    self.client.chat.completions.create,
+                response = await self.client.chat.completions.create(
                     model=self.model_name, 
                     messages=messages, 
                     extra_headers=extra_headers,
@@ -315,8 +309,7 @@ class FuYaoModels(LLM):
         # 实现重试策略
         for attempt in range(MAX_RETRY_ATTEMPTS):
             try:
-                response = await asyncio.to_thread(
-                    self.client.chat.completions.create,
+                response = await self.client.chat.completions.create(
                     model=self.model_name, 
                     messages=messages, 
                     extra_headers=extra_headers,
@@ -417,8 +410,7 @@ class FuYaoModels(LLM):
         # 实现重试策略
         for attempt in range(MAX_RETRY_ATTEMPTS):
             try:
-                response = await asyncio.to_thread(
-                    self.client.chat.completions.create,
+                response = await self.client.chat.completions.create(
                     model=self.model_name, 
                     messages=messages, 
                     extra_headers=extra_headers,
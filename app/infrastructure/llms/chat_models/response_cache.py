@@ -0,0 +1,291 @@
+"""
+聊天响应缓存：调用方按次开启（chat / ask_tools 传 use_cache=True），只缓存 temperature 为 0 的确定性调用
+
+- 精确层：按 (实现类, 模型, 规范化后的全部调用参数) 的 SHA-256 寻址，进程内 LRU + 可选 Redis（带 TTL）；
+- 语义层（可选）：用嵌入模型编码 user_question，在“除问题外其余参数完全相同”的上下文内做余弦相似度检索，
+  相似度不低于阈值的近似问题直接复用已缓存的回答；索引只在进程内，每个上下文限定条数；
+- 只缓存成功的响应；命中时返回的 token 数为 0，统计中累计节省的 token 数（语义层另计嵌入消耗）；
+- 调用参数中含无法确定性序列化的对象（repr 含内存地址等）时不走缓存，计入 bypassed。
+"""
+import dataclasses
+import datetime
+import functools
+import hashlib
+import inspect
+import json
+import logging
+from collections import OrderedDict
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import numpy as np
+from pydantic import BaseModel
+from app.config.settings import settings
+from app.infrastructure.llms.chat_models.schemes import AskToolResponse, ChatResponse
+from app.infrastructure.redis import REDIS_CONN, RedisSpaceEnum
+
+_RESPONSE_TYPES = {"chat": ChatResponse, "tools": AskToolResponse}
+
+
+def _json_default(o: Any) -> Any:
+    """调用参数的确定性序列化；无法确定性表示的对象抛出 TypeError，由调用方绕过缓存"""
+    if isinstance(o, BaseModel):
+        return o.model_dump(mode="json")
+    if isinstance(o, Enum):
+        return o.value
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+    if isinstance(o, (set, frozenset)):
+        return sorted(o, key=lambda v: json.dumps(v, sort_keys=True, default=_json_default))
+    if isinstance(o, (datetime.date, datetime.time)):
+        return o.isoformat()
+    if isinstance(o, bytes):
+        return o.hex()
+    tolist = getattr(o, "tolist", None)
+    if tolist is not None:
+        return tolist()
+    raise TypeError(f"Object of type {type(o).__name__} is not deterministically serializable")
+
+
+def _digest(payload: Any) -> str:
+    text = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=_json_default)
+    return hashlib.sha256(text.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+class _SemanticIndex:
+    """单个上下文内的问题向量索引（已归一化），写满后覆盖最早的条目"""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.vectors: Optional[np.ndarray] = None
+        self.payloads: List[Dict[str, Any]] = []
+        self._next = 0
+
+    def search(self, vector: np.ndarray, threshold: float) -> Tuple[Optional[Dict[str, Any]], float]:
+        if self.vectors is None or not self.payloads:
+            return None, 0.0
+        if vector.shape[0] != self.vectors.shape[1]:
+            # 嵌入模型切换导致维度变化，按未命中处理，下次写入时重建索引
+            return None, 0.0
+        scores = self.vectors[:len(self.payloads)] @ vector
+        best = int(np.argmax(scores))
+        score = float(scores[best])
+        return (self.payloads[best], score) if score >= threshold else (None, score)
+
+    def add(self, vector: np.ndarray, payload: Dict[str, Any]) -> None:
+        if self.vectors is None:
+            self.vectors = np.zeros((self.capacity, vector.shape[0]), dtype=np.float32)
+        elif self.vectors.shape[1] != vector.shape[0]:
+            # 嵌入模型切换导致维度变化，旧索引作废
+            self.vectors = np.zeros((self.capacity, vector.shape[0]), dtype=np.float32)
+            self.payloads, self._next = [], 0
+        slot = self._next
+        self.vectors[slot] = vector
+        if slot < len(self.payloads):
+            self.payloads[slot] = payload
+        else:
+            self.payloads.append(payload)
+        self._next = (slot + 1) % self.capacity
+
+
+class LLMResponseCache:
+    """聊天响应缓存（精确层：进程内 LRU + 可选 Redis；可选语义层）"""
+
+    SPACE = RedisSpaceEnum.LLM
+    MAX_SEMANTIC_CONTEXTS = 256     # 语义索引最多保留的上下文数（LRU）
+
+    def __init__(self, max_entries: int = 2000, use_redis: bool = False, ttl: int = 24 * 3600, enabled: bool = True,
+                 semantic: bool = False, semantic_threshold: float = 0.95, semantic_max_entries: int = 1000,
+                 embedding_model: str = ""):
+        """
+        Args:
+            max_entries: 进程内 LRU 最大条目数
+            use_redis: 是否启用 Redis 层
+            ttl: Redis 缓存有效期（秒）
+            enabled: 总开关，关闭时 use_cache 不生效
+            semantic: 是否启用语义层
+            semantic_threshold: 语义命中的最低余弦相似度
+            semantic_max_entries: 每个上下文的语义索引条数上限
+            embedding_model: 语义层使用的嵌入模型，为空时使用嵌入模型工厂的默认模型
+        """
+        self.enabled = enabled
+        self.max_entries = max(1, max_entries)
+        self.use_redis = use_redis
+        self.ttl = ttl
+        self.semantic = semantic
+        self.semantic_threshold = semantic_threshold
+        self.semantic_max_entries = max(1, semantic_max_entries)
+        self.embedding_model = embedding_model
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._indexes: "OrderedDict[str, _SemanticIndex]" = OrderedDict()
+        self.hits = 0
+        self.redis_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.evictions = 0
+        self.saved_tokens = 0
+        self.embedding_tokens = 0
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """精确层查询"""
+        payload = self._entries.get(key)
+        if payload is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            self.saved_tokens += payload["tokens"]
+            return payload
+
+        if self.use_redis:
+            value = await REDIS_CONN.get(f"llm_resp:{key}", self.SPACE)
+            if value:
+                try:
+                    payload = json.loads(value)
+                    self._put_local(key, payload)
+                    self.redis_hits += 1
+                    self.saved_tokens += payload["tokens"]
+                    return payload
+                except (TypeError, ValueError, KeyError) as e:
+                    logging.warning(f"聊天响应缓存数据无法解析，忽略 {key}: {e}")
+        return None
+
+    async def set(self, key: str, payload: Dict[str, Any]) -> None:
+        self._put_local(key, payload)
+        if self.use_redis:
+            await REDIS_CONN.set(f"llm_resp:{key}", json.dumps(payload, ensure_ascii=False), self.ttl, self.SPACE)
+
+    def _put_local(self, key: str, payload: Dict[str, Any]) -> None:
+        self._entries[key] = payload
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def embed(self, question: str) -> Optional[np.ndarray]:
+        """编码问题文本（归一化），失败时返回 None 且不影响调用"""
+        from app.infrastructure.llms.embedding_models.factory import embedding_factory
+        try:
+            model = embedding_factory.create_model(model=self.embedding_model or None)
+            vector, tokens = await model.encode_queries(question)
+            self.embedding_tokens += tokens or 0
+            vector = np.asarray(vector, dtype=np.float32).reshape(-1)
+            norm = float(np.linalg.norm(vector))
+            return vector / norm if norm else None
+        except Exception as e:
+            logging.warning(f"聊天响应语义缓存编码问题失败，跳过语义层: {e}")
+            return None
+
+    def semantic_get(self, context: str, vector: np.ndarray) -> Optional[Dict[str, Any]]:
+        """语义层查询"""
+        index = self._indexes.get(context)
+        if index is None:
+            return None
+        self._indexes.move_to_end(context)
+        payload, _ = index.search(vector, self.semantic_threshold)
+        if payload is not None:
+            self.semantic_hits += 1
+            self.saved_tokens += payload["tokens"]
+        return payload
+
+    def semantic_add(self, context: str, vector: np.ndarray, payload: Dict[str, Any]) -> None:
+        index = self._indexes.get(context)
+        if index is None:
+            index = self._indexes[context] = _SemanticIndex(self.semantic_max_entries)
+            while len(self._indexes) > self.MAX_SEMANTIC_CONTEXTS:
+                self._indexes.popitem(last=False)
+        self._indexes.move_to_end(context)
+        index.add(vector, payload)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._indexes.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """缓存统计：各层命中与节省的 token 数"""
+        lookups = self.hits + self.redis_hits + self.semantic_hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "use_redis": self.use_redis,
+            "semantic": self.semantic,
+            "semantic_threshold": self.semantic_threshold,
+            "semantic_contexts": len(self._indexes),
+            "semantic_entries": sum(len(index.payloads) for index in self._indexes.values()),
+            "hits": self.hits,
+            "redis_hits": self.redis_hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "evictions": self.evictions,
+            "hit_rate": (self.hits + self.redis_hits + self.semantic_hits) / lookups if lookups else 0.0,
+            "saved_tokens": self.saved_tokens,
+            "embedding_tokens": self.embedding_tokens,
+        }
+
+
+# 全局缓存实例
+LLM_RESPONSE_CACHE = LLMResponseCache(
+    max_entries=settings.llm_response_cache_max_entries,
+    use_redis=settings.llm_response_cache_redis,
+    ttl=settings.llm_response_cache_ttl,
+    enabled=settings.llm_response_cache_enabled,
+    semantic=settings.llm_semantic_cache_enabled,
+    semantic_threshold=settings.llm_semantic_cache_threshold,
+    semantic_max_entries=settings.llm_semantic_cache_max_entries,
+    embedding_model=settings.llm_semantic_cache_embedding_model,
+)
+
+
+def cached_response(func: Callable, kind: str) -> Callable:
+    """
+    为子类的 chat / ask_tools 加响应缓存，调用方传 use_cache=True 开启
+
+    Args:
+        func: 子类实现的方法
+        kind: chat 或 tools，决定缓存命中时重建的响应类型
+    """
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    async def wrapper(self, *args, use_cache: bool = False, **kwargs):
+        cache = LLM_RESPONSE_CACHE
+        if not use_cache or not cache.enabled:
+            return await func(self, *args, **kwargs)
+
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        arguments = dict(bound.arguments)
+        arguments.pop("self", None)
+        params = arguments.pop("kwargs", {}) or {}
+        if params.get("temperature", self.configs.get("temperature", 0.7)) != 0:
+            cache.bypassed += 1
+            return await func(self, *args, **kwargs)
+
+        question = arguments.pop("user_question", "") or ""
+        namespace = [kind, type(self).__name__, self.model_name, self.language, arguments, params]
+        try:
+            key = _digest(namespace + [question])
+        except (TypeError, ValueError) as e:
+            logging.debug(f"聊天响应缓存参数无法确定性序列化，跳过缓存: {e}")
+            cache.bypassed += 1
+            return await func(self, *args, **kwargs)
+        payload = await cache.get(key)
+
+        context, vector = None, None
+        if payload is None and cache.semantic and question:
+            context = _digest(namespace)
+            vector = await cache.embed(question)
+            if vector is not None:
+                payload = cache.semantic_get(context, vector)
+        if payload is not None:
+            return _RESPONSE_TYPES[kind].model_validate(payload["response"]), 0
+
+        cache.misses += 1
+        response, tokens = await func(self, *args, **kwargs)
+        if response.success:
+            payload = {"response": response.model_dump(), "tokens": tokens or 0}
+            await cache.set(key, payload)
+            if vector is not None:
+                cache.semantic_add(context, vector, payload)
+        return response, tokens
+    return wrapper
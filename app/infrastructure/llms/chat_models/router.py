@@ -0,0 +1,335 @@
+"""
+聊天模型路由：把一个逻辑模型名映射到 chat_models.json 中的多个 供应商/模型，运行时按健康度选择与故障转移
+
+配置写在 chat_models.json 顶层的 routes 中：
+
+    "routes": {
+        "chat-default": {
+            "description": "默认对话路由",
+            "strategy": "ordered",          # ordered 按配置顺序；weighted 按权重随机，并按时延、错误率调整
+            "targets": [
+                {"provider": "deepseek", "model": "deepseek-chat", "weight": 3},
+                {"provider": "qwen", "model": "qwen-plus", "weight": 1}
+            ],
+            "hedge": true,                  # 非流式 chat 是否发送对冲请求
+            "hedge_min_delay_ms": 300,      # 对冲等待时间取首选目标 p95 时延，并限制在此区间内
+            "hedge_max_delay_ms": 5000,
+            "hedge_budget": 0.1             # 对冲请求数占总请求数的上限
+        }
+    }
+
+- 每个目标统计 EWMA 时延与错误率，近期错误率过高或已被准入控制熔断的目标排到最后；
+  错误率按距上次样本的时间指数衰减（半衰期 ERROR_HALF_LIFE 秒），不健康的目标一段时间后自动恢复参与排序，
+  恢复后的请求即作为探测，再次失败会重新被判为不健康；
+- chat：首选目标超过 p95 时延仍未返回时，向下一个目标（只有一个目标时向同一目标）再发一次，
+  先成功的结果返回，另一个请求被取消；两者都失败时依次尝试剩余目标；
+- ask_tools：按顺序故障转移；流式方法开始输出后无法切换，只选择当前最优的目标。
+"""
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from typing import Any, Dict, List, Literal, Optional, Tuple
+from app.infrastructure.llms.chat_models.base.base import LLM
+from app.infrastructure.llms.chat_models.schemes import AskToolResponse, ChatResponse
+
+
+class TargetStats:
+    """单个路由目标的时延与错误率统计"""
+
+    EWMA_ALPHA = 0.2         # EWMA 平滑系数
+    LATENCY_WINDOW = 200     # 计算 p95 的最近成功请求数
+    MIN_SAMPLES = 20         # 样本不足时不使用 p95
+    ERROR_HALF_LIFE = 30.0   # 错误率 EWMA 随时间衰减的半衰期（秒）
+
+    def __init__(self, provider: str, model: str):
+        self.provider = provider
+        self.model = model
+        self.ewma_latency: Optional[float] = None
+        self.ewma_error = 0.0
+        self.last_sample = 0.0
+        self.latencies: "deque[float]" = deque(maxlen=self.LATENCY_WINDOW)
+        self.requests = 0
+        self.errors = 0
+        self.cancelled = 0
+
+    def error_rate(self, now: Optional[float] = None) -> float:
+        """按距上次样本的时间衰减后的错误率，没有新样本时不健康的目标也会逐渐恢复"""
+        if not self.ewma_error:
+            return 0.0
+        elapsed = max(0.0, (now or time.monotonic()) - self.last_sample)
+        return self.ewma_error * 0.5 ** (elapsed / self.ERROR_HALF_LIFE)
+
+    def record(self, latency: float, success: bool) -> None:
+        now = time.monotonic()
+        self.requests += 1
+        self.ewma_error = self.EWMA_ALPHA * (0.0 if success else 1.0) + (1 - self.EWMA_ALPHA) * self.error_rate(now)
+        self.last_sample = now
+        if not success:
+            self.errors += 1
+            return
+        self.latencies.append(latency)
+        if self.ewma_latency is None:
+            self.ewma_latency = latency
+        else:
+            self.ewma_latency = self.EWMA_ALPHA * latency + (1 - self.EWMA_ALPHA) * self.ewma_latency
+
+    def p95(self) -> Optional[float]:
+        if len(self.latencies) < self.MIN_SAMPLES:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def get_stats(self) -> Dict[str, Any]:
+        p95 = self.p95()
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "cancelled": self.cancelled,
+            "ewma_latency_ms": round(self.ewma_latency * 1000, 2) if self.ewma_latency is not None else None,
+            "ewma_error_rate": round(self.error_rate(), 4),
+            "p95_ms": round(p95 * 1000, 2) if p95 is not None else None,
+        }
+
+
+class ChatRoute:
+    """一条路由的配置与运行统计"""
+
+    UNHEALTHY_ERROR_RATE = 0.5   # 错误率 EWMA 超过该值的目标排到最后
+
+    def __init__(self, name: str, config: Dict[str, Any]):
+        self.name = name
+        self.targets: List[Dict[str, Any]] = []
+        self.stats: Dict[Tuple[str, str], TargetStats] = {}
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.failovers = 0
+        self.configure(config)
+
+    def configure(self, config: Dict[str, Any]) -> None:
+        self.strategy = config.get("strategy", "ordered")
+        self.hedge = bool(config.get("hedge", False))
+        self.hedge_min_delay = float(config.get("hedge_min_delay_ms", 300)) / 1000
+        self.hedge_max_delay = float(config.get("hedge_max_delay_ms", 5000)) / 1000
+        self.hedge_budget = float(config.get("hedge_budget", 0.1))
+        self.targets = [
+            {"provider": t["provider"], "model": t["model"], "weight": float(t.get("weight", 1))}
+            for t in config.get("targets", [])
+        ]
+        for target in self.targets:
+            key = (target["provider"], target["model"])
+            if key not in self.stats:
+                self.stats[key] = TargetStats(*key)
+
+    def rank(self, candidates: List[Tuple[Dict[str, Any], LLM]]) -> List[Tuple[Dict[str, Any], LLM]]:
+        """按策略排序候选目标，不健康的目标排在最后"""
+        if self.strategy == "weighted":
+            fastest = min((s.ewma_latency for s in self.stats.values() if s.ewma_latency), default=None)
+
+            def sort_key(item):
+                target, _ = item
+                stats = self.stats[(target["provider"], target["model"])]
+                weight = max(target["weight"], 1e-6) * (1 - stats.error_rate()) ** 2
+                if fastest and stats.ewma_latency:
+                    weight *= fastest / stats.ewma_latency
+                # 加权随机排序：权重越大越可能排在前面
+                return -(random.random() ** (1 / max(weight, 1e-6)))
+
+            candidates = sorted(candidates, key=sort_key)
+        return sorted(candidates, key=lambda item: not self._healthy(*item))
+
+    def _healthy(self, target: Dict[str, Any], model: LLM) -> bool:
+        admission = getattr(model, "_admission", None)
+        if admission is not None and admission.state == "open":
+            return False
+        return self.stats[(target["provider"], target["model"])].error_rate() <= self.UNHEALTHY_ERROR_RATE
+
+    def hedge_delay(self, target: Dict[str, Any]) -> float:
+        p95 = self.stats[(target["provider"], target["model"])].p95()
+        if p95 is None:
+            return self.hedge_max_delay
+        return min(max(p95, self.hedge_min_delay), self.hedge_max_delay)
+
+    def allow_hedge(self) -> bool:
+        return self.hedge and self.hedges < self.hedge_budget * self.requests + 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "strategy": self.strategy,
+            "hedge": self.hedge,
+            "requests": self.requests,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "failovers": self.failovers,
+            "targets": {f"{p}/{m}": stats.get_stats() for (p, m), stats in self.stats.items()},
+        }
+
+
+def _drain(task: asyncio.Task) -> None:
+    if task.cancelled():
+        return
+    error = task.exception()
+    if error is not None:
+        logging.debug(f"已取消的对冲请求结束时出错: {error}")
+
+
+class RoutedLLM(LLM):
+    """路由模型：接口与 LLM 一致，调用时在路由目标之间选择"""
+
+    def __init__(self, router: "ChatRouter", route: ChatRoute, language: str = "Chinese", **kwargs):
+        super().__init__(api_key="", model_name=route.name, language=language, **kwargs)
+        self.router = router
+        self.route = route
+
+    def _candidates(self) -> List[Tuple[Dict[str, Any], LLM]]:
+        candidates = []
+        for target in self.route.targets:
+            # 工厂对不支持的模型会回落到默认模型，路由中直接跳过
+            if not self.router.factory.if_model_support(target["provider"], target["model"]):
+                continue
+            try:
+                model = self.router.factory.create_model(target["provider"], target["model"], language=self.language, **self.configs)
+                candidates.append((target, model))
+            except Exception as e:
+                logging.warning(f"路由 {self.route.name} 的目标 {target['provider']}/{target['model']} 不可用: {e}")
+        if not candidates:
+            raise ValueError(f"路由 {self.route.name} 没有可用的目标模型")
+        return self.route.rank(candidates)
+
+    async def _timed(self, target: Dict[str, Any], call, failure: type = ChatResponse) -> Tuple[Any, int]:
+        stats = self.route.stats[(target["provider"], target["model"])]
+        start = time.monotonic()
+        try:
+            response, tokens = await call
+        except asyncio.CancelledError:
+            stats.cancelled += 1
+            raise
+        except Exception as e:
+            stats.record(time.monotonic() - start, False)
+            return failure(content=str(e), success=False), 0
+        stats.record(time.monotonic() - start, response.success)
+        return response, tokens
+
+    async def chat(self,
+                  system_prompt: str,
+                  user_prompt: str,
+                  user_question: str,
+                  history: List[Dict[str, Any]] = None,
+                  **kwargs) -> Tuple[ChatResponse, int]:
+        """非流式对话：首选目标超过 p95 时延时发送对冲请求，失败时依次故障转移"""
+        self.route.requests += 1
+        candidates = self._candidates()
+
+        def call(index: int) -> asyncio.Task:
+            target, model = candidates[index % len(candidates)]
+            return asyncio.ensure_future(self._timed(target, model.chat(system_prompt, user_prompt, user_question, history, **kwargs)))
+
+        index = 0
+        result = (ChatResponse(content="Unexpected error: no route target", success=False), 0)
+        while index < len(candidates):
+            primary = call(index)
+            done, pending = set(), {primary}
+            hedged = None
+            try:
+                if self.route.allow_hedge():
+                    done, pending = await asyncio.wait(pending, timeout=self.route.hedge_delay(candidates[index][0]))
+                    if not done:
+                        # 对冲发往下一个目标，只有一个目标时发往同一目标
+                        hedged = call(index + 1)
+                        self.route.hedges += 1
+                        pending.add(hedged)
+                while True:
+                    for task in done:
+                        result = task.result()
+                        if result[0].success:
+                            if task is hedged:
+                                self.route.hedge_wins += 1
+                            return result
+                    if not pending:
+                        break
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                # 取消落败的请求，并在其结束时取走结果，避免 "exception was never retrieved"
+                for task in pending:
+                    task.cancel()
+                    task.add_done_callback(_drain)
+            # 已对冲的请求消耗了下一个目标
+            index += 2 if hedged is not None else 1
+            if index < len(candidates):
+                self.route.failovers += 1
+                logging.warning(f"路由 {self.route.name} 调用失败，切换到 {candidates[index][0]['provider']}/{candidates[index][0]['model']}: {result[0].content}")
+        return result
+
+    async def ask_tools(self,
+                       system_prompt: str,
+                       user_prompt: str,
+                       user_question: str,
+                       history: List[Dict[str, Any]] = None,
+                       tools: Optional[List[dict]] = None,
+                       tool_choice: Literal["none", "auto", "required"] = "auto",
+                       **kwargs) -> Tuple[AskToolResponse, int]:
+        """工具调用：按排序依次故障转移"""
+        self.route.requests += 1
+        result = (AskToolResponse(content="Unexpected error: no route target", success=False), 0)
+        for position, (target, model) in enumerate(self._candidates()):
+            if position:
+                self.route.failovers += 1
+            result = await self._timed(target, model.ask_tools(system_prompt, user_prompt, user_question, history, tools, tool_choice, **kwargs), AskToolResponse)
+            if result[0].success:
+                return result
+        return result
+
+    async def chat_stream(self,
+                  system_prompt: str,
+                  user_prompt: str,
+                  user_question: str,
+                  history: List[Dict[str, Any]] = None,
+                  **kwargs):
+        """流式对话：使用当前最优目标"""
+        self.route.requests += 1
+        _, model = self._candidates()[0]
+        return await model.chat_stream(system_prompt, user_prompt, user_question, history, **kwargs)
+
+    async def ask_tools_stream(self,
+                       system_prompt: str,
+                       user_prompt: str,
+                       user_question: str,
+                       history: List[Dict[str, Any]] = None,
+                       tools: Optional[List[dict]] = None,
+                       tool_choice: Literal["none", "auto", "required"] = "auto",
+                       **kwargs):
+        """流式工具调用：使用当前最优目标"""
+        self.route.requests += 1
+        _, model = self._candidates()[0]
+        return await model.ask_tools_stream(system_prompt, user_prompt, user_question, history, tools, tool_choice, **kwargs)
+
+
+class ChatRouter:
+    """按 chat_models.json 的 routes 配置创建路由模型"""
+
+    def __init__(self, factory):
+        self.factory = factory
+        self._routes: Dict[str, ChatRoute] = {}
+
+    def get_route_configs(self) -> Dict[str, Any]:
+        return self.factory._config.get("routes", {}) or {}
+
+    def has_route(self, name: Optional[str]) -> bool:
+        return bool(name) and name in self.get_route_configs()
+
+    def create_model(self, name: str, language: Optional[str] = "Chinese", **kwargs) -> RoutedLLM:
+        """创建路由模型，路由统计在同名路由的所有实例间共享"""
+        config = self.get_route_configs().get(name)
+        if config is None:
+            raise ValueError(f"未找到模型路由 '{name}'")
+        route = self._routes.get(name)
+        if route is None:
+            route = self._routes[name] = ChatRoute(name, config)
+        else:
+            route.configure(config)
+        return RoutedLLM(self, route, language=language, **kwargs)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {name: route.get_stats() for name, route in self._routes.items()}
@@ -11,14 +11,32 @@ import logging
 from app.config.settings import Settings
 from app.utils.common import is_english
 from app.aiframework.prompts import get_prompt_template
+from app.infrastructure.llms.admission import AdmittedMethod, admit_methods
 
 # 重试配置常量
 MAX_RETRY_ATTEMPTS = 3  # 最大尝试次数
 RETRY_DELAY = 2  # 重试间隔（秒）
 CONNECTION_TIMEOUT = 30  # 连接超时（秒）
 
+
+def _is_error_result(result: Any) -> bool:
+    """视觉模型以 (**ERROR**: 信息, 0) 的形式返回失败"""
+    return isinstance(result, tuple) and isinstance(result[0], str) and result[0].startswith("**ERROR**")
+
+
 class BaseComputerVision(ABC):
     """计算机视觉模型基类，提供图像描述和视觉聊天功能"""
+
+    def __init_subclass__(cls, **kwargs):
+        # 子类实现的调用方法自动接入供应商准入控制（并发上限、限速、熔断），拒绝时按 **ERROR** 结果返回
+        super().__init_subclass__(**kwargs)
+        rejected = AdmittedMethod(on_reject=lambda self, message: (f"**ERROR**: {message}", 0), is_failure=_is_error_result)
+        admit_methods(cls, {
+            "describe": rejected,
+            "describe_with_prompt": rejected,
+            "chat": rejected,
+            "chat_stream": AdmittedMethod(kind="generator", on_reject=rejected.on_reject, is_failure=_is_error_result),
+        })
     
     def __init__(self, api_key: str, model_name: str, base_url: Optional[str] = None, language: str = "Chinese", **kwargs):
         """
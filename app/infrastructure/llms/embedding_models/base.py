@@ -1,3 +1,5 @@
+import contextvars
+import functools
 import json
 import logging
 import os
@@ -5,21 +7,93 @@ import re
 import threading
 import random
 from abc import ABC, abstractmethod
-from typing import List, Tuple, Any, Optional
+from typing import Dict, List, Tuple, Any, Optional
 from urllib.parse import urljoin
 import numpy as np
 import asyncio
 from app.config.settings import Settings
 from app.infrastructure.llms.utils import num_tokens_from_string, truncate
 from app.utils.common import get_project_base_directory
+from app.infrastructure.llms.admission import AdmittedMethod, admit_methods
+from app.infrastructure.llms.embedding_models.cache import EMBEDDING_CACHE
 
 # 重试配置常量
 MAX_RETRY_ATTEMPTS = 3  # 最大尝试次数
 RETRY_DELAY = 2  # 重试间隔（秒）
 CONNECTION_TIMEOUT = 30  # 连接超时（秒）
 
+# 供应商实现内部再调用 self.encode（如 encode_queries 复用 encode）时不重复查缓存
+_CACHE_BYPASS = contextvars.ContextVar("embedding_cache_bypass", default=False)
+
+
+async def _call_uncached(func, *args):
+    token = _CACHE_BYPASS.set(True)
+    try:
+        return await func(*args)
+    finally:
+        _CACHE_BYPASS.reset(token)
+
+
+def _cached_encode(encode):
+    """为子类的 encode 加缓存：只对未命中的文本（去重后）调用供应商接口，再按原顺序拼回"""
+    @functools.wraps(encode)
+    async def wrapper(self, texts: List[str]) -> Tuple[np.ndarray, int]:
+        if not EMBEDDING_CACHE.enabled or not texts or _CACHE_BYPASS.get():
+            return await encode(self, texts)
+
+        namespace = self._cache_namespace()
+        keys = [EMBEDDING_CACHE.make_key(namespace, t) for t in texts]
+        vectors = await EMBEDDING_CACHE.get_many(keys, texts)
+
+        misses: Dict[str, str] = {}
+        for key, text, vector in zip(keys, texts, vectors):
+            if vector is None:
+                misses.setdefault(key, text)
+
+        total_tokens = 0
+        if misses:
+            embeddings, total_tokens = await _call_uncached(encode, self, list(misses.values()))
+            embeddings = np.asarray(embeddings, dtype=np.float32)
+            # 逐行拷贝，避免缓存条目引用整批数组导致内存按条目统计失真
+            computed = {key: row.copy() for key, row in zip(misses.keys(), embeddings)}
+            await EMBEDDING_CACHE.set_many(computed)
+            vectors = [computed[key] if vector is None else vector for key, vector in zip(keys, vectors)]
+
+        return np.stack(vectors), total_tokens
+    return wrapper
+
+
+def _cached_encode_queries(encode_queries):
+    """为子类的 encode_queries 加缓存；查询向量单独命名空间（部分供应商对查询使用不同的 input_type）"""
+    @functools.wraps(encode_queries)
+    async def wrapper(self, text: str) -> Tuple[np.ndarray, int]:
+        if not EMBEDDING_CACHE.enabled or text is None or _CACHE_BYPASS.get():
+            return await encode_queries(self, text)
+
+        key = EMBEDDING_CACHE.make_key(self._cache_namespace(query=True), text)
+        vector = (await EMBEDDING_CACHE.get_many([key], [text]))[0]
+        if vector is not None:
+            return vector.copy(), 0
+
+        embedding, total_tokens = await _call_uncached(encode_queries, self, text)
+        vector = np.asarray(embedding, dtype=np.float32).reshape(-1)
+        await EMBEDDING_CACHE.set_many({key: vector})
+        return vector.copy(), total_tokens
+    return wrapper
+
+
 class BaseEmbedding(ABC):
     """嵌入模型基类，定义所有嵌入模型必须实现的接口"""
+
+    def __init_subclass__(cls, **kwargs):
+        # 子类实现的 encode / encode_queries 自动接入嵌入结果缓存与供应商准入控制；
+        # 准入在缓存之内，命中缓存的请求不占名额；继承链上只包装一次（子类未重写时沿用父类已包装的方法）
+        super().__init_subclass__(**kwargs)
+        admit_methods(cls, {"encode": AdmittedMethod(), "encode_queries": AdmittedMethod()})
+        if "encode" in cls.__dict__:
+            cls.encode = _cached_encode(cls.__dict__["encode"])
+        if "encode_queries" in cls.__dict__:
+            cls.encode_queries = _cached_encode_queries(cls.__dict__["encode_queries"])
     
     def __init__(self, api_key: str, model_name: str, base_url: Optional[str] = None, **kwargs):
         """
@@ -60,6 +134,16 @@ class BaseEmbedding(ABC):
         """
         pass
 
+    def _cache_namespace(self, query: bool = False) -> str:
+        """嵌入缓存命名空间：供应商（实现类）+ 模型名，查询向量单独区分"""
+        namespace = f"{type(self).__name__}:{self.model_name}"
+        return f"{namespace}:query" if query else namespace
+
+    @staticmethod
+    def get_cache_stats() -> Dict[str, Any]:
+        """嵌入结果缓存统计（全部嵌入模型共享）"""
+        return EMBEDDING_CACHE.get_stats()
+
     def _total_token_count(self, respone = None, texts = None):
         """
         从响应中提取token总数
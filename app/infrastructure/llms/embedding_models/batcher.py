@@ -0,0 +1,267 @@
+"""
+嵌入请求自适应微批调度：按 (供应商, 模型) 合并并发的 encode 调用
+
+- 各调用的文本逐条入队，调度协程在短窗口（max_wait_ms）内凑批，批大小受条数与估算 token 数双重限制；
+  超大请求自然被拆成多批，多个小请求被合并为一批；
+- 批次以有界并发（max_concurrency）发往供应商，结果按条回填给各调用方，token 数按条数比例分摊；
+- 批大小自适应（AIMD）：延迟低于目标时逐步增大，高于目标时按比例缩小，遇到 429 减半并短暂冷却。
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+import numpy as np
+from app.config.settings import settings
+from app.infrastructure.llms.utils import num_tokens_from_string
+from app.infrastructure.llms.embedding_models.base import BaseEmbedding
+
+# 自适应参数
+TARGET_LATENCY = 2.0        # 单批目标延迟（秒）
+MIN_BATCH_SIZE = 1
+THROTTLE_COOLDOWN = 1.0     # 429 后的冷却时间（秒）
+IDLE_TIMEOUT = 60.0         # 调度协程空闲退出时间（秒）
+LATENCY_EWMA_ALPHA = 0.2
+
+EncodeBatch = Callable[[List[str]], Awaitable[Tuple[np.ndarray, int]]]
+
+
+def _is_rate_limited(error: Exception) -> bool:
+    error_str = str(error).lower()
+    return "429" in error_str or "rate limit" in error_str or "too many requests" in error_str
+
+
+class _Item:
+    __slots__ = ("text", "tokens", "future")
+
+    def __init__(self, text: str, tokens: int, future: asyncio.Future):
+        self.text = text
+        self.tokens = tokens
+        self.future = future
+
+
+class EmbeddingBatcher:
+    """单个 (供应商, 模型) 的微批调度器"""
+
+    def __init__(
+        self,
+        encode_batch: EncodeBatch,
+        name: str = "",
+        max_batch_size: int = 64,
+        max_batch_tokens: int = 8192,
+        max_wait_ms: float = 5,
+        max_concurrency: int = 4,
+    ):
+        """
+        Args:
+            encode_batch: 批量编码协程函数，返回 (向量数组, token数)
+            name: 调度器名称，用于日志与统计
+            max_batch_size: 批大小上限（自适应批大小不会超过该值）
+            max_batch_tokens: 单批估算 token 上限（单条超限的文本单独成批）
+            max_wait_ms: 凑批等待窗口（毫秒）
+            max_concurrency: 同时在途的最大批次数
+        """
+        self.encode_batch = encode_batch
+        self.name = name
+        self.max_batch_size = max(MIN_BATCH_SIZE, max_batch_size)
+        self.max_batch_tokens = max(1, max_batch_tokens)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self.max_concurrency = max(1, max_concurrency)
+        self.batch_size = self.max_batch_size
+
+        self._queue: Deque[_Item] = deque()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._inflight: set = set()
+        self._throttle_until = 0.0
+
+        self.batches = 0
+        self.items = 0
+        self.throttles = 0
+        self.errors = 0
+        self.latency_ewma: Optional[float] = None
+
+    async def encode(self, texts: List[str]) -> Tuple[np.ndarray, int]:
+        """
+        提交文本并等待结果
+        Returns:
+            Tuple[np.ndarray, int]: (按输入顺序的向量数组, 分摊的 token 数)
+        """
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32), 0
+
+        loop = asyncio.get_running_loop()
+        futures = []
+        for text in texts:
+            future = loop.create_future()
+            self._queue.append(_Item(text, num_tokens_from_string(text), future))
+            futures.append(future)
+        self._ensure_worker()
+        self._wakeup.set()
+
+        results = await asyncio.gather(*futures)
+        vectors = np.stack([vector for vector, _ in results])
+        return vectors, int(round(sum(tokens for _, tokens in results)))
+
+    def _ensure_worker(self):
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+    async def _run(self):
+        """调度协程：凑批并有界并发地派发"""
+        while True:
+            if not self._queue:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), IDLE_TIMEOUT)
+                except asyncio.TimeoutError:
+                    if not self._queue:
+                        return
+                continue
+
+            # 队列未满一批时等待一个窗口，让并发请求汇入
+            if len(self._queue) < self.batch_size and self.max_wait > 0:
+                await asyncio.sleep(self.max_wait)
+
+            delay = self._throttle_until - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            await self._semaphore.acquire()
+            batch = self._take_batch()
+            if not batch:
+                self._semaphore.release()
+                continue
+            task = asyncio.create_task(self._dispatch(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    def _take_batch(self) -> List[_Item]:
+        batch: List[_Item] = []
+        tokens = 0
+        while self._queue and len(batch) < self.batch_size:
+            item = self._queue[0]
+            if item.future.done():  # 调用方已取消
+                self._queue.popleft()
+                continue
+            if batch and tokens + item.tokens > self.max_batch_tokens:
+                break
+            batch.append(self._queue.popleft())
+            tokens += item.tokens
+        return batch
+
+    async def _dispatch(self, batch: List[_Item]):
+        start = time.monotonic()
+        try:
+            vectors, total_tokens = await self.encode_batch([item.text for item in batch])
+            if len(vectors) != len(batch):
+                raise ValueError(f"嵌入结果数量 {len(vectors)} 与请求文本数量 {len(batch)} 不一致")
+        except Exception as e:
+            self.errors += 1
+            if _is_rate_limited(e):
+                self._on_throttle()
+            for item in batch:
+                if not item.future.done():
+                    item.future.set_exception(e)
+            return
+        finally:
+            self._semaphore.release()
+
+        self._on_success(time.monotonic() - start)
+        self.items += len(batch)
+        share = (total_tokens or 0) / len(batch)
+        for item, vector in zip(batch, vectors):
+            if not item.future.done():
+                item.future.set_result((vector, share))
+
+    def _on_success(self, latency: float):
+        self.batches += 1
+        if self.latency_ewma is None:
+            self.latency_ewma = latency
+        else:
+            self.latency_ewma = LATENCY_EWMA_ALPHA * latency + (1 - LATENCY_EWMA_ALPHA) * self.latency_ewma
+
+        if latency <= TARGET_LATENCY:
+            step = max(1, self.batch_size // 4)
+            self.batch_size = min(self.max_batch_size, self.batch_size + step)
+        else:
+            self.batch_size = max(MIN_BATCH_SIZE, int(self.batch_size * 0.75))
+
+    def _on_throttle(self):
+        self.throttles += 1
+        self.batch_size = max(MIN_BATCH_SIZE, self.batch_size // 2)
+        self._throttle_until = time.monotonic() + THROTTLE_COOLDOWN
+        logging.warning(f"嵌入模型 {self.name} 触发限流，批大小降为 {self.batch_size}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "batch_size": self.batch_size,
+            "max_batch_size": self.max_batch_size,
+            "queued": len(self._queue),
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": self.items / self.batches if self.batches else 0.0,
+            "throttles": self.throttles,
+            "errors": self.errors,
+            "latency_ewma": self.latency_ewma,
+        }
+
+
+_BATCHERS: Dict[tuple, EmbeddingBatcher] = {}
+
+
+def _model_key(model: BaseEmbedding) -> tuple:
+    """模型实例的配置标识：同一供应商/模型但 base_url、密钥或参数不同的实例使用不同的调度器"""
+    api_key = hashlib.sha256(str(model.api_key or "").encode("utf-8")).hexdigest()[:16]
+    configs = json.dumps(model.configs, sort_keys=True, ensure_ascii=False, default=str)
+    return type(model).__name__, model.model_name, model.base_url, api_key, configs
+
+
+def get_embedding_batcher(model: BaseEmbedding, query: bool = False) -> EmbeddingBatcher:
+    """
+    获取模型实例配置对应的调度器，首次调用时以该模型实例创建（配置相同的实例可互相替代）
+    Args:
+        model: 嵌入模型实例
+        query: 是否为查询编码；查询逐条走 encode_queries（部分供应商查询与文档向量不同），
+               只做并发控制与限流自适应，不合并为一次接口调用
+    """
+    key = _model_key(model) + (query,)
+    batcher = _BATCHERS.get(key)
+    if batcher is not None:
+        return batcher
+
+    if query:
+        # 一批查询逐条调用，同时在途的调用数不超过 max_concurrency（与批次并发上限一致）
+        semaphore = asyncio.Semaphore(max(1, settings.embedding_batch_max_concurrency))
+
+        async def encode_query(text: str) -> Tuple[np.ndarray, int]:
+            async with semaphore:
+                return await model.encode_queries(text)
+
+        async def encode_batch(texts: List[str]) -> Tuple[np.ndarray, int]:
+            results = await asyncio.gather(*(encode_query(t) for t in texts))
+            return np.stack([np.asarray(v).reshape(-1) for v, _ in results]), sum(t for _, t in results)
+    else:
+        encode_batch = model.encode
+
+    batcher = EmbeddingBatcher(
+        encode_batch,
+        name=f"{key[0]}:{key[1]}{':query' if query else ''}",
+        max_batch_size=settings.embedding_batch_max_size,
+        max_batch_tokens=settings.embedding_batch_max_tokens,
+        max_wait_ms=settings.embedding_batch_max_wait_ms,
+        max_concurrency=settings.embedding_batch_max_concurrency,
+    )
+    _BATCHERS[key] = batcher
+    return batcher
+
+
+def get_embedding_batcher_stats() -> List[Dict[str, Any]]:
+    return [batcher.get_stats() for batcher in _BATCHERS.values()]
@@ -0,0 +1,144 @@
+"""
+嵌入结果缓存：按 (供应商, 模型, 文本哈希) 内容寻址，所有 BaseEmbedding 子类共享
+
+- 进程内 LRU：向量统一存为 float32，按字节数限额淘汰；
+- 持久层（可选）：Redis，值为 "f32:" + base64(float32 字节)，批量 MGET 读取、管道 SETEX 写入；
+- 统计：命中（内存 / Redis）、未命中、淘汰次数，以及命中文本估算节省的 token 数。
+"""
+import base64
+import hashlib
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence
+import numpy as np
+from app.config.settings import settings
+from app.infrastructure.llms.utils import num_tokens_from_string
+from app.infrastructure.redis import REDIS_CONN, RedisSpaceEnum
+
+_VALUE_PREFIX = "f32:"
+
+
+class EmbeddingCache:
+    """嵌入向量两级缓存"""
+
+    SPACE = RedisSpaceEnum.LLM
+
+    def __init__(self, max_bytes: int, use_redis: bool = False, ttl: int = 7 * 24 * 3600, enabled: bool = True):
+        """
+        Args:
+            max_bytes: 进程内缓存最大字节数
+            use_redis: 是否启用 Redis 持久层
+            ttl: Redis 缓存有效期（秒）
+            enabled: 是否启用缓存
+        """
+        self.enabled = enabled
+        self.max_bytes = max(0, max_bytes)
+        self.use_redis = use_redis
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.saved_tokens = 0
+
+    @staticmethod
+    def make_key(namespace: str, text: str) -> str:
+        """namespace 形如 provider:model[:query]"""
+        digest = hashlib.sha1(text.encode("utf-8", "surrogatepass")).hexdigest()
+        return f"emb:{namespace}:{digest}"
+
+    async def get_many(self, keys: Sequence[str], texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """批量查询，未命中位置为 None"""
+        vectors: List[Optional[np.ndarray]] = []
+        remote_idx = []
+        for i, key in enumerate(keys):
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                self.saved_tokens += num_tokens_from_string(texts[i])
+            else:
+                remote_idx.append(i)
+            vectors.append(vector)
+
+        if remote_idx and self.use_redis:
+            values = await REDIS_CONN.mget([keys[i] for i in remote_idx], self.SPACE)
+            for i, value in zip(remote_idx, values):
+                vector = self._decode(value)
+                if vector is None:
+                    continue
+                vectors[i] = vector
+                self._put_local(keys[i], vector)
+                self.redis_hits += 1
+                self.saved_tokens += num_tokens_from_string(texts[i])
+
+        self.misses += sum(1 for v in vectors if v is None)
+        return vectors
+
+    async def set_many(self, mapping: Dict[str, np.ndarray]) -> None:
+        """批量写入，向量已为 float32"""
+        for key, vector in mapping.items():
+            self._put_local(key, vector)
+        if not self.use_redis or not mapping:
+            return
+        async with REDIS_CONN.batch(self.SPACE) as batch:
+            for key, vector in mapping.items():
+                batch.set(key, self._encode(vector), exp=self.ttl)
+
+    def _put_local(self, key: str, vector: np.ndarray) -> None:
+        if vector.nbytes > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old.nbytes
+        self._entries[key] = vector
+        self._bytes += vector.nbytes
+        while self._bytes > self.max_bytes and self._entries:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.nbytes
+            self.evictions += 1
+
+    @staticmethod
+    def _encode(vector: np.ndarray) -> str:
+        return _VALUE_PREFIX + base64.b64encode(vector.tobytes()).decode("ascii")
+
+    @staticmethod
+    def _decode(value: Any) -> Optional[np.ndarray]:
+        if not isinstance(value, str) or not value.startswith(_VALUE_PREFIX):
+            return None
+        try:
+            vector = np.frombuffer(base64.b64decode(value[len(_VALUE_PREFIX):]), dtype=np.float32)
+        except (ValueError, TypeError):
+            return None
+        return vector
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """缓存统计：命中率与节省的 token 数"""
+        lookups = self.hits + self.redis_hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "use_redis": self.use_redis,
+            "hits": self.hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": (self.hits + self.redis_hits) / lookups if lookups else 0.0,
+            "saved_tokens": self.saved_tokens,
+        }
+
+
+# 全局缓存实例
+EMBEDDING_CACHE = EmbeddingCache(
+    max_bytes=settings.embedding_cache_max_bytes,
+    use_redis=settings.embedding_cache_redis,
+    ttl=settings.embedding_cache_ttl,
+    enabled=settings.embedding_cache_enabled,
+)
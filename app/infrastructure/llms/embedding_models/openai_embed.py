@@ -3,6 +3,7 @@ import numpy as np
 import logging
 import asyncio
 from openai import AsyncOpenAI
+from app.infrastructure.llms.http_pool import get_http_client
 from app.infrastructure.llms.embedding_models.base import BaseEmbedding, CONNECTION_TIMEOUT, MAX_RETRY_ATTEMPTS
 from app.infrastructure.llms.utils import truncate
 
@@ -25,7 +26,8 @@ class OpenAIEmbed(BaseEmbedding):
             api_key=api_key, 
             base_url=base_url,
             timeout=CONNECTION_TIMEOUT,
-            max_retries=MAX_RETRY_ATTEMPTS
+            max_retries=MAX_RETRY_ATTEMPTS,
+            http_client=get_http_client(base_url),  # 同主机的实例共享连接池
         )
 
     async def encode(self, texts: List[str]) -> Tuple[np.ndarray, int]:
@@ -0,0 +1,94 @@
+"""
+模型服务共享 HTTP 连接池
+
+同一主机（scheme + host + port）且连接选项相同的所有模型实例共用一个 httpx.AsyncClient：
+- 已建立的 TCP/TLS 连接在实例之间复用，新建模型实例不再重新握手；
+- 安装了 h2 时启用 HTTP/2（同一连接多路复用并发请求），否则使用 HTTP/1.1 keep-alive；
+- 请求超时仍由各 SDK 按请求传入，连接池只负责连接数量与保活；
+- verify / trust_env 不同的调用方（如关闭证书校验、不走环境代理的内网平台）使用各自独立的连接池；
+- 共享客户端由 close_http_clients 在应用关闭时统一关闭，模型实例不要自行关闭它。
+"""
+import logging
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+import httpx
+from app.config.settings import settings
+
+try:
+    import h2  # noqa: F401
+    _HTTP2_AVAILABLE = True
+except ImportError:
+    _HTTP2_AVAILABLE = False
+
+DEFAULT_TIMEOUT = 60.0
+
+PoolKey = Tuple[str, str, Optional[int], bool, bool]
+
+_CLIENTS: Dict[PoolKey, httpx.AsyncClient] = {}
+_REQUESTS: Dict[PoolKey, int] = {}
+
+
+def _pool_key(base_url: Optional[str], verify: bool, trust_env: bool) -> PoolKey:
+    parts = urlsplit(base_url or "")
+    return parts.scheme or "https", parts.hostname or "", parts.port, verify, trust_env
+
+
+def get_http_client(base_url: Optional[str], verify: bool = True, trust_env: bool = True) -> httpx.AsyncClient:
+    """
+    获取 base_url 所在主机的共享客户端，首次调用时创建
+
+    Args:
+        base_url: 模型服务地址
+        verify: 是否校验 TLS 证书
+        trust_env: 是否读取环境变量中的代理与证书配置，False 时直连
+    """
+    key = _pool_key(base_url, verify, trust_env)
+    client = _CLIENTS.get(key)
+    if client is not None and not client.is_closed:
+        return client
+
+    async def count_request(request: httpx.Request) -> None:
+        _REQUESTS[key] = _REQUESTS.get(key, 0) + 1
+
+    client = httpx.AsyncClient(
+        http2=settings.llm_http2 and _HTTP2_AVAILABLE,
+        verify=verify,
+        trust_env=trust_env,
+        timeout=DEFAULT_TIMEOUT,
+        limits=httpx.Limits(
+            max_connections=settings.llm_http_max_connections,
+            max_keepalive_connections=settings.llm_http_max_keepalive,
+            keepalive_expiry=settings.llm_http_keepalive_expiry,
+        ),
+        event_hooks={"request": [count_request]},
+    )
+    _CLIENTS[key] = client
+    return client
+
+
+def get_http_pool_stats() -> Dict[str, Dict[str, Any]]:
+    """各主机连接池统计：累计请求数、当前连接数与空闲连接数"""
+    stats = {}
+    for key, client in _CLIENTS.items():
+        scheme, host, port, verify, trust_env = key
+        item: Dict[str, Any] = {"requests": _REQUESTS.get(key, 0), "http2": settings.llm_http2 and _HTTP2_AVAILABLE, "closed": client.is_closed}
+        pool = getattr(getattr(client, "_transport", None), "_pool", None)
+        connections = getattr(pool, "connections", None)
+        if connections is not None:
+            item["connections"] = len(connections)
+            item["idle_connections"] = sum(1 for conn in connections if conn.is_idle())
+        name = f"{scheme}://{host}{f':{port}' if port else ''}"
+        if not verify or not trust_env:
+            name += f" (verify={verify}, trust_env={trust_env})"
+        stats[name] = item
+    return stats
+
+
+async def close_http_clients() -> None:
+    """关闭全部共享客户端"""
+    for key, client in list(_CLIENTS.items()):
+        try:
+            await client.aclose()
+        except Exception as e:
+            logging.warning(f"关闭模型服务HTTP连接池失败 {key[1]}: {e}")
+    _CLIENTS.clear()
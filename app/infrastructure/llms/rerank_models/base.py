@@ -6,6 +6,7 @@ from abc import ABC, abstractmethod
 from typing import List, Tuple, Any, Optional
 import numpy as np
 from app.config.settings import Settings
+from app.infrastructure.llms.admission import AdmittedMethod, admit_methods
 from app.infrastructure.llms.utils import num_tokens_from_string
 
 # 重试配置常量
@@ -16,6 +17,11 @@ CONNECTION_TIMEOUT = 30  # 连接超时（秒）
 
 class BaseRank(ABC):
     """重排序模型基类，用于对检索结果进行重新排序"""
+
+    def __init_subclass__(cls, **kwargs):
+        # 子类实现的 similarity 自动接入供应商准入控制（并发上限、限速、熔断），拒绝时抛出 ModelAdmissionError
+        super().__init_subclass__(**kwargs)
+        admit_methods(cls, {"similarity": AdmittedMethod()})
     
     def __init__(self, api_key: str, model_name: str, base_url: Optional[str] = None, **kwargs):
         """
@@ -4,6 +4,7 @@ import random
 import logging
 from abc import ABC, abstractmethod
 from typing import Tuple, Any, Optional
+from app.infrastructure.llms.admission import AdmittedMethod, admit_methods
 from app.infrastructure.llms.utils import num_tokens_from_string
 
 # 重试配置常量
@@ -14,6 +15,11 @@ CONNECTION_TIMEOUT = 30  # 连接超时（秒）
 
 class BaseSTT(ABC):
     """语音转文本模型基类，提供语音转文本功能"""
+
+    def __init_subclass__(cls, **kwargs):
+        # 子类实现的 stt 自动接入供应商准入控制（并发上限、限速、熔断），拒绝时抛出 ModelAdmissionError
+        super().__init_subclass__(**kwargs)
+        admit_methods(cls, {"stt": AdmittedMethod()})
     
     def __init__(self, api_key: str, model_name: str, base_url: Optional[str] = None, **kwargs):
         """
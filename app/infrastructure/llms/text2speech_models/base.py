@@ -3,6 +3,7 @@ import random
 import logging
 from abc import ABC, abstractmethod
 from typing import Generator, Any, Optional, Tuple
+from app.infrastructure.llms.admission import AdmittedMethod, admit_methods
 from app.infrastructure.llms.utils import num_tokens_from_string
 
 # 重试配置常量
@@ -13,6 +14,11 @@ CONNECTION_TIMEOUT = 30  # 连接超时（秒）
 
 class BaseTTS(ABC):
     """文本转语音模型基类，提供TTS功能"""
+
+    def __init_subclass__(cls, **kwargs):
+        # 子类实现的 tts 自动接入供应商准入控制，音频流读完或关闭时才归还名额
+        super().__init_subclass__(**kwargs)
+        admit_methods(cls, {"tts": AdmittedMethod(kind="stream")})
     
     def __init__(self, api_key: str, model_name: str, base_url: Optional[str] = None, **kwargs):
         """
@@ -24,6 +24,7 @@ class SparkTTS(BaseTTS):
     STATUS_FIRST_FRAME = 0
     STATUS_CONTINUE_FRAME = 1
     STATUS_LAST_FRAME = 2
+    shareable = False       # 音频队列挂在实例上，并发请求会互相串流，不进入工厂实例注册表
 
     def __init__(self, api_key: str, model_name: str, base_url: Optional[str] = None, **kwargs):
         """
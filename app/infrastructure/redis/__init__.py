@@ -1,4 +1,6 @@
 from .factory import RedisSpaceEnum, REDIS_CONN, RedisDistributedLock
+from .batch import RedisBatch
+from .stream_consumer import RedisStreamConsumer
 
 __all__ = [
     # Redis空间枚举
@@ -7,4 +9,8 @@ __all__ = [
     "REDIS_CONN",
     # Redis分布式锁
     "RedisDistributedLock",
+    # Redis批量操作
+    "RedisBatch",
+    # Redis Streams消费运行时
+    "RedisStreamConsumer",
 ]
@@ -0,0 +1,251 @@
+"""
+Redis 批量操作：在上下文中排队类型化操作，退出时以管道（或事务）一次发出
+
+用法:
+    async with REDIS_CONN.batch(RedisSpaceEnum.BUSINESS) as batch:
+        batch.set_obj("k1", {"a": 1}, exp=600)
+        batch.hset("h", "f", [1, 2])
+        batch.sadd("s", "m1", "m2")
+        batch.expire("h", 600)
+    batch.results  # 按排队顺序、逐操作解码后的结果
+
+- 序列化与解码规则与 RedisClient 单键方法一致（dict/list 自动 JSON，读取时尝试 JSON 解析）；
+- 单条失败不影响其他操作，该位置返回与单键方法相同的默认值并计入 errors；
+- 非事务模式下超过 chunk_size 的批次自动分块发送；事务模式整批一个 MULTI/EXEC，不分块；
+- 每块发出后对其中写操作涉及的键调用 on_write，RedisClient 借此失效客户端缓存（与单键写方法一致）。
+"""
+import json
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from redis.asyncio import Redis
+
+DEFAULT_CHUNK_SIZE = 1000
+
+
+def _dumps(value: Any) -> str:
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return str(value)
+
+
+def _loads(value: Any, default: Any = None) -> Any:
+    if value is None:
+        return default
+    try:
+        return json.loads(value)
+    except (json.JSONDecodeError, TypeError):
+        return value
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+class _Op:
+    __slots__ = ("name", "target", "apply", "decode", "default", "writes")
+
+    def __init__(self, name: str, target: str, apply: Callable, decode: Callable[[Any], Any], default: Any,
+                 writes: Tuple[str, ...] = ()):
+        self.name = name
+        self.target = target
+        self.apply = apply
+        self.decode = decode
+        self.default = default
+        self.writes = writes
+
+
+class RedisBatch:
+    """类型化批量操作，排队后以管道一次往返发送"""
+
+    def __init__(self, client: Redis, transaction: bool = False, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 on_write: Optional[Callable[..., None]] = None):
+        """
+        Args:
+            client: Redis 客户端
+            transaction: 是否以 MULTI/EXEC 事务执行（整批原子，不分块）
+            chunk_size: 非事务模式下每个管道的最大命令数
+            on_write: 每块发出后以写操作涉及的键调用，用于失效客户端缓存
+        """
+        self.client = client
+        self.transaction = transaction
+        self.chunk_size = max(1, chunk_size)
+        self.on_write = on_write
+        self._ops: List[_Op] = []
+        self.results: List[Any] = []
+        self.errors = 0
+
+    def __len__(self) -> int:
+        return len(self._ops)
+
+    async def __aenter__(self) -> "RedisBatch":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            await self.execute()
+        else:
+            self._ops.clear()
+
+    def _add(self, name: str, target: str, apply: Callable, decode: Callable = bool, default: Any = False,
+             writes: Tuple[str, ...] = ()) -> int:
+        """排队一个操作，返回其在 results 中的下标；writes 为该操作修改的键"""
+        self._ops.append(_Op(name, target, apply, decode, default, writes))
+        return len(self.results) + len(self._ops) - 1
+
+    # =============================================================================
+    # 基础操作
+    # =============================================================================
+
+    def exist(self, k: str) -> int:
+        return self._add("EXISTS", k, lambda p: p.exists(k))
+
+    def get(self, k: str) -> int:
+        return self._add("GET", k, lambda p: p.get(k), _identity, None)
+
+    def set(self, k: str, v: Any, exp: int = 3600) -> int:
+        return self._add("SET", k, lambda p: p.setex(k, exp, v), writes=(k,))
+
+    def set_obj(self, k: str, obj: Any, exp: int = 3600) -> int:
+        value = json.dumps(obj, ensure_ascii=False)
+        return self._add("SET_OBJ", k, lambda p: p.setex(k, exp, value), writes=(k,))
+
+    def get_obj(self, k: str, default: Any = None) -> int:
+        return self._add("GET", k, lambda p: p.get(k), lambda v: _loads(v, default), default)
+
+    def delete(self, *keys: str) -> int:
+        return self._add("DELETE", ",".join(keys), lambda p: p.delete(*keys), int, 0, keys)
+
+    def incr(self, k: str, amount: int = 1) -> int:
+        return self._add("INCR", k, lambda p: p.incrby(k, amount), _identity, None, (k,))
+
+    # =============================================================================
+    # 哈希操作
+    # =============================================================================
+
+    def hset(self, name: str, key: str, value: Any) -> int:
+        value = _dumps(value)
+        return self._add("HSET", f"{name}.{key}", lambda p: p.hset(name, key, value), writes=(name,))
+
+    def hset_many(self, name: str, mapping: Dict[str, Any]) -> int:
+        """一次写入多个字段，结果为新增字段数"""
+        values = {k: _dumps(v) for k, v in mapping.items()}
+        return self._add("HSET", name, lambda p: p.hset(name, mapping=values), int, 0, (name,))
+
+    def hget(self, name: str, key: str, default: Any = None) -> int:
+        return self._add("HGET", f"{name}.{key}", lambda p: p.hget(name, key), lambda v: _loads(v, default), default)
+
+    def hgetall(self, name: str) -> int:
+        return self._add(
+            "HGETALL", name, lambda p: p.hgetall(name),
+            lambda data: {k: _loads(v) for k, v in (data or {}).items()}, {},
+        )
+
+    def hdel(self, name: str, *keys: str) -> int:
+        return self._add("HDEL", name, lambda p: p.hdel(name, *keys), int, 0, (name,))
+
+    # =============================================================================
+    # 列表操作
+    # =============================================================================
+
+    def lpush(self, name: str, *values: Any) -> int:
+        str_values = [_dumps(v) for v in values]
+        return self._add("LPUSH", name, lambda p: p.lpush(name, *str_values), int, 0, (name,))
+
+    def rpop(self, name: str, default: Any = None) -> int:
+        return self._add("RPOP", name, lambda p: p.rpop(name), lambda v: _loads(v, default), default, (name,))
+
+    # =============================================================================
+    # 集合 / 有序集合操作
+    # =============================================================================
+
+    def sadd(self, key: str, *members: str) -> int:
+        return self._add("SADD", key, lambda p: p.sadd(key, *members), int, 0, (key,))
+
+    def srem(self, key: str, *members: str) -> int:
+        return self._add("SREM", key, lambda p: p.srem(key, *members), int, 0, (key,))
+
+    def sismember(self, key: str, member: str) -> int:
+        return self._add("SISMEMBER", key, lambda p: p.sismember(key, member))
+
+    def zadd(self, key: str, member: str, score: float) -> int:
+        return self._add("ZADD", key, lambda p: p.zadd(key, {member: score}), writes=(key,))
+
+    def zadd_many(self, key: str, mapping: Dict[str, float]) -> int:
+        """一次添加多个成员，结果为新增成员数"""
+        return self._add("ZADD", key, lambda p: p.zadd(key, mapping), int, 0, (key,))
+
+    # =============================================================================
+    # 消息队列操作
+    # =============================================================================
+
+    def queue_product(self, queue: str, message: Any) -> int:
+        """生产消息到队列（格式与 RedisClient.queue_product 一致），结果为消息ID"""
+        payload = {"message": json.dumps(message, ensure_ascii=False)}
+        return self._add("XADD", queue, lambda p: p.xadd(queue, payload), _identity, None)
+
+    # =============================================================================
+    # 过期时间操作
+    # =============================================================================
+
+    def expire(self, key: str, seconds: int) -> int:
+        return self._add("EXPIRE", key, lambda p: p.expire(key, seconds), writes=(key,))
+
+    def ttl(self, key: str) -> int:
+        return self._add("TTL", key, lambda p: p.ttl(key), _identity, -2)
+
+    # =============================================================================
+    # 执行
+    # =============================================================================
+
+    async def execute(self) -> List[Any]:
+        """
+        发送所有排队的操作并清空队列
+        Returns:
+            List[Any]: 累计的逐操作结果（与 results 相同）
+        """
+        ops, self._ops = self._ops, []
+        if not ops:
+            return self.results
+
+        chunk_size = len(ops) if self.transaction else self.chunk_size
+        for start in range(0, len(ops), chunk_size):
+            chunk = ops[start:start + chunk_size]
+            try:
+                self.results.extend(await self._execute_chunk(chunk))
+            finally:
+                self._invalidate(chunk)
+        return self.results
+
+    def _invalidate(self, chunk: List[_Op]) -> None:
+        """块发出后失效写操作涉及的键（失败的写也失效，只会多一次回源）"""
+        if self.on_write is None:
+            return
+        keys = {key for op in chunk for key in op.writes}
+        if keys:
+            self.on_write(*keys)
+
+    async def _execute_chunk(self, chunk: List[_Op]) -> List[Any]:
+        try:
+            pipe = self.client.pipeline(transaction=self.transaction)
+            for op in chunk:
+                op.apply(pipe)
+            raw = await pipe.execute(raise_on_error=False)
+        except Exception as e:
+            self.errors += len(chunk)
+            logging.warning(f"Redis批量操作失败（{len(chunk)}条）: {e}")
+            return [op.default for op in chunk]
+
+        results = []
+        for op, value in zip(chunk, raw):
+            if isinstance(value, Exception):
+                self.errors += 1
+                logging.warning(f"Redis {op.name}操作失败 {op.target}: {value}")
+                results.append(op.default)
+                continue
+            try:
+                results.append(op.decode(value))
+            except Exception as e:
+                self.errors += 1
+                logging.warning(f"Redis {op.name}结果解析失败 {op.target}: {e}")
+                results.append(op.default)
+        return results
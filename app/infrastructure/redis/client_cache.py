@@ -0,0 +1,235 @@
+"""
+Redis 客户端缓存（服务端辅助失效）
+
+热点读多写少的键（配置、会话等）经 RedisClient.get / hget 读取后缓存在进程内，
+由 Redis 的 CLIENT TRACKING 广播模式（BCAST，可按键前缀）推送失效通知：
+- 订阅连接：独立连接，获取 CLIENT ID 后订阅 __redis__:invalidate；
+- 控制连接：独立连接，执行 CLIENT TRACKING ON REDIRECT <订阅连接ID> BCAST [PREFIX ...] 并保持打开；
+- 读取前记录失效序号，读取期间若发生任何失效则不写入缓存，避免把旧值缓存下来；
+- 订阅连接断开时清空缓存并停用，之后按重连间隔重新建立；条目另有 TTL 兜底；
+- 控制连接断开后服务端即停止跟踪且不会通知订阅连接，因此订阅连接空闲 HEARTBEAT_INTERVAL 秒即 PING 一次控制连接，
+  控制连接已断开（redis-py 会静默重连，新连接未开启跟踪）或 PING 失败时同样清空缓存并停用。
+
+redis-py 5.x 的 asyncio 客户端未暴露 RESP3 推送消息，这里采用 RESP2 的 REDIRECT 方式实现同样的服务端辅助失效。
+"""
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set, Tuple
+from redis.asyncio import Connection
+
+INVALIDATE_CHANNEL = "__redis__:invalidate"
+RECONNECT_INTERVAL = 5.0
+HEARTBEAT_INTERVAL = 5.0   # 订阅连接空闲多久检查一次控制连接（秒）
+MISSING = object()
+
+CacheKey = Tuple[int, str, Optional[str]]   # (空间, 键, 哈希字段)
+
+
+class RedisClientCache:
+    """进程内 LRU + 服务端失效跟踪"""
+
+    def __init__(self, connection_kwargs: Dict[str, Any], max_entries: int = 10000, ttl: int = 300,
+                 prefixes: Optional[List[str]] = None, enabled: bool = False):
+        """
+        Args:
+            connection_kwargs: 建立跟踪连接所需的连接参数（host/port/password 等）
+            max_entries: 最大缓存条数
+            ttl: 条目最长存活时间（秒），作为失效通知之外的兜底
+            prefixes: 仅缓存并跟踪这些前缀的键，为空表示所有键
+            enabled: 是否启用
+        """
+        self.connection_kwargs = connection_kwargs
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self.prefixes = tuple(p for p in (prefixes or []) if p)
+        self.enabled = enabled
+
+        self._entries: "OrderedDict[CacheKey, Tuple[float, Any]]" = OrderedDict()
+        self._by_key: Dict[str, Set[CacheKey]] = {}
+        self._seq = 0
+        self._ready = False
+        self._starting: Optional[asyncio.Task] = None
+        self._retry_at = 0.0
+        self._listener: Optional[asyncio.Task] = None
+        self._sub_conn: Optional[Connection] = None
+        self._ctl_conn: Optional[Connection] = None
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+        self.reconnects = 0
+
+    def accepts(self, key: str) -> bool:
+        return self.enabled and (not self.prefixes or key.startswith(self.prefixes))
+
+    # =============================================================================
+    # 跟踪连接
+    # =============================================================================
+
+    async def ensure_started(self) -> bool:
+        """建立跟踪连接；失败后在重连间隔内直接返回 False（不缓存，直读 Redis）"""
+        if self._ready:
+            return True
+        if time.monotonic() < self._retry_at:
+            return False
+        if self._starting is None or self._starting.done():
+            self._starting = asyncio.create_task(self._start())
+        try:
+            await asyncio.shield(self._starting)
+        except Exception:
+            return False
+        return self._ready
+
+    async def _start(self) -> None:
+        try:
+            sub_conn = Connection(**{**self.connection_kwargs, "decode_responses": True, "socket_timeout": None})
+            await sub_conn.connect()
+            await sub_conn.send_command("CLIENT", "ID")
+            client_id = await sub_conn.read_response()
+            await sub_conn.send_command("SUBSCRIBE", INVALIDATE_CHANNEL)
+            await sub_conn.read_response()
+
+            ctl_conn = Connection(**{**self.connection_kwargs, "decode_responses": True})
+            await ctl_conn.connect()
+            args = ["CLIENT", "TRACKING", "ON", "REDIRECT", client_id, "BCAST"]
+            for prefix in self.prefixes:
+                args += ["PREFIX", prefix]
+            await ctl_conn.send_command(*args)
+            await ctl_conn.read_response()
+        except Exception as e:
+            self._retry_at = time.monotonic() + RECONNECT_INTERVAL
+            logging.warning(f"Redis客户端缓存跟踪连接建立失败，{RECONNECT_INTERVAL}秒后重试: {e}")
+            raise
+
+        self._sub_conn, self._ctl_conn = sub_conn, ctl_conn
+        self._ready = True
+        self._listener = asyncio.create_task(self._listen())
+        logging.info(f"Redis客户端缓存已启用，跟踪前缀: {list(self.prefixes) or '全部'}")
+
+    async def _listen(self) -> None:
+        try:
+            while True:
+                message = await self._sub_conn.read_response(timeout=HEARTBEAT_INTERVAL)
+                if message is None:
+                    await self._check_ctl_conn()
+                    continue
+                if not isinstance(message, list) or len(message) < 3 or message[0] != "message":
+                    continue
+                keys = message[2]
+                if keys is None:  # FLUSHDB / FLUSHALL
+                    self.clear()
+                else:
+                    for key in keys:
+                        self.invalidate(key)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logging.warning(f"Redis客户端缓存跟踪连接断开，缓存已清空: {e}")
+        finally:
+            self._ready = False
+            self.clear()
+            self.reconnects += 1
+            await self._close_connections()
+
+    async def _check_ctl_conn(self) -> None:
+        """控制连接失效即跟踪失效，抛出异常由监听协程清空缓存并停用"""
+        if not self._ctl_conn.is_connected:
+            raise ConnectionError("跟踪控制连接已断开")
+        await self._ctl_conn.send_command("PING")
+        await self._ctl_conn.read_response()
+
+    async def _close_connections(self) -> None:
+        for conn in (self._sub_conn, self._ctl_conn):
+            if conn is not None:
+                try:
+                    await conn.disconnect()
+                except Exception:
+                    pass
+        self._sub_conn = self._ctl_conn = None
+
+    async def close(self) -> None:
+        if self._listener is not None and not self._listener.done():
+            self._listener.cancel()
+            try:
+                await self._listener
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._listener = None
+        self._ready = False
+        self.clear()
+        await self._close_connections()
+
+    # =============================================================================
+    # 缓存读写
+    # =============================================================================
+
+    def lookup(self, space: int, key: str, field: Optional[str] = None) -> Any:
+        """命中返回缓存值（可能为 None），未命中返回 MISSING"""
+        if not self._ready:
+            return MISSING
+        cache_key = (space, key, field)
+        entry = self._entries.get(cache_key)
+        if entry is None or entry[0] < time.monotonic():
+            self.misses += 1
+            return MISSING
+        self._entries.move_to_end(cache_key)
+        self.hits += 1
+        return entry[1]
+
+    def snapshot(self) -> int:
+        """读取 Redis 前调用，返回当前失效序号"""
+        return self._seq
+
+    def store(self, space: int, key: str, field: Optional[str], value: Any, seq: int) -> None:
+        """读取期间没有发生失效才写入"""
+        if not self._ready or seq != self._seq:
+            return
+        cache_key = (space, key, field)
+        self._entries[cache_key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(cache_key)
+        self._by_key.setdefault(key, set()).add(cache_key)
+        while len(self._entries) > self.max_entries:
+            evicted, _ = self._entries.popitem(last=False)
+            self._discard_index(evicted)
+            self.evictions += 1
+
+    def _discard_index(self, cache_key: CacheKey) -> None:
+        keys = self._by_key.get(cache_key[1])
+        if keys is not None:
+            keys.discard(cache_key)
+            if not keys:
+                del self._by_key[cache_key[1]]
+
+    def invalidate(self, key: str) -> None:
+        """失效某个键（所有空间、所有哈希字段）；本进程写操作后也会立即调用"""
+        self._seq += 1
+        cache_keys = self._by_key.pop(key, None)
+        if not cache_keys:
+            return
+        for cache_key in cache_keys:
+            self._entries.pop(cache_key, None)
+        self.invalidations += 1
+
+    def clear(self) -> None:
+        self._seq += 1
+        self._entries.clear()
+        self._by_key.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "ready": self._ready,
+            "prefixes": list(self.prefixes),
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "evictions": self.evictions,
+            "reconnects": self.reconnects,
+        }
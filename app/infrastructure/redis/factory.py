@@ -2,12 +2,16 @@ import json
 import asyncio
 from enum import IntEnum
 from typing import Optional, Any, List, Dict, Iterator
-from redis.asyncio import ConnectionPool, Redis
+from redis.asyncio import BlockingConnectionPool, ConnectionPool, Redis
+from redis.exceptions import ConnectionError as RedisConnectionError
 import logging
 import uuid
 import time
-from contextlib import asynccontextmanager, contextmanager
+from contextlib import asynccontextmanager
 from app.config.settings import settings
+from .batch import RedisBatch, DEFAULT_CHUNK_SIZE
+from .stream_consumer import RedisStreamConsumer, MessageHandler
+from .client_cache import RedisClientCache, MISSING
 
 
 class RedisSpaceEnum(IntEnum):
@@ -29,28 +33,93 @@ class RedisSpaceEnum(IntEnum):
     
     MONITOR = 50             # 系统监控 - 限流、指标等
 
+class MeteredBlockingConnectionPool(BlockingConnectionPool):
+    """阻塞式连接池：连接用尽时等待（最长 timeout 秒）而不是直接报错，并统计等待时间"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.acquisitions = 0
+        self.waits = 0              # 等待超过 1ms 的次数
+        self.wait_timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+    
+    async def get_connection(self, command_name=None, *keys, **options):
+        start = time.perf_counter()
+        try:
+            return await super().get_connection(command_name, *keys, **options)
+        except RedisConnectionError as e:
+            # 只统计等待空闲连接超时（BlockingConnectionPool 由 asyncio.TimeoutError 转换而来），建连失败等不计入
+            if isinstance(e.__cause__, asyncio.TimeoutError):
+                self.wait_timeouts += 1
+            raise
+        finally:
+            wait = time.perf_counter() - start
+            self.acquisitions += 1
+            self.total_wait += wait
+            if wait > 0.001:
+                self.waits += 1
+            if wait > self.max_wait:
+                self.max_wait = wait
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "max_connections": self.max_connections,
+            "in_use": len(self._in_use_connections),
+            "idle": len(self._available_connections),
+            "acquisitions": self.acquisitions,
+            "waits": self.waits,
+            "wait_timeouts": self.wait_timeouts,
+            "avg_wait_ms": self.total_wait / self.acquisitions * 1000 if self.acquisitions else 0.0,
+            "max_wait_ms": self.max_wait * 1000,
+        }
+
 class RedisPool:
-    """Redis连接池"""
+    """Redis连接池 - 每个空间（数据库）一个阻塞式连接池，大小可按空间配置"""
     
     def __init__(self):
         self.config = settings
         self._pools: Dict[RedisSpaceEnum, ConnectionPool] = {}
         self._clients: Dict[RedisSpaceEnum, Redis] = {}
+        self._pool_sizes = self._parse_pool_sizes(self.config.redis_pool_sizes)
+    
+    @staticmethod
+    def _parse_pool_sizes(value: str) -> Dict[int, int]:
+        """解析按空间的连接池大小，格式如 "BUSINESS:32,LLM:32,10:16"（空间名或编号）"""
+        sizes = {}
+        for item in (value or "").split(","):
+            if not item.strip():
+                continue
+            try:
+                name, size = item.split(":", 1)
+                name = name.strip().upper()
+                space = RedisSpaceEnum[name] if name in RedisSpaceEnum.__members__ else RedisSpaceEnum(int(name))
+                sizes[int(space)] = int(size)
+            except (ValueError, KeyError) as e:
+                logging.warning(f"忽略无效的Redis连接池大小配置 {item}: {e}")
+        return sizes
+    
+    def connection_kwargs(self, space: RedisSpaceEnum = RedisSpaceEnum.DEFAULT) -> Dict[str, Any]:
+        """单个连接的参数（连接池与客户端缓存跟踪连接共用）"""
+        return {
+            "host": self.config.redis_host,
+            "port": self.config.redis_port,
+            "password": self.config.redis_password,
+            "db": int(space),
+            "socket_timeout": self.config.redis_socket_timeout,
+            "socket_connect_timeout": self.config.redis_socket_connect_timeout,
+            "retry_on_timeout": self.config.redis_retry_on_timeout,
+            "decode_responses": self.config.redis_decode_responses,
+        }
     
     def get_pool(self, space: RedisSpaceEnum = RedisSpaceEnum.DEFAULT) -> ConnectionPool:
         """获取Redis连接池"""
         # 目前不论那种用途，都使用一个Redis服务，后续如果需要，可以扩展为
         if space not in self._pools:
-            self._pools[space] = ConnectionPool(
-                host=self.config.redis_host,
-                port=self.config.redis_port,
-                password=self.config.redis_password,
-                db=space,
-                max_connections=self.config.redis_max_connections,
-                socket_timeout=self.config.redis_socket_timeout,
-                socket_connect_timeout=self.config.redis_socket_connect_timeout,
-                retry_on_timeout=self.config.redis_retry_on_timeout,
-                decode_responses=self.config.redis_decode_responses
+            self._pools[space] = MeteredBlockingConnectionPool(
+                max_connections=self._pool_sizes.get(int(space), self.config.redis_max_connections),
+                timeout=self.config.redis_pool_timeout,
+                **self.connection_kwargs(space),
             )
         
         return self._pools[space]
@@ -73,6 +142,10 @@ class RedisPool:
             logging.info("Redis连接池已关闭")
         except Exception as e:
             logging.warning(f"关闭Redis连接池时出错: {e}")
+    
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """各空间连接池统计：大小、占用与等待时间"""
+        return {RedisSpaceEnum(space).name: pool.get_stats() for space, pool in self._pools.items()}
 
 class RedisMsg:
     """Redis消息类 - 用于消息队列"""
@@ -105,6 +178,15 @@ class RedisClient:
     """Redis客户端封装类 - 提供完善的Redis操作接口"""
     _connet_pool = RedisPool()    # 连接池
     _lua_scripts = {}  # 类级别的Lua脚本缓存
+    _queue_groups = set()  # 已确认存在的 (空间, 队列, 消费者组)
+    _lock_notifiers = {}  # 空间 -> 锁释放通知订阅
+    _client_cache = RedisClientCache(
+        _connet_pool.connection_kwargs(),
+        max_entries=settings.redis_client_cache_max_entries,
+        ttl=settings.redis_client_cache_ttl,
+        prefixes=[p.strip() for p in settings.redis_client_cache_prefixes.split(",")],
+        enabled=settings.redis_client_cache_enabled,
+    )  # 客户端缓存（get/hget，服务端辅助失效）
 
     def _get_lua_script(self, space: RedisSpaceEnum, script_name: str):
         """获取缓存的Lua脚本"""
@@ -125,7 +207,67 @@ class RedisClient:
                     return 1
                 end
                 return 0
-            """
+            """,
+            # 公平锁：KEYS[1] 锁，KEYS[2] 等待队列
+            # ARGV[1] 持有者标识，ARGV[2] 租期(ms)，ARGV[3] 等待者存活键前缀，ARGV[4] 存活期(ms)，ARGV[5] 获取失败时是否排队
+            'lock_acquire': """
+                local owner = redis.call('get', KEYS[1])
+                if owner == ARGV[1] then
+                    redis.call('pexpire', KEYS[1], ARGV[2])
+                    return 1
+                end
+                local head = redis.call('lindex', KEYS[2], 0)
+                while head and head ~= ARGV[1] and redis.call('exists', ARGV[3] .. head) == 0 do
+                    redis.call('lpop', KEYS[2])
+                    head = redis.call('lindex', KEYS[2], 0)
+                end
+                if not owner and (not head or head == ARGV[1]) then
+                    redis.call('set', KEYS[1], ARGV[1], 'PX', ARGV[2])
+                    if head then
+                        redis.call('lpop', KEYS[2])
+                    end
+                    redis.call('del', ARGV[3] .. ARGV[1])
+                    return 1
+                end
+                if ARGV[5] == '1' then
+                    redis.call('set', ARGV[3] .. ARGV[1], 1, 'PX', ARGV[4])
+                    if not redis.call('lpos', KEYS[2], ARGV[1]) then
+                        redis.call('rpush', KEYS[2], ARGV[1])
+                    end
+                    redis.call('pexpire', KEYS[2], ARGV[4])
+                end
+                return 0
+            """,
+            # ARGV[1] 持有者标识，ARGV[2] 等待者存活键前缀，ARGV[3] 通知频道，ARGV[4] 是否为放弃等待
+            'lock_release': """
+                if ARGV[4] == '1' then
+                    redis.call('lrem', KEYS[2], 0, ARGV[1])
+                    redis.call('del', ARGV[2] .. ARGV[1])
+                    if redis.call('exists', KEYS[1]) == 1 then
+                        return 0
+                    end
+                elseif redis.call('get', KEYS[1]) == ARGV[1] then
+                    redis.call('del', KEYS[1])
+                else
+                    return 0
+                end
+                local head = redis.call('lindex', KEYS[2], 0)
+                while head and redis.call('exists', ARGV[2] .. head) == 0 do
+                    redis.call('lpop', KEYS[2])
+                    head = redis.call('lindex', KEYS[2], 0)
+                end
+                if head then
+                    redis.call('publish', ARGV[3], head)
+                end
+                return 1
+            """,
+            # ARGV[1] 持有者标识，ARGV[2] 租期(ms)
+            'lock_renew': """
+                if redis.call('get', KEYS[1]) == ARGV[1] then
+                    return redis.call('pexpire', KEYS[1], ARGV[2])
+                end
+                return 0
+            """,
         }
         return scripts.get(script_name, "")
     
@@ -154,8 +296,24 @@ class RedisClient:
     
     async def close(self):
         """关闭连接"""
+        await self._client_cache.close()
         await self._connet_pool.close_all()
     
+    def get_pool_stats(self) -> Dict[str, Dict[str, Any]]:
+        """连接池统计"""
+        return self._connet_pool.get_stats()
+    
+    def get_client_cache_stats(self) -> Dict[str, Any]:
+        """客户端缓存统计"""
+        return self._client_cache.get_stats()
+    
+    def _invalidate_local(self, *keys: str) -> None:
+        """本进程写操作后立即失效客户端缓存（不等服务端通知，保证读己之写）"""
+        cache = self._client_cache
+        for key in keys:
+            if cache.accepts(key):
+                cache.invalidate(key)
+    
     # =============================================================================
     # 基础操作
     # =============================================================================
@@ -171,8 +329,17 @@ class RedisClient:
             return False
     
     async def get(self, k: str, space: RedisSpaceEnum = RedisSpaceEnum.DEFAULT) -> Any:
-        """获取值"""
+        """获取值（启用客户端缓存且键在跟踪前缀内时优先读本地）"""
         try:
+            cache = self._client_cache
+            if cache.accepts(k) and await cache.ensure_started():
+                value = cache.lookup(space, k)
+                if value is not MISSING:
+                    return value
+                seq = cache.snapshot()
+                value = await self._connet_pool.get_client(space).get(k)
+                cache.store(space, k, None, value, seq)
+                return value
             client = self._connet_pool.get_client(space)
             return await client.get(k)
         except Exception as e:
@@ -193,6 +360,7 @@ class RedisClient:
         try:
             client = self._connet_pool.get_client(space)
             result = await client.setex(k, exp, v)
+            self._invalidate_local(k)
             return bool(result)
         except Exception as e:
             logging.warning(f"Redis SET操作失败 {k}: {e}")
@@ -204,6 +372,7 @@ class RedisClient:
             client = self._connet_pool.get_client(space)
             json_str = json.dumps(obj, ensure_ascii=False)
             result = await client.setex(k, exp, json_str)
+            self._invalidate_local(k)
             return bool(result)
         except Exception as e:
             logging.warning(f"Redis SET_OBJ操作失败 {k}: {e}")
@@ -214,6 +383,7 @@ class RedisClient:
         try:
             client = self._connet_pool.get_client(space)
             result = await client.delete(k)
+            self._invalidate_local(k)
             return bool(result)
         except Exception as e:
             logging.warning(f"Redis DELETE操作失败 {k}: {e}")
@@ -225,11 +395,23 @@ class RedisClient:
             lua_script = self._get_lua_script(space, 'delete_if_equal')
             client = self._connet_pool.get_client(space)
             result = await lua_script(keys=[key], args=[expected_value], client=client)
+            self._invalidate_local(key)
             return bool(result)
         except Exception as e:
             logging.warning(f"Redis DELETE_IF_EQUAL操作失败 {key}: {e}")
             return False
-    
+
+    async def incr(self, k: str, amount: int = 1, space: RedisSpaceEnum = RedisSpaceEnum.DEFAULT) -> Optional[int]:
+        """自增计数，失败时返回None"""
+        try:
+            client = self._connet_pool.get_client(space)
+            result = await client.incrby(k, amount)
+            self._invalidate_local(k)
+            return result
+        except Exception as e:
+            logging.warning(f"Redis INCR操作失败 {k}: {e}")
+            return None
+
     # =============================================================================
     # 哈希操作
     # =============================================================================
@@ -241,6 +423,7 @@ class RedisClient:
             if isinstance(value, (dict, list)):
                 value = json.dumps(value, ensure_ascii=False)
             result = await client.hset(name, key, str(value))
+            self._invalidate_local(name)
             return bool(result)
         except Exception as e:
             logging.warning(f"Redis HSET操作失败 {name}.{key}: {e}")
@@ -249,8 +432,16 @@ class RedisClient:
     async def hget(self, name: str, key: str, default: Any = None, space: RedisSpaceEnum = RedisSpaceEnum.DEFAULT) -> Any:
         """获取哈希表字段值"""
         try:
-            client = self._connet_pool.get_client(space)
-            value = await client.hget(name, key)
+            cache = self._client_cache
+            if cache.accepts(name) and await cache.ensure_started():
+                value = cache.lookup(space, name, key)
+                if value is MISSING:
+                    seq = cache.snapshot()
+                    value = await self._connet_pool.get_client(space).hget(name, key)
+                    cache.store(space, name, key, value, seq)
+            else:
+                client = self._connet_pool.get_client(space)
+                value = await client.hget(name, key)
             if value is None:
                 return default
             
@@ -282,7 +473,9 @@ class RedisClient:
         """删除哈希表字段"""
         try:
             client = self._connet_pool.get_client(space)
-            return await client.hdel(name, *keys)
+            result = await client.hdel(name, *keys)
+            self._invalidate_local(name)
+            return result
         except Exception as e:
             logging.warning(f"Redis HDEL操作失败 {name}: {e}")
             return 0
@@ -424,6 +617,7 @@ class RedisClient:
         try:
             client = self._connet_pool.get_client(space)
             result = await client.expire(key, seconds)
+            self._invalidate_local(key)
             return bool(result)
         except Exception as e:
             logging.warning(f"Redis EXPIRE操作失败 {key}: {e}")
@@ -451,6 +645,7 @@ class RedisClient:
                 value = json.dumps(value, ensure_ascii=False)
             pipeline.set(key, str(value), ex=expire, nx=True)
             results = await pipeline.execute()
+            self._invalidate_local(key)
             return bool(results[0])
         except Exception as e:
             logging.warning(f"Redis事务操作失败 {key}: {e}")
@@ -477,14 +672,17 @@ class RedisClient:
         for _ in range(3):
             try:
                 client = self._connet_pool.get_client(space)
-                # 检查并创建消费者组
-                try:
-                    group_info = await client.xinfo_groups(queue_name)
-                    if not any(gi["name"] == group_name for gi in group_info):
+                # 检查并创建消费者组（每个进程只检查一次）
+                group_key = (space, queue_name, group_name)
+                if group_key not in self._queue_groups:
+                    try:
+                        group_info = await client.xinfo_groups(queue_name)
+                        if not any(gi["name"] == group_name for gi in group_info):
+                            await client.xgroup_create(queue_name, group_name, id="0", mkstream=True)
+                    except Exception:
+                        # 如果队列不存在，创建队列和组
                         await client.xgroup_create(queue_name, group_name, id="0", mkstream=True)
-                except Exception:
-                    # 如果队列不存在，创建队列和组
-                    await client.xgroup_create(queue_name, group_name, id="0", mkstream=True)
+                    self._queue_groups.add(group_key)
                 
                 # 读取消息
                 args = {
@@ -507,12 +705,29 @@ class RedisClient:
                 return RedisMsg(client, queue_name, group_name, msg_id, payload)
                 
             except Exception as e:
-                if str(e) == 'no such key':
+                if "NOGROUP" in str(e):
+                    # 队列或消费者组被删除，下次重新创建
+                    self._queue_groups.discard((space, queue_name, group_name))
+                elif str(e) == 'no such key':
                     pass
                 else:
                     logging.exception(f"Redis队列消费失败 {queue_name}: {e}")
         return None
     
+    def stream_consumer(self, queue_name: str, group_name: str, consumer_name: str, handler: MessageHandler, space: RedisSpaceEnum = RedisSpaceEnum.DEFAULT, **kwargs) -> RedisStreamConsumer:
+        """
+        创建批量消费运行时（批量读取、有界并发处理、批量确认、XAUTOCLAIM 回收）
+        Args:
+            queue_name: 队列名
+            group_name: 消费者组名
+            consumer_name: 消费者名
+            handler: 消息处理协程函数 handler(message, msg_id)
+            space: Redis空间
+            **kwargs: RedisStreamConsumer 的批量、并发与回收参数
+        """
+        client = self._connet_pool.get_client(space)
+        return RedisStreamConsumer(client, queue_name, group_name, consumer_name, handler, **kwargs)
+    
     async def get_unacked_iterator(self, queue_names: List[str], group_name: str, consumer_name: str, space: RedisSpaceEnum = RedisSpaceEnum.DEFAULT) -> Iterator[RedisMsg]:
         """获取未确认消息迭代器"""
         try:
@@ -582,21 +797,24 @@ class RedisClient:
     # 分布式锁
     # =============================================================================
     
-    def get_lock(self, lock_key: str, lock_value: str = None, timeout: int = 10, blocking_timeout: int = 1, space: RedisSpaceEnum = RedisSpaceEnum.DEFAULT) -> "RedisDistributedLock":
+    def get_lock(self, lock_key: str, lock_value: str = None, timeout: int = 10, blocking_timeout: int = 1, space: RedisSpaceEnum = RedisSpaceEnum.DEFAULT, watchdog: bool = True) -> "RedisDistributedLock":
         """获取分布式锁"""
-        return RedisDistributedLock(space, lock_key, lock_value, timeout, blocking_timeout)
+        return RedisDistributedLock(space, lock_key, lock_value, timeout, blocking_timeout, watchdog)
     
-    @contextmanager
-    def lock(self, lock_key: str, timeout: int = 10, space: RedisSpaceEnum = RedisSpaceEnum.DEFAULT):
-        """分布式锁上下文管理器"""
-        lock = self.get_lock(lock_key, timeout=timeout, space=space)
-        try:
-            if lock.acquire():
-                yield lock
-            else:
-                raise RuntimeError(f"无法获取锁: {lock_key}")
-        finally:
-            lock.release()
+    @asynccontextmanager
+    async def lock(self, lock_key: str, timeout: int = 10, blocking_timeout: int = 0, space: RedisSpaceEnum = RedisSpaceEnum.DEFAULT):
+        """分布式锁上下文管理器，blocking_timeout 为 0 时只尝试一次"""
+        lock = self.get_lock(lock_key, timeout=timeout, blocking_timeout=blocking_timeout, space=space)
+        async with lock:
+            yield lock
+    
+    def _get_lock_notifier(self, space: RedisSpaceEnum) -> "_LockNotifier":
+        """每个空间共用一个锁释放通知订阅"""
+        notifier = self._lock_notifiers.get(space)
+        if notifier is None:
+            notifier = _LockNotifier(self._connet_pool.get_client(space))
+            self._lock_notifiers[space] = notifier
+        return notifier
     
     # =============================================================================
     # 批量操作
@@ -607,6 +825,17 @@ class RedisClient:
         client = self._connet_pool.get_client(space)
         return client.pipeline()
     
+    def batch(self, space: RedisSpaceEnum = RedisSpaceEnum.DEFAULT, transaction: bool = False, chunk_size: int = DEFAULT_CHUNK_SIZE) -> RedisBatch:
+        """
+        获取类型化批量操作对象，配合 async with 使用，退出时一次发送并逐操作解码结果
+        Args:
+            space: Redis空间
+            transaction: 是否以事务（MULTI/EXEC）执行
+            chunk_size: 非事务模式下每个管道的最大命令数
+        """
+        client = self._connet_pool.get_client(space)
+        return RedisBatch(client, transaction=transaction, chunk_size=chunk_size, on_write=self._invalidate_local)
+    
     async def mget(self, keys: List[str], space: RedisSpaceEnum = RedisSpaceEnum.DEFAULT) -> List[Any]:
         """批量获取"""
         try:
@@ -637,95 +866,223 @@ class RedisClient:
                 else:
                     str_mapping[key] = str(value)
             result = await client.mset(str_mapping)
+            self._invalidate_local(*str_mapping)
             return bool(result)
         except Exception as e:
             logging.warning(f"Redis MSET操作失败: {e}")
             return False
 
+class _LockNotifier:
+    """锁释放通知：每个空间一个 Pub/Sub 连接，按频道与等待者标识分发给本进程内的等待协程"""
+
+    def __init__(self, client: Redis):
+        self.client = client
+        self._pubsub = None
+        self._waiters: Dict[str, Dict[str, asyncio.Event]] = {}
+        self._listener: Optional[asyncio.Task] = None
+
+    async def register(self, channel: str, token: str) -> asyncio.Event:
+        event = asyncio.Event()
+        waiters = self._waiters.setdefault(channel, {})
+        waiters[token] = event
+        try:
+            if len(waiters) == 1:
+                if self._pubsub is None:
+                    self._pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                await self._pubsub.subscribe(channel)
+            if self._listener is None or self._listener.done():
+                self._listener = asyncio.create_task(self._listen())
+        except Exception as e:
+            # 订阅失败时等待者退化为按时间片重试
+            logging.warning(f"订阅锁释放通知失败 {channel}: {e}")
+        return event
+
+    async def unregister(self, channel: str, token: str) -> None:
+        waiters = self._waiters.get(channel)
+        if not waiters:
+            return
+        waiters.pop(token, None)
+        if waiters:
+            return
+        del self._waiters[channel]
+        try:
+            await self._pubsub.unsubscribe(channel)
+        except Exception as e:
+            logging.warning(f"取消订阅锁释放通知失败 {channel}: {e}")
+
+    async def _listen(self) -> None:
+        while self._waiters:
+            try:
+                message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.warning(f"接收锁释放通知失败: {e}")
+                await asyncio.sleep(1)
+                continue
+            if message and message.get("type") == "message":
+                event = self._waiters.get(message["channel"], {}).get(message["data"])
+                if event is not None:
+                    event.set()
+
+
 class RedisDistributedLock:
-    """Redis分布式锁"""
-    
-    def __init__(self, space: RedisSpaceEnum, lock_key: str, lock_value: str = None, timeout: int = 10, blocking_timeout: int = 1):
+    """
+    Redis分布式锁
+
+    - 公平：获取失败的等待者进入 FIFO 队列，锁释放时由 Lua 脚本通过 Pub/Sub 只通知队首，不再 100ms 自旋；
+    - 等待者在队列中以存活键表明在线，崩溃的等待者在轮到时被跳过；通知丢失时按时间片兜底重试；
+    - 持有期间看门狗按租期的 1/3 续期，续期失败（锁已丢失）记录告警并置 lost；
+    - 支持 async with（blocking_timeout > 0 时阻塞等待，否则只尝试一次）。
+    """
+
+    WAIT_SLICE = 2.0            # 无通知时的兜底重试间隔（秒），也是持有者崩溃后的最长发现延迟
+    WAITER_ALIVE_FACTOR = 3     # 等待者存活键有效期 = WAIT_SLICE * 该系数
+
+    def __init__(self, space: RedisSpaceEnum, lock_key: str, lock_value: str = None, timeout: int = 10, blocking_timeout: int = 1, watchdog: bool = True):
+        """
+        Args:
+            space: Redis空间
+            lock_key: 锁键
+            lock_value: 持有者标识，默认随机生成
+            timeout: 租期（秒）
+            blocking_timeout: async with 时的最长等待时间（秒），0 表示只尝试一次
+            watchdog: 持有期间是否自动续期
+        """
         self.space = space
         self.lock_key = lock_key
         self.lock_value = lock_value or str(uuid.uuid4())
         self.timeout = timeout
         self.blocking_timeout = blocking_timeout
+        self.watchdog = watchdog
+        self.lost = False
+        self.ops = 0                # 本锁发出的 Redis 命令数（脚本调用计 1 次）
         self._acquired = False
-    
+        self._watchdog_task: Optional[asyncio.Task] = None
+        self._queue_key = f"{lock_key}:queue"
+        self._waiter_prefix = f"{lock_key}:waiter:"
+        self._channel = f"{lock_key}:released"
+
+    @property
+    def is_held(self) -> bool:
+        return self._acquired and not self.lost
+
+    async def _call(self, script_name: str, keys: List[str], args: List[Any]) -> int:
+        self.ops += 1
+        script = REDIS_CONN._get_lua_script(self.space, script_name)
+        client = REDIS_CONN._connet_pool.get_client(self.space)
+        return await script(keys=keys, args=args, client=client)
+
+    async def _try_acquire(self, enqueue: bool) -> bool:
+        alive_ms = int(self.WAIT_SLICE * self.WAITER_ALIVE_FACTOR * 1000)
+        result = await self._call(
+            'lock_acquire',
+            [self.lock_key, self._queue_key],
+            [self.lock_value, int(self.timeout * 1000), self._waiter_prefix, alive_ms, '1' if enqueue else '0'],
+        )
+        if result:
+            self._on_acquired()
+        return bool(result)
+
+    def _on_acquired(self) -> None:
+        self._acquired = True
+        self.lost = False
+        if self.watchdog and (self._watchdog_task is None or self._watchdog_task.done()):
+            self._watchdog_task = asyncio.create_task(self._renew_loop())
+
+    async def _renew_loop(self) -> None:
+        interval = max(self.timeout / 3, 0.1)
+        while self._acquired:
+            await asyncio.sleep(interval)
+            if not self._acquired:
+                return
+            try:
+                renewed = await self._call('lock_renew', [self.lock_key], [self.lock_value, int(self.timeout * 1000)])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.warning(f"分布式锁续期失败 {self.lock_key}: {e}")
+                continue
+            if not renewed:
+                self.lost = True
+                logging.warning(f"分布式锁已丢失 {self.lock_key}")
+                return
+
     async def acquire(self) -> bool:
-        """获取锁"""
+        """获取锁（只尝试一次；有排队的等待者时不插队）"""
         try:
-            # 清理可能存在的旧锁
-            redis_client = REDIS_CONN
-            await redis_client.delete_if_equal(self.lock_key, self.lock_value, self.space)
-            
-            # 尝试获取锁
-            client = redis_client._connet_pool.get_client(self.space)
-            result = await client.set(
-                self.lock_key, 
-                self.lock_value, 
-                nx=True, 
-                ex=self.timeout
-            )
-            self._acquired = bool(result)
-            return self._acquired
+            return await self._try_acquire(enqueue=False)
         except Exception as e:
             logging.error(f"获取分布式锁失败 {self.lock_key}: {e}")
             return False
-    
+
     async def spin_acquire(self, max_wait_time: int = 30) -> bool:
-        """异步自旋获取锁
-        
+        """异步阻塞获取锁：排队等待释放通知，按 FIFO 顺序交接
+
         Args:
             max_wait_time: 最大等待时间（秒），默认30秒
         """
+        start_time = time.monotonic()
+        notifier = REDIS_CONN._get_lock_notifier(self.space)
+        event = await notifier.register(self._channel, self.lock_value)
         try:
-            # 清理可能存在的旧锁
-            redis_client = REDIS_CONN
-            await redis_client.delete_if_equal(self.lock_key, self.lock_value, self.space)
-            
-            start_time = time.time()
-            client = redis_client._connet_pool.get_client(self.space)
-            
-            # 自旋等待获取锁
             while True:
-                result = await client.set(
-                    self.lock_key, 
-                    self.lock_value, 
-                    nx=True, 
-                    ex=self.timeout
-                )
-                if result:
-                    self._acquired = True
+                event.clear()
+                if await self._try_acquire(enqueue=True):
                     return True
-                
+
                 # 检查是否超时
-                elapsed_time = time.time() - start_time
-                if elapsed_time >= max_wait_time:
-                    logging.warning(f"获取分布式锁超时 {self.lock_key}, 等待时间: {elapsed_time:.2f}秒")
+                remaining = max_wait_time - (time.monotonic() - start_time)
+                if remaining <= 0:
+                    logging.warning(f"获取分布式锁超时 {self.lock_key}, 等待时间: {time.monotonic() - start_time:.2f}秒")
+                    await self._leave_queue()
                     return False
-                
-                # 等待一段时间后重试
-                await asyncio.sleep(0.1)  # 100ms间隔
-                
+
+                try:
+                    await asyncio.wait_for(event.wait(), min(remaining, self.WAIT_SLICE))
+                except asyncio.TimeoutError:
+                    pass
         except Exception as e:
             logging.error(f"异步获取分布式锁失败 {self.lock_key}: {e}")
+            await self._leave_queue()
             return False
-    
+        finally:
+            await notifier.unregister(self._channel, self.lock_value)
+
+    async def _leave_queue(self) -> None:
+        """放弃等待：移出队列，若锁空闲则通知下一位"""
+        try:
+            await self._call('lock_release', [self.lock_key, self._queue_key], [self.lock_value, self._waiter_prefix, self._channel, '1'])
+        except Exception as e:
+            logging.warning(f"退出分布式锁等待队列失败 {self.lock_key}: {e}")
+
     async def release(self) -> bool:
-        """释放锁"""
+        """释放锁并通知队首等待者"""
         try:
             if self._acquired:
-                redis_client = REDIS_CONN
-                result = await redis_client.delete_if_equal(self.lock_key, self.lock_value, self.space)
                 self._acquired = False
-                return result
+                if self._watchdog_task is not None:
+                    self._watchdog_task.cancel()
+                    self._watchdog_task = None
+                result = await self._call('lock_release', [self.lock_key, self._queue_key], [self.lock_value, self._waiter_prefix, self._channel, '0'])
+                return bool(result)
             return True
         except Exception as e:
             logging.error(f"释放分布式锁失败 {self.lock_key}: {e}")
             return False
 
+    async def __aenter__(self) -> "RedisDistributedLock":
+        if self.blocking_timeout > 0:
+            acquired = await self.spin_acquire(self.blocking_timeout)
+        else:
+            acquired = await self.acquire()
+        if not acquired:
+            raise RuntimeError(f"无法获取锁: {self.lock_key}")
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.release()
+
 # 全局Redis客户端实例 - 提供便捷的静态方法调用
 REDIS_CONN = RedisClient()
 
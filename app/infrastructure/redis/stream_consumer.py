@@ -0,0 +1,408 @@
+"""
+Redis Streams 高吞吐消费运行时
+
+- 消费者组只在启动时创建一次（已存在则忽略 BUSYGROUP）；
+- 读取协程按批 XREADGROUP，消息放入有界队列，由固定数量的 worker 协程并发处理（队列满即背压）；
+- 处理成功的消息 ID 攒批 XACK（达到批量或超过间隔即发送）；处理失败的消息不确认，留在 PEL 中；
+- 回收协程周期性 XAUTOCLAIM 空闲超过阈值的待处理消息（含本进程失败的和其他已退出消费者遗留的）重新处理；
+  投递次数（XPENDING 的 times_delivered）超过 max_deliveries 的消息不再处理：配置了死信队列时转存后确认，
+  否则记录错误日志后直接确认；
+- 统计：积压（组 lag / 待确认数）、吞吐、在途、成功/失败/回收次数。
+
+用法:
+    async def handle(message, msg_id): ...
+    consumer = REDIS_CONN.stream_consumer("queue", "group", "worker-1", handle, RedisSpaceEnum.BUSINESS)
+    await consumer.start()
+    ...
+    await consumer.stop()
+"""
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from redis.asyncio import Redis
+
+MessageHandler = Callable[[Any, str], Awaitable[Any]]
+
+# 读取批次（默认值）
+DEFAULT_BATCH_SIZE = 64
+DEFAULT_BLOCK_MS = 2000         # 需小于连接的 socket_timeout
+DEFAULT_MAX_WORKERS = 16
+DEFAULT_ACK_BATCH_SIZE = 64
+DEFAULT_ACK_INTERVAL = 0.2      # 秒
+DEFAULT_CLAIM_IDLE_MS = 60000   # 待处理消息空闲超过该值即被回收
+DEFAULT_CLAIM_INTERVAL = 30.0   # 秒
+DEFAULT_MAX_DELIVERIES = 10     # 单条消息最多投递次数，0 表示不限制
+THROUGHPUT_WINDOW = 10.0        # 吞吐统计窗口（秒）
+
+
+class RedisStreamConsumer:
+    """单个 (队列, 消费者组, 消费者) 的消费运行时"""
+
+    def __init__(
+        self,
+        client: Redis,
+        queue_name: str,
+        group_name: str,
+        consumer_name: str,
+        handler: MessageHandler,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        block_ms: int = DEFAULT_BLOCK_MS,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        ack_batch_size: int = DEFAULT_ACK_BATCH_SIZE,
+        ack_interval: float = DEFAULT_ACK_INTERVAL,
+        claim_idle_ms: int = DEFAULT_CLAIM_IDLE_MS,
+        claim_interval: float = DEFAULT_CLAIM_INTERVAL,
+        max_deliveries: int = DEFAULT_MAX_DELIVERIES,
+        dead_letter_queue: Optional[str] = None,
+    ):
+        """
+        Args:
+            client: Redis 客户端
+            queue_name: 队列（Stream）名
+            group_name: 消费者组名
+            consumer_name: 消费者名
+            handler: 消息处理协程函数 handler(message, msg_id)，抛出异常视为处理失败
+            batch_size: 每次 XREADGROUP / XAUTOCLAIM 的最大条数
+            block_ms: XREADGROUP 阻塞时间（毫秒）
+            max_workers: 并发处理的 worker 数
+            ack_batch_size: 攒够该数量立即 XACK
+            ack_interval: XACK 最长间隔（秒）
+            claim_idle_ms: 回收空闲超过该值（毫秒）的待处理消息，0 表示不回收；
+                           应大于单条消息的最长处理时间，否则处理中的消息可能被重复回收
+            claim_interval: 回收与积压统计的间隔（秒）
+            max_deliveries: 回收时投递次数超过该值的消息不再处理，0 表示不限制
+            dead_letter_queue: 超过投递次数的消息转存到的队列（Stream），为空时仅记录错误日志后确认
+        """
+        self.client = client
+        self.queue_name = queue_name
+        self.group_name = group_name
+        self.consumer_name = consumer_name
+        self.handler = handler
+        self.batch_size = max(1, batch_size)
+        self.block_ms = max(1, block_ms)
+        self.max_workers = max(1, max_workers)
+        self.ack_batch_size = max(1, ack_batch_size)
+        self.ack_interval = ack_interval
+        self.claim_idle_ms = claim_idle_ms
+        self.claim_interval = claim_interval
+        self.max_deliveries = max(0, max_deliveries)
+        self.dead_letter_queue = dead_letter_queue
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._pending_acks: List[str] = []
+        self._ack_wakeup: Optional[asyncio.Event] = None
+        self._reader: Optional[asyncio.Task] = None
+        self._acker: Optional[asyncio.Task] = None
+        self._maintainer: Optional[asyncio.Task] = None
+        self._workers: List[asyncio.Task] = []
+        self._running = False
+        self._group_ready = False
+        self._claim_cursor = "0-0"
+        self._completions: List[Tuple[float, int]] = []
+
+        self.inflight = 0
+        self.processed = 0
+        self.failed = 0
+        self.acked = 0
+        self.claimed = 0
+        self.dead_lettered = 0
+        self.lag: Optional[int] = None
+        self.pending: Optional[int] = None
+        self._started_at: Optional[float] = None
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    async def ensure_group(self) -> None:
+        """创建消费者组（队列不存在时一并创建），已存在则忽略"""
+        if self._group_ready:
+            return
+        try:
+            await self.client.xgroup_create(self.queue_name, self.group_name, id="0", mkstream=True)
+        except Exception as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+        self._group_ready = True
+
+    async def start(self) -> None:
+        """启动读取、处理、确认、回收/统计协程"""
+        if self._running:
+            return
+        await self.ensure_group()
+        self._running = True
+        self._started_at = time.monotonic()
+        self._queue = asyncio.Queue(maxsize=self.batch_size)
+        self._ack_wakeup = asyncio.Event()
+        self._workers = [asyncio.create_task(self._work()) for _ in range(self.max_workers)]
+        self._reader = asyncio.create_task(self._read_loop())
+        self._acker = asyncio.create_task(self._ack_loop())
+        self._maintainer = asyncio.create_task(self._maintenance_loop())
+        logging.info(f"Redis队列消费者已启动 {self.queue_name}/{self.group_name}/{self.consumer_name}")
+
+    async def stop(self, timeout: float = 30) -> None:
+        """
+        停止读取，等待已取出的消息处理完成并确认
+
+        读取/回收协程被取消时正阻塞在入队上的消息，以及超时后仍留在本地队列中的消息不会被处理，
+        它们未被确认，仍在消费者组的 PEL 中，空闲超过 claim_idle_ms 后由本消费者或组内其他消费者回收重新处理。
+        """
+        if not self._running:
+            return
+        self._running = False
+        self._reader.cancel()
+        self._maintainer.cancel()
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logging.warning(f"Redis队列消费者停止超时，{self._queue.qsize()}条消息未处理 {self.queue_name}")
+        tasks = self._workers + [self._reader, self._acker, self._maintainer]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers = []
+        self._reader = self._acker = self._maintainer = None
+        await self._flush_acks()
+        logging.info(f"Redis队列消费者已停止 {self.queue_name}/{self.group_name}/{self.consumer_name}")
+
+    # =============================================================================
+    # 读取与回收
+    # =============================================================================
+
+    async def _read_loop(self) -> None:
+        while self._running:
+            try:
+                # 按队列剩余容量读取，避免取出后长时间占用在本地
+                count = max(1, self.batch_size - self._queue.qsize())
+                messages = await self.client.xreadgroup(
+                    groupname=self.group_name,
+                    consumername=self.consumer_name,
+                    streams={self.queue_name: ">"},
+                    count=count,
+                    block=self.block_ms,
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if "NOGROUP" in str(e):
+                    self._group_ready = False
+                    await self._safe_ensure_group()
+                else:
+                    logging.warning(f"Redis队列读取失败 {self.queue_name}: {e}")
+                    await asyncio.sleep(1)
+                continue
+            for _, entries in messages or []:
+                for msg_id, payload in entries:
+                    await self._queue.put((msg_id, payload))
+
+    async def _safe_ensure_group(self) -> None:
+        try:
+            await self.ensure_group()
+        except Exception as e:
+            logging.warning(f"Redis消费者组创建失败 {self.queue_name}/{self.group_name}: {e}")
+            await asyncio.sleep(1)
+
+    async def _maintenance_loop(self) -> None:
+        """周期性回收空闲的待处理消息并刷新积压统计"""
+        while self._running:
+            await asyncio.sleep(self.claim_interval)
+            try:
+                if self.claim_idle_ms > 0:
+                    await self._claim_once()
+                await self._refresh_lag()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.warning(f"Redis待处理消息回收失败 {self.queue_name}: {e}")
+
+    async def _claim_once(self) -> int:
+        """XAUTOCLAIM 一轮（游标遍历到头为止），返回回收条数"""
+        claimed = 0
+        dead_lettered = self.dead_lettered
+        while self._running:
+            result = await self.client.xautoclaim(
+                self.queue_name,
+                self.group_name,
+                self.consumer_name,
+                min_idle_time=self.claim_idle_ms,
+                start_id=self._claim_cursor,
+                count=self.batch_size,
+            )
+            cursor, entries = result[0], result[1]
+            deleted_ids = []
+            live = []
+            for msg_id, payload in entries:
+                if msg_id is None:  # Redis 6.2 对已删除条目返回 (None, None)，没有可确认的 ID
+                    continue
+                if payload is None:  # 已被 XDEL/XTRIM 删除的条目，直接确认
+                    deleted_ids.append(msg_id)
+                    continue
+                live.append((msg_id, payload))
+            if deleted_ids:
+                self._add_acks(deleted_ids)
+            exhausted = await self._exhausted_deliveries(live)
+            for msg_id, payload in live:
+                if msg_id in exhausted:
+                    await self._dead_letter(msg_id, payload, exhausted[msg_id])
+                    continue
+                claimed += 1
+                await self._queue.put((msg_id, payload))
+            self._claim_cursor = cursor
+            if cursor in ("0-0", b"0-0"):
+                break
+        if self.dead_lettered != dead_lettered:
+            # 立即确认已转存的消息，避免下一轮回收前被重复转存
+            await self._flush_acks()
+        if claimed:
+            self.claimed += claimed
+            logging.info(f"Redis队列回收待处理消息 {self.queue_name}: {claimed}条")
+        return claimed
+
+    async def _exhausted_deliveries(self, entries: List[Tuple[str, Dict[str, Any]]]) -> Dict[str, int]:
+        """查询刚回收消息的投递次数，返回超过 max_deliveries 的 {消息ID: 投递次数}"""
+        if not entries or self.max_deliveries <= 0:
+            return {}
+        try:
+            pending = await self.client.xpending_range(
+                self.queue_name,
+                self.group_name,
+                min=entries[0][0],
+                max=entries[-1][0],
+                count=len(entries),
+                consumername=self.consumer_name,
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logging.warning(f"Redis待处理消息投递次数查询失败 {self.queue_name}: {e}")
+            return {}
+        return {
+            item["message_id"]: item["times_delivered"]
+            for item in pending
+            if item["times_delivered"] > self.max_deliveries
+        }
+
+    async def _dead_letter(self, msg_id: str, payload: Dict[str, Any], deliveries: int) -> None:
+        """超过投递次数的消息转存死信队列（未配置时只记录日志）后确认"""
+        if self.dead_letter_queue:
+            try:
+                await self.client.xadd(self.dead_letter_queue, {
+                    **payload,
+                    "source_queue": self.queue_name,
+                    "source_id": msg_id,
+                    "deliveries": deliveries,
+                })
+            except Exception as e:
+                # 转存失败时不确认，下轮回收再试
+                logging.warning(f"Redis队列消息转存死信队列失败 {self.queue_name} {msg_id}: {e}")
+                return
+            logging.error(f"Redis队列消息投递{deliveries}次仍未成功，已转存死信队列 {self.dead_letter_queue} {self.queue_name} {msg_id}")
+        else:
+            logging.error(f"Redis队列消息投递{deliveries}次仍未成功，已丢弃 {self.queue_name} {msg_id}")
+        self.dead_lettered += 1
+        self._add_acks([msg_id])
+
+    async def _refresh_lag(self) -> None:
+        groups = await self.client.xinfo_groups(self.queue_name)
+        for group in groups:
+            if group.get("name") == self.group_name:
+                self.lag = group.get("lag")
+                self.pending = group.get("pending")
+                break
+
+    # =============================================================================
+    # 处理与确认
+    # =============================================================================
+
+    async def _work(self) -> None:
+        while True:
+            msg_id, payload = await self._queue.get()
+            self.inflight += 1
+            try:
+                await self._handle(msg_id, payload)
+            finally:
+                self.inflight -= 1
+                self._queue.task_done()
+
+    async def _handle(self, msg_id: str, payload: Dict[str, Any]) -> None:
+        try:
+            message = json.loads(payload["message"])
+        except (KeyError, TypeError, ValueError) as e:
+            # 无法解析的消息重试也不会成功，记录后直接确认
+            logging.warning(f"Redis队列消息格式错误，已丢弃 {self.queue_name} {msg_id}: {e}")
+            self.failed += 1
+            self._add_acks([msg_id])
+            return
+        try:
+            await self.handler(message, msg_id)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.failed += 1
+            logging.exception(f"Redis队列消息处理失败 {self.queue_name} {msg_id}: {e}")
+            return
+        self.processed += 1
+        self._record_completion()
+        self._add_acks([msg_id])
+
+    def _add_acks(self, msg_ids: List[str]) -> None:
+        self._pending_acks.extend(msg_ids)
+        if len(self._pending_acks) >= self.ack_batch_size:
+            self._ack_wakeup.set()
+
+    async def _ack_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._ack_wakeup.wait(), self.ack_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._ack_wakeup.clear()
+            await self._flush_acks()
+
+    async def _flush_acks(self) -> None:
+        if not self._pending_acks:
+            return
+        ids, self._pending_acks = self._pending_acks, []
+        try:
+            await self.client.xack(self.queue_name, self.group_name, *ids)
+            self.acked += len(ids)
+        except Exception as e:
+            # 确认失败的消息留在 PEL 中，之后会被 XAUTOCLAIM 回收重新处理
+            logging.warning(f"Redis队列批量确认失败 {self.queue_name}（{len(ids)}条）: {e}")
+
+    # =============================================================================
+    # 统计
+    # =============================================================================
+
+    def _record_completion(self) -> None:
+        now = time.monotonic()
+        if self._completions and now - self._completions[-1][0] < 1:
+            self._completions[-1] = (self._completions[-1][0], self._completions[-1][1] + 1)
+        else:
+            self._completions.append((now, 1))
+            while self._completions and now - self._completions[0][0] > THROUGHPUT_WINDOW:
+                self._completions.pop(0)
+
+    def get_stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        recent = sum(n for t, n in self._completions if now - t <= THROUGHPUT_WINDOW)
+        window = min(THROUGHPUT_WINDOW, now - self._started_at) if self._started_at else 0
+        return {
+            "queue": self.queue_name,
+            "group": self.group_name,
+            "consumer": self.consumer_name,
+            "running": self._running,
+            "inflight": self.inflight,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "pending_acks": len(self._pending_acks),
+            "processed": self.processed,
+            "failed": self.failed,
+            "acked": self.acked,
+            "claimed": self.claimed,
+            "dead_lettered": self.dead_lettered,
+            "lag": self.lag,
+            "pending": self.pending,
+            "throughput": recent / window if window > 0 else 0.0,
+        }
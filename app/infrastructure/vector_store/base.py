@@ -325,9 +325,9 @@ class VectorStoreConnection(ABC):
         Args:
             space_name: 空间名称
             records: 数据记录列表（字典格式）
-            **kwargs: 其他参数
+            **kwargs: 其他参数，如 refresh（false / wait_for / true）、chunk_max_bytes、chunk_max_docs、max_in_flight
         Returns:
-            插入成功的记录ID列表
+            插入失败的记录列表（"id:错误信息"），全部成功时为空列表
         """
         raise NotImplementedError("Not implemented")
 
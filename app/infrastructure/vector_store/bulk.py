@@ -0,0 +1,197 @@
+"""
+流式批量写入：ES 与 OpenSearch 共用的 bulk 索引器
+
+- 记录逐条序列化为 NDJSON（动作行 + 文档行），不深拷贝源记录，向量/ndarray 直接写入 JSON；
+- 按字节数与文档数切块，边序列化边发送，最多 max_in_flight 个块同时在途；
+- refresh 策略：false 不刷新（依赖索引 refresh_interval）、wait_for 每块等待下次刷新后返回、
+  true 全部块写完后对索引统一刷新一次（而非每块强制刷新）；
+- 返回逐条失败信息 "id:error"，与 insert_records 原有返回格式一致。
+"""
+import asyncio
+import json
+import logging
+import time
+import uuid
+import datetime
+from decimal import Decimal
+from typing import Any, Awaitable, Callable, Iterable, List, Optional, Union
+
+# 默认分块与并发参数
+DEFAULT_CHUNK_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_CHUNK_MAX_DOCS = 500
+DEFAULT_MAX_IN_FLIGHT = 4
+DEFAULT_REFRESH = "wait_for"
+REFRESH_POLICIES = ("false", "wait_for", "true")
+
+BulkSender = Callable[[bytes, str], Awaitable[Any]]
+SpaceRefresher = Callable[[], Awaitable[Any]]
+
+
+def normalize_refresh(refresh: Union[bool, str, None]) -> str:
+    """将 bool / 字符串形式的刷新参数统一为 false、wait_for、true 之一"""
+    if refresh is None:
+        return DEFAULT_REFRESH
+    if isinstance(refresh, bool):
+        return "true" if refresh else "false"
+    value = str(refresh).lower()
+    if value not in REFRESH_POLICIES:
+        raise ValueError(f"不支持的 refresh 策略: {refresh}，可选值: {', '.join(REFRESH_POLICIES)}")
+    return value
+
+
+def _json_default(o):
+    # 与 ES/OpenSearch 客户端自带序列化器的处理保持一致：日期用 ISO 格式，Decimal 转 float，UUID 转字符串；
+    # numpy ndarray / numpy 标量均提供 tolist()，无需引入 numpy
+    if isinstance(o, (datetime.date, datetime.time)):
+        return o.isoformat()
+    if isinstance(o, Decimal):
+        return float(o)
+    if isinstance(o, uuid.UUID):
+        return str(o)
+    tolist = getattr(o, "tolist", None)
+    if tolist is not None:
+        return tolist()
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+def _dumps(obj) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=_json_default).encode("utf-8")
+
+
+def collect_failures(response) -> List[str]:
+    """从 bulk 响应中收集逐条失败信息"""
+    failed = []
+    if not response or not response.get("errors"):
+        return failed
+    for item in response["items"]:
+        for action in ("create", "delete", "index", "update"):
+            if action in item and "error" in item[action]:
+                failed.append(str(item[action]["_id"]) + ":" + str(item[action]["error"]))
+    return failed
+
+
+class BulkIndexer:
+    """按字节数与文档数分块、有界并发发送的 bulk 索引器"""
+
+    def __init__(
+        self,
+        send: BulkSender,
+        refresh_space: Optional[SpaceRefresher] = None,
+        should_retry: Optional[Callable[[Exception], bool]] = None,
+        chunk_max_bytes: int = DEFAULT_CHUNK_MAX_BYTES,
+        chunk_max_docs: int = DEFAULT_CHUNK_MAX_DOCS,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        refresh: Union[bool, str, None] = DEFAULT_REFRESH,
+        attempt_time: int = 3,
+        retry_delay: float = 2,
+    ):
+        """
+        Args:
+            send: 发送一个 NDJSON 块的协程函数，参数为 (body, refresh)，返回 bulk 响应
+            refresh_space: refresh=true 时写完后调用的索引刷新协程函数
+            should_retry: 判断请求级异常是否可重试
+            chunk_max_bytes: 单块最大字节数（单条超限的文档单独成块）
+            chunk_max_docs: 单块最大文档数
+            max_in_flight: 同时在途的最大块数
+            refresh: 刷新策略 false / wait_for / true
+            attempt_time: 单块最大尝试次数
+            retry_delay: 重试间隔（秒）
+        """
+        self.send = send
+        self.refresh_space = refresh_space
+        self.should_retry = should_retry or (lambda e: False)
+        self.chunk_max_bytes = max(1, chunk_max_bytes)
+        self.chunk_max_docs = max(1, chunk_max_docs)
+        self.max_in_flight = max(1, max_in_flight)
+        self.refresh = normalize_refresh(refresh)
+        self.attempt_time = max(1, attempt_time)
+        self.retry_delay = retry_delay
+        self.build_time = 0.0   # 最近一次 index 中序列化与切块的耗时（秒），不含等待发送名额
+
+    async def index(self, space_name: str, records: Iterable[dict[str, Any]]) -> List[str]:
+        """
+        流式写入记录
+        Args:
+            space_name: 索引名称
+            records: 记录（可为生成器），每条必须包含 id 字段且不含 _id
+        Returns:
+            List[str]: 失败记录 "id:error" 列表，全部成功时为空
+        """
+        # wait_for 逐块等待；true 在最后统一刷新一次，块本身不刷新
+        chunk_refresh = "wait_for" if self.refresh == "wait_for" else "false"
+        semaphore = asyncio.Semaphore(self.max_in_flight)
+        tasks: List[asyncio.Task] = []
+
+        async def run(body: bytes, ids: List[str]) -> List[str]:
+            try:
+                return await self._send_chunk(body, ids, chunk_refresh)
+            finally:
+                semaphore.release()
+
+        async def dispatch(lines: List[bytes], ids: List[str]):
+            await semaphore.acquire()
+            tasks.append(asyncio.create_task(run(b"".join(lines), ids)))
+
+        lines: List[bytes] = []
+        ids: List[str] = []
+        size = 0
+        total = 0
+        self.build_time = 0.0
+        started = time.perf_counter()
+        try:
+            for record in records:
+                assert "_id" not in record
+                assert "id" in record
+
+                meta_id = record["id"]
+                action = _dumps({"index": {"_index": space_name, "_id": meta_id}})
+                # 浅层视图去掉 id，字段值（含向量）按引用直接序列化
+                source = _dumps({k: v for k, v in record.items() if k != "id"})
+                doc_size = len(action) + len(source) + 2
+
+                if ids and (size + doc_size > self.chunk_max_bytes or len(ids) >= self.chunk_max_docs):
+                    self.build_time += time.perf_counter() - started
+                    await dispatch(lines, ids)
+                    started = time.perf_counter()
+                    lines, ids, size = [], [], 0
+
+                lines.extend((action, b"\n", source, b"\n"))
+                ids.append(str(meta_id))
+                size += doc_size
+                total += 1
+
+            self.build_time += time.perf_counter() - started
+            if ids:
+                await dispatch(lines, ids)
+
+            results = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+        failed = [item for chunk_failed in results for item in chunk_failed]
+
+        if self.refresh == "true" and self.refresh_space is not None and total:
+            try:
+                await self.refresh_space()
+            except Exception as e:
+                logging.warning(f"批量写入后刷新索引 {space_name} 失败: {e}")
+
+        logging.debug(f"bulk 写入 {space_name}: 共 {total} 条，{len(tasks)} 块，失败 {len(failed)} 条")
+        return failed
+
+    async def _send_chunk(self, body: bytes, ids: List[str], refresh: str) -> List[str]:
+        """发送单块，请求级异常按策略重试，最终失败时块内每条记录都记为失败"""
+        for attempt in range(self.attempt_time):
+            try:
+                response = await self.send(body, refresh)
+                return collect_failures(response)
+            except Exception as e:
+                if attempt < self.attempt_time - 1 and self.should_retry(e):
+                    logging.warning(f"批量插入失败，重试 (尝试 {attempt + 1}/{self.attempt_time}): {e}")
+                    await asyncio.sleep(self.retry_delay)
+                    continue
+                logging.error(f"批量插入最终失败: {e}")
+                return [f"{meta_id}:{e}" for meta_id in ids]
+        return []
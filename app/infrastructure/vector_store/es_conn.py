@@ -13,10 +13,21 @@ from .base import (
     SearchRequest, 
     MatchTextExpr, 
     MatchDenseExpr, 
+    MatchSparseExpr,
     FusionExpr, 
     SortOrder
 )
-from .utils import get_float, is_english
+from .utils import get_float
+from . import highlight as highlight_engine
+from .fusion import get_fusion_expr, hybrid_search, sparse_query_clauses
+from .tracing import LazyJson, QueryTrace
+from .bulk import (
+    BulkIndexer,
+    DEFAULT_CHUNK_MAX_BYTES,
+    DEFAULT_CHUNK_MAX_DOCS,
+    DEFAULT_MAX_IN_FLIGHT,
+    DEFAULT_REFRESH,
+)
 
 # 重试次数常量
 ATTEMPT_TIME = 3
@@ -127,63 +138,53 @@ class ESConnection(VectorStoreConnection):
 
     async def insert_records(self, space_name: str, records: list[dict[str, Any]], **kwargs) -> list[str]:
         """ 
-        批量插入数据记录
+        批量插入数据记录（流式分块、有界并发，不深拷贝记录）
         Args:
             space_name: 空间名称
-            records: 要插入的记录列表，每个记录必须包含id字段
+            records: 要插入的记录列表（或生成器），每个记录必须包含id字段
             **kwargs: 其他参数
+                refresh: 刷新策略 false / wait_for / true，默认 wait_for
+                chunk_max_bytes: 单个 bulk 请求最大字节数
+                chunk_max_docs: 单个 bulk 请求最大文档数
+                max_in_flight: 同时在途的最大 bulk 请求数
         Returns:
-            list[str]: 插入失败的记录ID列表，成功时返回空列表
+            list[str]: 插入失败的记录列表（"id:错误信息"），成功时返回空列表
         """
         if not records:
             return []
         
         await self._ensure_connect()
-        
+
+        async def send(body: bytes, refresh: str):
+            return await self.es.bulk(index=space_name, operations=body,
+                                      refresh=refresh, timeout=f"{REQUEST_TIMEOUT}s")
+
+        async def refresh_space():
+            return await self.es.indices.refresh(index=space_name)
+
         try:
-            bulk_data = []
-            for record in records:
-                assert "_id" not in record
-                assert "id" in record
-
-                # 构建ES记录
-                es_record = copy.deepcopy(record)
-                meta_id = es_record.pop("id", "")                
-                bulk_data.append({
-                    "index": {
-                        "_index": space_name, 
-                        "_id": meta_id
-                    }
-                })
-                bulk_data.append(es_record)
-            
-            # 执行批量插入，带重试
-            for attempt in range(ATTEMPT_TIME):
-                try:
-                    r = await self.es.bulk(index=(space_name), operations=bulk_data,
-                                                refresh=True, timeout=f"{REQUEST_TIMEOUT}s")
-                    
-                    failed_records = []
-                    if r["errors"]:  # 如果有错误，收集错误信息
-                        for item in r["items"]:
-                            for action in ["create", "delete", "index", "update"]:
-                                if action in item and "error" in item[action]:
-                                    failed_records.append(str(item[action]["_id"]) + ":" + str(item[action]["error"]))
-                    return failed_records
-                
-                except Exception as e:
-                    if attempt < ATTEMPT_TIME - 1 and self._should_retry(e):
-                        logging.warning(f"批量插入失败，重试 (尝试 {attempt + 1}/{ATTEMPT_TIME}): {e}")
-                        await asyncio.sleep(RETRY_DELAY)
-                        continue
-                    else:
-                        logging.error(f"批量插入最终失败: {e}")
-                        return [str(e)]
-            
-            return []
+            indexer = BulkIndexer(
+                send=send,
+                refresh_space=refresh_space,
+                should_retry=self._should_retry,
+                chunk_max_bytes=kwargs.get("chunk_max_bytes", DEFAULT_CHUNK_MAX_BYTES),
+                chunk_max_docs=kwargs.get("chunk_max_docs", DEFAULT_CHUNK_MAX_DOCS),
+                max_in_flight=kwargs.get("max_in_flight", DEFAULT_MAX_IN_FLIGHT),
+                refresh=kwargs.get("refresh", DEFAULT_REFRESH),
+                attempt_time=ATTEMPT_TIME,
+                retry_delay=RETRY_DELAY,
+            )
+            trace = QueryTrace("insert_records", space_name, bulk=True)
+            failed = await indexer.index(space_name, records)
+            trace.add("build", indexer.build_time)
+            trace.mark("network")
+            trace.finish({"refresh": indexer.refresh, "failed": len(failed)})
+            return failed
+        except (AssertionError, ValueError):
+            raise
         except Exception as e:
             logging.error(f"Failed to insert records to {space_name}: {e}")
-            return []
+            return [str(e)]
 
     async def update_records(self, space_name: str, condition: dict, new_value: dict, fields_to_remove: list[str] = None, **kwargs) -> bool:
         """
@@ -336,7 +337,7 @@ class ESConnection(VectorStoreConnection):
                 else:
                     raise ValueError("Condition value must be int, str or list.")
         
-        logging.debug(f"delete_records query: {json.dumps(qry.to_dict())}")
+        logging.debug("delete_records query: %s", LazyJson(qry.to_dict))
 
         try:
             res = await self.es.delete_by_query(
@@ -403,10 +404,17 @@ class ESConnection(VectorStoreConnection):
         Args:
             space_names: 空间名称列表
             request: 搜索请求对象，包含查询条件、分页、排序等信息
-            **kwargs: 其他参数
+            **kwargs: 其他参数，fusion=False 时不做客户端融合（沿用单次查询）
         Returns:
             dict[str, Any]: 搜索结果，包含hits、total、aggregations等
         """
+        # 含 FusionExpr 的多路检索走客户端融合，子查询以 fusion=False 回到本方法
+        fusion = get_fusion_expr(request) if kwargs.pop("fusion", True) else None
+        if fusion is not None:
+            return await hybrid_search(self.search, space_names, request, fusion, **kwargs)
+
+        trace = QueryTrace("search", space_names)
+        query = None
         try:
             if not space_names:
                 logging.error(f"search: space_names is invalid")
@@ -440,6 +448,7 @@ class ESConnection(VectorStoreConnection):
             # 添加文本搜索
             search = Search()
             vector_similarity_weight = 0.5
+            use_knn = False
             if request.match_exprs:
                 for match_expr in request.match_exprs:
                     if isinstance(match_expr, FusionExpr) and match_expr.method == "weighted_sum" and "weights" in match_expr.fusion_params:
@@ -458,8 +467,13 @@ class ESConnection(VectorStoreConnection):
                                         minimum_should_match=minimum_should_match,
                                         boost=1))
                         bqry.boost = 1.0 - vector_similarity_weight
+                    elif isinstance(match_expr, MatchSparseExpr):
+                        clauses = sparse_query_clauses(match_expr)
+                        if clauses:
+                            bqry.must.append(Q("bool", should=[Q(c) for c in clauses], minimum_should_match=1))
                     elif isinstance(match_expr, MatchDenseExpr):
                         assert (bqry is not None)
+                        use_knn = True
                         similarity = 0.0
                         if "similarity" in match_expr.extra_options:
                             similarity = match_expr.extra_options["similarity"]
@@ -478,8 +492,9 @@ class ESConnection(VectorStoreConnection):
                         field = f"{request.rank_feature.field_prefix}.{field}"
                     bqry.should.append(Q("rank_feature", field=field, linear={}, boost=score))
 
-            # 应用查询
-            if bqry:
+            # 应用查询；纯向量检索（如融合中的向量路）的过滤条件只放在 knn.filter 中，
+            # 不再叠加仅含过滤的顶层查询，否则满足过滤的文档会以 0 分混入 kNN 结果
+            if bqry and not (use_knn and not bqry.must):
                 search = search.query(bqry)
             
             # 添加高亮
@@ -516,7 +531,8 @@ class ESConnection(VectorStoreConnection):
                 search = search[request.offset:request.offset + request.limit]
             
             query = search.to_dict()
-            logging.debug(f"search {str(space_names)} query: " + json.dumps(query))
+            trace.mark("build")
+            logging.debug("search %s query: %s", space_names, LazyJson(query))
 
             # 执行搜索
             for attempt in range(ATTEMPT_TIME):
@@ -527,13 +543,14 @@ class ESConnection(VectorStoreConnection):
                         timeout=f"{REQUEST_TIMEOUT}s", 
                         track_total_hits=True, 
                         _source=True)
+                    trace.mark("network")
 
                     if str(result.get("timed_out", "")).lower() == "true":
                         raise Exception("Es Timeout.")
 
-                    # ES 8.x 返回的是 ObjectApiResponse 对象，需要转换为字典才能序列化
-                    result_dict = dict(result) if hasattr(result, '__iter__') else result
-                    logging.debug(f"search {str(space_names)} result: " + json.dumps(result_dict))
+                    logging.debug("search %s result: %s", space_names, LazyJson(result))
+                    trace.mark("parse")
+                    trace.finish(query, result)
                     return result
                 except Exception as e:
                     if attempt < ATTEMPT_TIME - 1 and self._should_retry(e):
@@ -545,7 +562,8 @@ class ESConnection(VectorStoreConnection):
                         raise e
         
         except Exception as e:
-            logging.error(f"search {str(space_names)} query: " + json.dumps(query) + str(e))
+            logging.error("search %s query: %s %s", space_names, LazyJson(query), e)
+            trace.finish(query, error=e)
             raise e
         
         logging.error(f"search timeout for {ATTEMPT_TIME} times!")
@@ -654,29 +672,7 @@ class ESConnection(VectorStoreConnection):
             dict[str, str]: 高亮信息字典，key为文档ID，value为高亮文本
         """
         try:
-            highlight_data = {}
-            for hit in result["hits"]["hits"]:
-                highlights = hit.get("highlight")
-                if not highlights:
-                    continue
-                highlight_text = "...".join([text for text in list(highlights.items())[0][1]])
-                if not is_english(highlight_text.split()):
-                    highlight_data[hit["_id"]] = highlight_text
-                    continue
-
-                source_text = hit["_source"][field_name]
-                source_text = re.sub(r"[\r\n]", " ", source_text, flags=re.IGNORECASE | re.MULTILINE)
-                highlighted_sentences = []
-                for sentence in re.split(r"[.?!;\n]", source_text):
-                    for keyword in keywords:
-                        sentence = re.sub(r"(^|[ .?/'\"\(\)!,:;-])(%s)([ .?/'\"\(\)!,:;-])" % re.escape(keyword), r"\1<em>\2</em>\3", sentence,
-                                   flags=re.IGNORECASE | re.MULTILINE)
-                    if not re.search(r"<em>[^<>]+</em>", sentence, flags=re.IGNORECASE | re.MULTILINE):
-                        continue
-                    highlighted_sentences.append(sentence)
-                highlight_data[hit["_id"]] = "...".join(highlighted_sentences) if highlighted_sentences else "...".join([text for text in list(highlights.items())[0][1]])
-
-            return highlight_data
+            return highlight_engine.get_highlight(result, keywords, field_name)
         except Exception as e:
             logging.error(f"get_highlight error: {str(e)}")
             return {}
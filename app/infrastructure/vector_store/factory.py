@@ -4,6 +4,7 @@ from app.config import settings
 from app.infrastructure.vector_store.base import VectorStoreConnection
 from app.infrastructure.vector_store.es_conn import ESConnection
 from app.infrastructure.vector_store.opensearch_conn import OSConnection
+from app.infrastructure.vector_store.search_cache import CachedVectorStoreConnection, SearchResultCache
 
 
 class VectorStoreFactory:
@@ -51,6 +52,17 @@ class VectorStoreFactory:
                 )
             else:
                 raise ValueError(f"不支持的数据库类型: {db_type}")
+
+            if settings.vector_store_search_cache_enabled:
+                connection = CachedVectorStoreConnection(
+                    connection,
+                    SearchResultCache(
+                        max_entries=settings.vector_store_search_cache_max_entries,
+                        ttl=settings.vector_store_search_cache_ttl,
+                        use_redis=settings.vector_store_search_cache_redis,
+                    ),
+                )
+                logging.info("向量存储检索结果缓存已启用")
             
             # 保存连接信息
             self._connection = connection
@@ -0,0 +1,242 @@
+"""
+客户端混合检索融合：文本 / 稠密向量 / 稀疏向量各路并发检索，在客户端按 RRF 或加权和融合
+
+请求中包含 FusionExpr、检索路数 >= 2 且未指定 order_by 时启用（显式排序的请求走原生单次查询，由引擎按 sort 排序）：
+- 每路拆成只含单个检索表达式的子请求，窗口大小取 max(该路 topn, offset + limit)，并发执行；
+- rrf：score = Σ w_i / (rrf_k + rank_i)；
+- weighted_sum：各路得分先经 NumPy 向量化归一化（minmax / max / none），再按权重加权求和；
+- 融合结果按 offset/limit 分页，返回与原生检索一致的 {hits: {total, hits}} 结构，get_total 等辅助方法可直接复用。
+
+FusionExpr.fusion_params 支持：
+    weights: 各路权重，"0.3,0.7" 或 [0.3, 0.7]，按检索表达式出现顺序，缺省等权
+    rrf_k: RRF 平滑常数，默认 60
+    normalize: weighted_sum 的归一化方式，默认 minmax
+"""
+import asyncio
+import copy
+import dataclasses
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+import numpy as np
+from .base import (
+    SearchRequest,
+    SparseVector,
+    MatchTextExpr,
+    MatchDenseExpr,
+    MatchSparseExpr,
+    FusionExpr,
+)
+
+DEFAULT_RRF_K = 60
+FUSION_METHODS = ("rrf", "weighted_sum")
+NORMALIZE_METHODS = ("minmax", "max", "none")
+
+LEG_EXPR_TYPES = (MatchTextExpr, MatchDenseExpr, MatchSparseExpr)
+
+SearchFunc = Callable[..., Awaitable[Any]]
+
+
+def get_fusion_expr(request: SearchRequest) -> Optional[FusionExpr]:
+    """请求包含 FusionExpr、检索路数不少于 2 且未指定 order_by 时返回该 FusionExpr，否则返回 None"""
+    # 融合结果按融合得分排序，显式排序的请求交给原生查询的 sort，避免排序被忽略
+    if not request.match_exprs or request.order_by:
+        return None
+    fusion = next((e for e in request.match_exprs if isinstance(e, FusionExpr)), None)
+    if fusion is None:
+        return None
+    legs = [e for e in request.match_exprs if isinstance(e, LEG_EXPR_TYPES)]
+    return fusion if len(legs) >= 2 else None
+
+
+def parse_weights(weights: Any, n: int) -> np.ndarray:
+    """解析权重参数，长度不符或缺省时等权"""
+    if isinstance(weights, str):
+        weights = [w for w in weights.split(",") if w.strip()]
+    try:
+        values = np.asarray([float(w) for w in (weights or [])], dtype=np.float64)
+    except (TypeError, ValueError):
+        values = np.empty(0)
+    if values.size != n:
+        if values.size:
+            logging.warning(f"融合权重数量 {values.size} 与检索路数 {n} 不一致，改为等权")
+        values = np.ones(n, dtype=np.float64)
+    return values
+
+
+def normalize_scores(scores: np.ndarray, method: str = "minmax") -> np.ndarray:
+    """单路得分归一化"""
+    if scores.size == 0 or method == "none":
+        return scores
+    if method == "max":
+        top = scores.max()
+        return scores / top if top > 0 else np.ones_like(scores)
+    if method == "minmax":
+        low, high = scores.min(), scores.max()
+        if high - low <= 0:
+            return np.ones_like(scores)
+        return (scores - low) / (high - low)
+    raise ValueError(f"不支持的归一化方式: {method}，可选值: {', '.join(NORMALIZE_METHODS)}")
+
+
+def fuse_rankings(
+    legs: Sequence[Sequence[str]],
+    leg_scores: Sequence[np.ndarray],
+    method: str,
+    weights: np.ndarray,
+    rrf_k: int = DEFAULT_RRF_K,
+    normalize: str = "minmax",
+) -> List[tuple]:
+    """
+    融合多路排序结果
+    Args:
+        legs: 每路按得分降序排列的文档ID
+        leg_scores: 每路对应的原始得分
+        method: rrf 或 weighted_sum
+        weights: 每路权重
+        rrf_k: RRF 平滑常数
+        normalize: weighted_sum 的归一化方式
+    Returns:
+        List[tuple]: (文档ID, 融合得分)，按融合得分降序
+    """
+    if method not in FUSION_METHODS:
+        raise ValueError(f"不支持的融合方式: {method}，可选值: {', '.join(FUSION_METHODS)}")
+
+    index: Dict[str, int] = {}
+    for ids in legs:
+        for doc_id in ids:
+            index.setdefault(doc_id, len(index))
+    if not index:
+        return []
+
+    # 行为检索路、列为文档，未命中该路的文档贡献为 0
+    matrix = np.zeros((len(legs), len(index)), dtype=np.float64)
+    for i, (ids, scores) in enumerate(zip(legs, leg_scores)):
+        if not ids:
+            continue
+        cols = np.fromiter((index[d] for d in ids), dtype=np.int64, count=len(ids))
+        if method == "rrf":
+            matrix[i, cols] = 1.0 / (rrf_k + np.arange(1, len(ids) + 1, dtype=np.float64))
+        else:
+            matrix[i, cols] = normalize_scores(np.asarray(scores, dtype=np.float64), normalize)
+
+    fused = weights @ matrix
+    order = np.argsort(-fused, kind="stable")
+    ids = list(index.keys())
+    return [(ids[j], float(fused[j])) for j in order]
+
+
+def sparse_query_clauses(expr: MatchSparseExpr) -> List[dict]:
+    """将稀疏向量转为 rank_feature 子句（字段类型为 rank_features），ES 与 OpenSearch 通用"""
+    data = expr.sparse_data
+    if isinstance(data, SparseVector):
+        values = data.values if data.values is not None else [1.0] * len(data.indices)
+        items = zip((str(i) for i in data.indices), values)
+    else:
+        items = data.items()
+    return [
+        {"rank_feature": {"field": f"{expr.vector_column_name}.{token}", "linear": {}, "boost": float(weight)}}
+        for token, weight in items if weight and float(weight) > 0
+    ]
+
+
+def _leg_request(request: SearchRequest, expr, window: int, primary: bool) -> SearchRequest:
+    """构造单路子请求；聚合与排名特征只放在首路，子请求不排序以保留相关度顺序"""
+    if isinstance(expr, (MatchDenseExpr, MatchSparseExpr)) and expr.topn < window:
+        expr = copy.copy(expr)
+        expr.topn = window
+    limit = expr.topn if isinstance(expr, (MatchDenseExpr, MatchSparseExpr)) else window
+    return dataclasses.replace(
+        request,
+        match_exprs=[expr],
+        order_by=None,
+        offset=0,
+        limit=limit,
+        agg_fields=request.agg_fields if primary else None,
+        rank_feature=request.rank_feature if primary else None,
+    )
+
+
+async def hybrid_search(search: SearchFunc, space_names: list[str], request: SearchRequest, fusion: FusionExpr, **kwargs) -> dict[str, Any]:
+    """
+    并发执行各路检索并在客户端融合
+    Args:
+        search: 连接的 search 方法，子请求以 fusion=False 调用
+        space_names: 空间名称列表
+        request: 原始检索请求
+        fusion: 融合表达式
+        **kwargs: 透传给 search 的其他参数
+    Returns:
+        dict[str, Any]: 与原生检索结果结构一致的融合结果
+    """
+    exprs = [e for e in request.match_exprs if isinstance(e, LEG_EXPR_TYPES)]
+    params = fusion.fusion_params
+    weights = parse_weights(params.get("weights"), len(exprs))
+    window = max(request.offset + request.limit, fusion.topn or 0, 1)
+
+    leg_requests = [_leg_request(request, e, window, i == 0) for i, e in enumerate(exprs)]
+    results = await asyncio.gather(
+        *(search(space_names, r, fusion=False, **kwargs) for r in leg_requests),
+        return_exceptions=True,
+    )
+
+    # 单路失败时降级为其余路融合，全部失败才抛出
+    ok = [(w, r) for w, r in zip(weights, results) if not isinstance(r, BaseException) and r is not None]
+    errors = [r for r in results if isinstance(r, BaseException)]
+    for e in errors:
+        logging.warning(f"混合检索子查询失败，按其余检索路融合: {e}")
+    if not ok:
+        if errors:
+            raise errors[0]
+        return None
+
+    legs, leg_scores, hits_by_id = [], [], {}
+    total, took = 0, 0
+    aggregations = None
+    for _, result in ok:
+        result = getattr(result, "body", result)  # ES 8.x ObjectApiResponse
+        hits = result["hits"]["hits"]
+        legs.append([h["_id"] for h in hits])
+        leg_scores.append(np.fromiter((h.get("_score") or 0.0 for h in hits), dtype=np.float64, count=len(hits)))
+        for h in hits:
+            existing = hits_by_id.get(h["_id"])
+            if existing is None:
+                hits_by_id[h["_id"]] = dict(h)
+            elif "highlight" in h and "highlight" not in existing:
+                existing["highlight"] = h["highlight"]
+        leg_total = result["hits"].get("total", 0)
+        total = max(total, leg_total.get("value", 0) if isinstance(leg_total, dict) else leg_total)
+        took = max(took, result.get("took", 0) or 0)
+        if aggregations is None and "aggregations" in result:
+            aggregations = result["aggregations"]
+
+    fused = fuse_rankings(
+        legs,
+        leg_scores,
+        fusion.method,
+        np.asarray([w for w, _ in ok], dtype=np.float64),
+        rrf_k=int(params.get("rrf_k", DEFAULT_RRF_K)),
+        normalize=params.get("normalize", "minmax"),
+    )
+    if fusion.topn:
+        fused = fused[:fusion.topn]
+    total = max(total, len(fused))
+
+    page = fused[request.offset:request.offset + request.limit] if request.limit > 0 else fused[request.offset:]
+    hits = []
+    for doc_id, score in page:
+        hit = hits_by_id[doc_id]
+        hit["_score"] = score
+        hits.append(hit)
+
+    response = {
+        "took": took,
+        "timed_out": False,
+        "hits": {
+            "total": {"value": total, "relation": "eq"},
+            "max_score": hits[0]["_score"] if hits else None,
+            "hits": hits,
+        },
+    }
+    if aggregations is not None:
+        response["aggregations"] = aggregations
+    return response
@@ -0,0 +1,61 @@
+"""
+检索结果高亮：ES 与 OpenSearch 共用
+
+- 每组关键词只编译一次交替正则（按关键词元组缓存），长关键词优先；
+- 边界用零宽断言表达，相邻关键词、重复出现的关键词都能被标记；
+- 每个文档只做一次替换，再按句切分、保留含 <em> 的句子，行为与原逐句逐关键词替换一致：
+  关键词前需为句首或分隔符，后需紧跟句内分隔符（句末不计）。
+"""
+import re
+from functools import lru_cache
+from typing import Any, Dict, Optional, Sequence
+from .utils import is_english
+
+# 原实现中的边界字符：[ .?/'"()!,:;-]；切句字符 .?!; 不会出现在句内，故不参与后边界
+_LEADING_BOUNDARY = r"(?<![^ .?/'\"()!,:;\-])"
+_TRAILING_BOUNDARY = r"(?=[ /'\"(),:\-])"
+_LINE_BREAK = re.compile(r"[\r\n]")
+_SENTENCE_SPLIT = re.compile(r"[.?!;\n]")
+_EMPHASIS = re.compile(r"<em>[^<>]+</em>", flags=re.IGNORECASE)
+
+
+@lru_cache(maxsize=256)
+def compile_keywords(keywords: tuple) -> Optional[re.Pattern]:
+    """将关键词组编译为单个交替正则，无有效关键词时返回 None"""
+    words = sorted({k for k in keywords if k}, key=len, reverse=True)
+    if not words:
+        return None
+    alternation = "|".join(re.escape(k) for k in words)
+    return re.compile(f"{_LEADING_BOUNDARY}({alternation}){_TRAILING_BOUNDARY}", flags=re.IGNORECASE)
+
+
+def mark_sentences(pattern: re.Pattern, source_text: str) -> str:
+    """对单个文档做关键词标记，返回含标记句子的拼接，无命中返回空串"""
+    marked = pattern.sub(r"<em>\1</em>", _LINE_BREAK.sub(" ", source_text))
+    return "...".join(s for s in _SENTENCE_SPLIT.split(marked) if _EMPHASIS.search(s))
+
+
+def get_highlight(result, keywords: Sequence[str], field_name: str) -> Dict[str, Any]:
+    """
+    获取检索结果的高亮信息
+    Args:
+        result: 检索结果
+        keywords: 关键词列表
+        field_name: 高亮字段名
+    Returns:
+        Dict[str, Any]: 文档ID -> 高亮文本
+    """
+    pattern = compile_keywords(tuple(keywords or ()))
+    highlight_data = {}
+    for hit in result["hits"]["hits"]:
+        highlights = hit.get("highlight")
+        if not highlights:
+            continue
+        highlight_text = "...".join(next(iter(highlights.values())))
+        if pattern is None or not is_english(highlight_text.split()):
+            highlight_data[hit["_id"]] = highlight_text
+            continue
+
+        marked = mark_sentences(pattern, hit["_source"][field_name])
+        highlight_data[hit["_id"]] = marked or highlight_text
+    return highlight_data
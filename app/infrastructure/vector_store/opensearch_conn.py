@@ -13,10 +13,21 @@ from .base import (
     SearchRequest, 
     MatchTextExpr, 
     MatchDenseExpr, 
+    MatchSparseExpr,
     FusionExpr, 
     SortOrder
 )
-from .utils import get_float, is_english
+from .utils import get_float
+from . import highlight as highlight_engine
+from .fusion import get_fusion_expr, hybrid_search, sparse_query_clauses
+from .tracing import LazyJson, QueryTrace
+from .bulk import (
+    BulkIndexer,
+    DEFAULT_CHUNK_MAX_BYTES,
+    DEFAULT_CHUNK_MAX_DOCS,
+    DEFAULT_MAX_IN_FLIGHT,
+    DEFAULT_REFRESH,
+)
 
 # 重试次数常量
 ATTEMPT_TIME = 3
@@ -131,53 +142,56 @@ class OSConnection(VectorStoreConnection):
     async def insert_records(self, space_name: str, records: list[dict[str, Any]], **kwargs) -> list[str]:
         """
         批量插入文档
-        将文档记录批量插入到OpenSearch索引中
+        将文档记录流式分块、有界并发地写入OpenSearch索引，不深拷贝记录
         Args:
             space_name: 索引名称
-            records: 要插入的文档记录列表
+            records: 要插入的文档记录列表（或生成器）
             **kwargs: 其他参数
+                refresh: 刷新策略 false / wait_for / true，默认 wait_for
+                chunk_max_bytes: 单个 bulk 请求最大字节数
+                chunk_max_docs: 单个 bulk 请求最大文档数
+                max_in_flight: 同时在途的最大 bulk 请求数
         Returns:
-            list[str]: 插入失败的记录ID列表，成功时返回空列表
+            list[str]: 插入失败的记录列表（"id:错误信息"），成功时返回空列表
         """
         await self._ensure_connect()
         
         if not records:
             return []
-        
-        operations = []
-        for document in records:
-            assert "_id" not in document
-            assert "id" in document
-            document_copy = copy.deepcopy(document)
-            meta_id = document_copy.pop("id", "")
-            operations.append(
-                {"index": {"_index": space_name, "_id": meta_id}})
-            operations.append(document_copy)
 
-        for attempt in range(ATTEMPT_TIME):
-            try:
-                response = await asyncio.to_thread(
-                    lambda: self.os.bulk(index=(space_name), body=operations, refresh=True, timeout=f"{REQUEST_TIMEOUT}s")
-                )
-                
-                failed_records = []
-                if response["errors"]:  # 如果有错误，收集错误信息
-                    for item in response["items"]:
-                        for action in ["create", "delete", "index", "update"]:
-                            if action in item and "error" in item[action]:
-                                failed_records.append(str(item[action]["_id"]) + ":" + str(item[action]["error"]))
-                return failed_records
-            
-            except Exception as e:
-                if attempt < ATTEMPT_TIME - 1 and self._should_retry(e):
-                    logging.warning(f"批量插入失败，重试 (尝试 {attempt + 1}/{ATTEMPT_TIME}): {e}")
-                    await asyncio.sleep(RETRY_DELAY)
-                    continue
-                else:
-                    logging.error(f"批量插入最终失败: {e}")
-                    return [str(e)]
-        
-        return []  # Should not be reached if exceptions are raised or retries exhausted
+        async def send(body: bytes, refresh: str):
+            # 同步客户端，在线程中执行；NDJSON 整块解码一次交给客户端
+            return await asyncio.to_thread(
+                lambda: self.os.bulk(index=space_name, body=body.decode("utf-8"),
+                                     refresh=refresh, timeout=f"{REQUEST_TIMEOUT}s")
+            )
+
+        async def refresh_space():
+            return await asyncio.to_thread(lambda: self.os.indices.refresh(index=space_name))
+
+        try:
+            indexer = BulkIndexer(
+                send=send,
+                refresh_space=refresh_space,
+                should_retry=self._should_retry,
+                chunk_max_bytes=kwargs.get("chunk_max_bytes", DEFAULT_CHUNK_MAX_BYTES),
+                chunk_max_docs=kwargs.get("chunk_max_docs", DEFAULT_CHUNK_MAX_DOCS),
+                max_in_flight=kwargs.get("max_in_flight", DEFAULT_MAX_IN_FLIGHT),
+                refresh=kwargs.get("refresh", DEFAULT_REFRESH),
+                attempt_time=ATTEMPT_TIME,
+                retry_delay=RETRY_DELAY,
+            )
+            trace = QueryTrace("insert_records", space_name, bulk=True)
+            failed = await indexer.index(space_name, records)
+            trace.add("build", indexer.build_time)
+            trace.mark("network")
+            trace.finish({"refresh": indexer.refresh, "failed": len(failed)})
+            return failed
+        except (AssertionError, ValueError):
+            raise
+        except Exception as e:
+            logging.error(f"Failed to insert records to {space_name}: {e}")
+            return [str(e)]
 
     async def update_records(self, space_name: str, condition: dict, new_value: dict, fields_to_remove: list[str] = None, **kwargs) -> bool:
         """
@@ -337,7 +351,7 @@ class OSConnection(VectorStoreConnection):
                 else:
                     raise ValueError("Condition value must be int, str or list.")
         
-        logging.debug(f"delete query: {json.dumps(qry.to_dict())}")
+        logging.debug("delete query: %s", LazyJson(qry.to_dict))
         for attempt in range(ATTEMPT_TIME):
             try:
                 res = await asyncio.to_thread(
@@ -415,10 +429,17 @@ class OSConnection(VectorStoreConnection):
         Args:
             space_names: 索引名称列表
             request: 搜索请求对象，包含查询条件、分页、排序等信息
-            **kwargs: 其他参数
+            **kwargs: 其他参数，fusion=False 时不做客户端融合（沿用单次查询）
         Returns:
             dict[str, Any]: 搜索结果，包含hits、total、aggregations等
         """
+        # 含 FusionExpr 的多路检索走客户端融合，子查询以 fusion=False 回到本方法
+        fusion = get_fusion_expr(request) if kwargs.pop("fusion", True) else None
+        if fusion is not None:
+            return await hybrid_search(self.search, space_names, request, fusion, **kwargs)
+
+        trace = QueryTrace("search", space_names)
+        query = None
         await self._ensure_connect()
         
         try:
@@ -473,6 +494,10 @@ class OSConnection(VectorStoreConnection):
                                         minimum_should_match=minimum_should_match,
                                         boost=1))
                         bqry.boost = 1.0 - vector_similarity_weight
+                    elif isinstance(match_expr, MatchSparseExpr):
+                        clauses = sparse_query_clauses(match_expr)
+                        if clauses:
+                            bqry.must.append(Q("bool", should=[Q(c) for c in clauses], minimum_should_match=1))
                     elif isinstance(match_expr, MatchDenseExpr):
                         assert (bqry is not None)
                         similarity = 0.0
@@ -537,7 +562,8 @@ class OSConnection(VectorStoreConnection):
                 del query["query"]
                 query["query"] = {"knn": knn_query}
             
-            logging.debug(f"search {str(space_names)} query: " + json.dumps(query))
+            trace.mark("build")
+            logging.debug("search %s query: %s", space_names, LazyJson(query))
 
             # 执行搜索
             for attempt in range(ATTEMPT_TIME):
@@ -551,11 +577,14 @@ class OSConnection(VectorStoreConnection):
                             _source=True
                         )
                     )
+                    trace.mark("network")
 
                     if str(result.get("timed_out", "")).lower() == "true":
                         raise Exception("OpenSearch Timeout.")
 
-                    logging.debug(f"search {str(space_names)} res: " + str(result))
+                    logging.debug("search %s res: %s", space_names, LazyJson(result))
+                    trace.mark("parse")
+                    trace.finish(query, result)
                     return result
                 except Exception as e:
                     if attempt < ATTEMPT_TIME - 1 and self._should_retry(e):
@@ -567,7 +596,8 @@ class OSConnection(VectorStoreConnection):
                         raise e
         
         except Exception as e:
-            logging.error(f"search {str(space_names)} query: " + json.dumps(query) + str(e))
+            logging.error("search %s query: %s %s", space_names, LazyJson(query), e)
+            trace.finish(query, error=e)
             raise e
 
     """
@@ -676,29 +706,7 @@ class OSConnection(VectorStoreConnection):
             dict[str, Any]: 以文档ID为键，高亮文本为值的字典
         """
         try:
-            highlight_data = {}
-            for hit in result["hits"]["hits"]:
-                highlights = hit.get("highlight")
-                if not highlights:
-                    continue
-                highlight_text = "...".join([text for text in list(highlights.items())[0][1]])
-                if not is_english(highlight_text.split()):
-                    highlight_data[hit["_id"]] = highlight_text
-                    continue
-
-                source_text = hit["_source"][field_name]
-                source_text = re.sub(r"[\r\n]", " ", source_text, flags=re.IGNORECASE | re.MULTILINE)
-                highlighted_sentences = []
-                for sentence in re.split(r"[.?!;\n]", source_text):
-                    for keyword in keywords:
-                        sentence = re.sub(r"(^|[ .?/'\"\(\)!,:;-])(%s)([ .?/'\"\(\)!,:;-])" % re.escape(keyword), r"\1<em>\2</em>\3", sentence,
-                                   flags=re.IGNORECASE | re.MULTILINE)
-                    if not re.search(r"<em>[^<>]+</em>", sentence, flags=re.IGNORECASE | re.MULTILINE):
-                        continue
-                    highlighted_sentences.append(sentence)
-                highlight_data[hit["_id"]] = "...".join(highlighted_sentences) if highlighted_sentences else "...".join([text for text in list(highlights.items())[0][1]])
-
-            return highlight_data
+            return highlight_engine.get_highlight(result, keywords, field_name)
         except Exception as e:
             logging.error(f"get_highlight error: {str(e)}")
             return {}
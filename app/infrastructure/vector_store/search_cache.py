@@ -0,0 +1,261 @@
+"""
+向量存储检索结果缓存：包装 VectorStoreConnection.search 的可选缓存层
+
+- 缓存键：空间名称（排序）+ 各空间代数 + SearchRequest 与透传参数规范化序列化后的 sha1；
+- 两级缓存：进程内 LRU（条数上限 + TTL），可选 Redis 层（多进程共享）；
+- 失效：insert_records / update_records / delete_records 等写操作使对应空间的代数 +1，
+  旧键自然不可达，无需扫描删除；启用 Redis 层时代数同时记录在 Redis 中，其他进程的写入同样可见；
+- 结果以 JSON 字符串存放，命中时重新解析，调用方修改返回值（如 get_source）不会污染缓存；
+  未命中时同样返回响应体 dict（ES 8.x 的 ObjectApiResponse 取 body），命中与否返回类型一致。
+"""
+import dataclasses
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from enum import Enum
+from typing import Any, Dict, List, Optional, Tuple
+from app.infrastructure.redis import REDIS_CONN, RedisSpaceEnum
+from .base import VectorStoreConnection, SearchRequest
+
+
+def _canonical(obj: Any) -> Any:
+    """将查询对象转换为可稳定序列化的结构"""
+    if obj is None or isinstance(obj, (str, int, float, bool)):
+        return obj
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, dict):
+        return {str(k): _canonical(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_canonical(v) for v in obj]
+    if isinstance(obj, (set, frozenset)):
+        return sorted((_canonical(v) for v in obj), key=repr)
+    tobytes = getattr(obj, "tobytes", None)
+    if tobytes is not None and hasattr(obj, "dtype"):
+        # ndarray 按原始字节摘要，避免展开成大列表
+        return ["ndarray", str(obj.dtype), list(getattr(obj, "shape", ())), hashlib.sha1(tobytes()).hexdigest()]
+    if dataclasses.is_dataclass(obj):
+        fields = {f.name: _canonical(getattr(obj, f.name)) for f in dataclasses.fields(obj)}
+        return [type(obj).__name__, fields]
+    if hasattr(obj, "__dict__"):
+        return [type(obj).__name__, _canonical(vars(obj))]
+    return repr(obj)
+
+
+def make_search_key(space_names: List[str], request: SearchRequest, generations: List[Any], params: Optional[Dict[str, Any]] = None) -> str:
+    """根据空间名称、空间代数、查询内容与透传给 search 的参数生成缓存键"""
+    payload = json.dumps(
+        [sorted(space_names), generations, _canonical(request), _canonical(params or {})],
+        ensure_ascii=False, sort_keys=True, separators=(",", ":"),
+    )
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class SearchResultCache:
+    """检索结果两级缓存（进程内 LRU + 可选 Redis）"""
+
+    SPACE = RedisSpaceEnum.BUSINESS
+
+    def __init__(self, max_entries: int = 1024, ttl: int = 300, use_redis: bool = False):
+        """
+        Args:
+            max_entries: 进程内 LRU 最大条目数
+            ttl: 缓存有效期（秒），两级共用
+            use_redis: 是否启用 Redis 共享层
+        """
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self.use_redis = use_redis
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _result_key(key: str) -> str:
+        return f"vs_search:{key}"
+
+    @staticmethod
+    def _generation_key(space_name: str) -> str:
+        return f"vs_search_gen:{space_name}"
+
+    async def make_key(self, space_names: List[str], request: SearchRequest, params: Optional[Dict[str, Any]] = None) -> str:
+        """计算缓存键；启用 Redis 层时额外读取各空间的全局代数（一次 MGET）"""
+        names = sorted(space_names)
+        generations: List[Any] = [self._generations.get(name, 0) for name in names]
+        if self.use_redis:
+            remote = await REDIS_CONN.mget([self._generation_key(name) for name in names], self.SPACE)
+            generations = [[local, value or 0] for local, value in zip(generations, remote)]
+        return make_search_key(names, request, generations, params)
+
+    async def get(self, key: str) -> Optional[dict]:
+        """获取缓存结果，未命中返回None"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, payload = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return json.loads(payload)
+            del self._entries[key]
+
+        if self.use_redis:
+            payload = await REDIS_CONN.get(self._result_key(key), self.SPACE)
+            if payload:
+                self._put_local(key, payload)
+                self.redis_hits += 1
+                return json.loads(payload)
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, result: Any) -> None:
+        """写入缓存；结果不可序列化时跳过"""
+        body = getattr(result, "body", result)  # ES 8.x ObjectApiResponse
+        try:
+            payload = json.dumps(body, ensure_ascii=False)
+        except (TypeError, ValueError) as e:
+            logging.warning(f"检索结果无法序列化，跳过缓存: {e}")
+            return
+        self._put_local(key, payload)
+        if self.use_redis:
+            await REDIS_CONN.set(self._result_key(key), payload, self.ttl, self.SPACE)
+
+    def _put_local(self, key: str, payload: str) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, payload)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def invalidate(self, space_name: str) -> None:
+        """使某空间的全部缓存结果失效"""
+        self._generations[space_name] = self._generations.get(space_name, 0) + 1
+        self.invalidations += 1
+        if self.use_redis:
+            await REDIS_CONN.incr(self._generation_key(space_name), space=self.SPACE)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取缓存统计，用于评估命中率与容量"""
+        lookups = self.hits + self.redis_hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "use_redis": self.use_redis,
+            "hits": self.hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "hit_rate": (self.hits + self.redis_hits) / lookups if lookups else 0.0,
+        }
+
+
+class CachedVectorStoreConnection(VectorStoreConnection):
+    """带检索结果缓存的向量存储连接，其余操作透传给被包装的连接"""
+
+    def __init__(self, connection: VectorStoreConnection, cache: SearchResultCache):
+        self.connection = connection
+        self.cache = cache
+
+    def __getattr__(self, name: str):
+        # 未显式包装的属性（如 es/os 客户端、_ensure_connect 等）透传
+        return getattr(self.connection, name)
+
+    def get_db_type(self) -> str:
+        return self.connection.get_db_type()
+
+    async def health_check(self) -> bool:
+        return await self.connection.health_check()
+
+    async def close(self):
+        self.cache.clear()
+        return await self.connection.close()
+
+    async def create_space(self, space_name: str, vector_size: int, **kwargs) -> bool:
+        result = await self.connection.create_space(space_name, vector_size, **kwargs)
+        await self.cache.invalidate(space_name)
+        return result
+
+    async def delete_space(self, space_name: str, **kwargs) -> bool:
+        result = await self.connection.delete_space(space_name, **kwargs)
+        await self.cache.invalidate(space_name)
+        return result
+
+    async def space_exists(self, space_name: str, **kwargs) -> bool:
+        return await self.connection.space_exists(space_name, **kwargs)
+
+    async def insert_records(self, space_name: str, records: list[dict[str, Any]], **kwargs) -> list[str]:
+        try:
+            return await self.connection.insert_records(space_name, records, **kwargs)
+        finally:
+            await self.cache.invalidate(space_name)
+
+    async def update_records(self, space_name: str, condition: dict[str, Any], new_value: dict[str, Any], fields_to_remove: list[str] = None, **kwargs) -> bool:
+        try:
+            return await self.connection.update_records(space_name, condition, new_value, fields_to_remove, **kwargs)
+        finally:
+            await self.cache.invalidate(space_name)
+
+    async def delete_records(self, space_name: str, condition: dict[str, Any], **kwargs) -> int:
+        try:
+            return await self.connection.delete_records(space_name, condition, **kwargs)
+        finally:
+            await self.cache.invalidate(space_name)
+
+    async def get_record(self, space_names: list[str], record_id: str, **kwargs) -> Optional[dict[str, Any]]:
+        return await self.connection.get_record(space_names, record_id, **kwargs)
+
+    async def search(self, space_names: list[str], request: SearchRequest, **kwargs) -> dict[str, Any]:
+        """
+        带缓存的检索；kwargs 传入 use_cache=False 时绕过缓存
+        """
+        if not kwargs.pop("use_cache", True) or not space_names:
+            return await self.connection.search(space_names, request, **kwargs)
+
+        try:
+            key = await self.cache.make_key(space_names, request, kwargs)
+        except Exception as e:
+            logging.warning(f"检索缓存键计算失败，直接查询: {e}")
+            return await self.connection.search(space_names, request, **kwargs)
+
+        cached = await self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        result = await self.connection.search(space_names, request, **kwargs)
+        if result is None:
+            return None
+        result = getattr(result, "body", result)  # ES 8.x ObjectApiResponse，与命中时的 dict 保持一致
+        await self.cache.set(key, result)
+        return result
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        return self.cache.get_stats()
+
+    def get_total(self, result) -> int:
+        return self.connection.get_total(result)
+
+    def get_chunk_ids(self, result) -> list[str]:
+        return self.connection.get_chunk_ids(result)
+
+    def get_fields(self, result, fields: list[str]) -> dict[str, dict]:
+        return self.connection.get_fields(result, fields)
+
+    def get_highlight(self, result, keywords: list[str], field_name: str):
+        return self.connection.get_highlight(result, keywords, field_name)
+
+    def get_aggregation(self, result, field_name: str):
+        return self.connection.get_aggregation(result, field_name)
+
+    async def sql(self, sql: str, fetch_size: int, format: str, **kwargs):
+        return await self.connection.sql(sql, fetch_size, format, **kwargs)
@@ -0,0 +1,128 @@
+"""
+向量存储查询追踪：惰性负载日志 + 按请求采样的分阶段计时
+
+- LazyJson：作为 logging 的 %s 参数传入，只有日志真正输出时才序列化（DEBUG 关闭时零序列化开销）；
+- QueryTrace：记录 build（查询构建/序列化）/ network（请求往返）/ parse（结果处理）各阶段耗时，
+  仅在请求被采样或总耗时超过慢查询阈值时，将计时与查询/结果负载写入独立的滚动文件；
+  批量写入使用单独的阈值（vector_store_trace_bulk_slow_ms），避免大批量写入全部记为慢查询。
+"""
+import json
+import logging
+import os
+import random
+import time
+from logging.handlers import RotatingFileHandler
+from typing import Any, Dict, Optional
+from app.config.settings import settings
+
+_TRACE_LOGGER_NAME = "vector_store.trace"
+_trace_logger: Optional[logging.Logger] = None
+
+
+def _json_default(o):
+    tolist = getattr(o, "tolist", None)
+    if tolist is not None:
+        return tolist()
+    return str(o)
+
+
+class LazyJson:
+    """延迟序列化的日志参数；obj 可为可调用对象（如 qry.to_dict），输出时才求值"""
+    __slots__ = ("obj",)
+
+    def __init__(self, obj: Any):
+        self.obj = obj
+
+    def __str__(self) -> str:
+        obj = self.obj() if callable(self.obj) else self.obj
+        obj = getattr(obj, "body", obj)  # ES 8.x ObjectApiResponse
+        try:
+            return json.dumps(obj, ensure_ascii=False, default=_json_default)
+        except (TypeError, ValueError):
+            return str(obj)
+
+
+def _get_trace_logger() -> logging.Logger:
+    """首次落盘时才创建滚动文件 Handler，不向根 Logger 传播"""
+    global _trace_logger
+    if _trace_logger is None:
+        logger = logging.getLogger(_TRACE_LOGGER_NAME)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        if not logger.handlers:
+            path = settings.vector_store_trace_file
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            handler = RotatingFileHandler(
+                path,
+                maxBytes=settings.vector_store_trace_max_bytes,
+                backupCount=settings.vector_store_trace_backup_count,
+                encoding="utf-8",
+            )
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            logger.addHandler(handler)
+        _trace_logger = logger
+    return _trace_logger
+
+
+class QueryTrace:
+    """单次请求的追踪记录"""
+    __slots__ = ("op", "space_names", "slow_ms", "sampled", "phases", "_start", "_last")
+
+    def __init__(self, op: str, space_names: Any, bulk: bool = False):
+        """
+        Args:
+            op: 操作名
+            space_names: 空间名称
+            bulk: 是否为批量写入，批量写入使用 vector_store_trace_bulk_slow_ms 作为慢操作阈值
+        """
+        self.op = op
+        self.space_names = space_names
+        self.slow_ms = settings.vector_store_trace_bulk_slow_ms if bulk else settings.vector_store_trace_slow_ms
+        rate = settings.vector_store_trace_sample_rate
+        self.sampled = rate > 0 and random.random() < rate
+        self.phases: Dict[str, float] = {}
+        self._start = self._last = time.perf_counter()
+
+    def mark(self, phase: str) -> None:
+        """记录自上一次 mark 以来的耗时，同名阶段累加（如重试的多次网络请求）"""
+        now = time.perf_counter()
+        self.phases[phase] = self.phases.get(phase, 0.0) + (now - self._last)
+        self._last = now
+
+    def add(self, phase: str, seconds: float) -> None:
+        """记录与其他阶段交错、在别处测得的耗时（如 bulk 边序列化边发送），下一次 mark 扣除这部分"""
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+        self._last += seconds
+
+    @property
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self._start) * 1000
+
+    def finish(self, query: Any = None, result: Any = None, error: Optional[BaseException] = None) -> None:
+        """请求结束：仅采样或慢查询才序列化负载并落盘"""
+        total_ms = self.elapsed_ms
+        slow = 0 < self.slow_ms <= total_ms
+        if not (self.sampled or slow):
+            return
+        record = {
+            "ts": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "op": self.op,
+            "spaces": self.space_names,
+            "total_ms": round(total_ms, 3),
+            "phases_ms": {k: round(v * 1000, 3) for k, v in self.phases.items()},
+            "sampled": self.sampled,
+            "slow": slow,
+        }
+        if error is not None:
+            record["error"] = str(error)
+        if settings.vector_store_trace_result:
+            record["result"] = getattr(result, "body", result)  # ES 8.x ObjectApiResponse
+        try:
+            _get_trace_logger().info(
+                "%s",
+                LazyJson({**record, "query": query}),
+            )
+        except Exception as e:
+            logging.warning(f"写入向量存储追踪日志失败: {e}")
+        if slow:
+            logging.warning("向量存储慢查询 %s %s: %.1fms %s", self.op, self.space_names, total_ms, record["phases_ms"])
@@ -1,5 +1,7 @@
 import re
 
+_ENGLISH_PATTERN = re.compile(r"[`a-zA-Z0-9\s.,':;/\"?<>!\(\)\-]")
+
 
 def get_float(v):
     """
@@ -27,7 +29,7 @@ def is_english(texts):
     if not texts:
         return False
 
-    pattern = re.compile(r"[`a-zA-Z0-9\s.,':;/\"?<>!\(\)\-]")
+    pattern = _ENGLISH_PATTERN
 
     if isinstance(texts, str):
         texts = list(texts)
@@ -4,7 +4,7 @@ import logging
 import os
 import asyncio
 from datetime import datetime
-from fastapi import FastAPI, HTTPException, Request, Query
+from fastapi import Depends, FastAPI, HTTPException, Request, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from app.logger import set_log_level, setup_logging
@@ -15,7 +15,7 @@ from app.infrastructure.database import close_db, health_check_db
 from app.infrastructure.storage import STORAGE_CONN
 from app.infrastructure.vector_store import VECTOR_STORE_CONN
 from app.infrastructure.redis import REDIS_CONN
-from app.utils.auth.jwt_middleware import jwt_middleware
+from app.utils.auth.jwt_middleware import jwt_dependency, jwt_middleware
 from app.domains.product_mgmt import product_router
 from app.domains.git_auth_mgmt import git_auth_router
 from app.domains.arch_mgmt import arch_mgmt_router
@@ -224,6 +224,14 @@ async def get_log_level():
         "current_level": current_level
     }
 
+@app.get("/redis/stats", dependencies=[Depends(jwt_dependency)])
+async def redis_stats():
+    """Redis连接池等待与客户端缓存统计（需认证）"""
+    return {
+        "pools": REDIS_CONN.get_pool_stats(),
+        "client_cache": REDIS_CONN.get_client_cache_stats(),
+    }
+
 # 全局异常处理
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
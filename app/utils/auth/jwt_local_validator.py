@@ -1,5 +1,8 @@
+import asyncio
 import json
-from typing import Optional, Dict, Any, List
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List, FrozenSet, Tuple
 from jose import JWTError, jwt
 from datetime import datetime, timedelta
 import logging
@@ -16,27 +19,56 @@ class JWTValidationError(Exception):
         self.details = details or {}
         super().__init__(message)
 
+
+_BLACKLISTED_RESULT = {
+    "success": False,
+    "message": "令牌已被注销",
+    "data": {
+        "valid": False, 
+        "reason": "token_blacklisted", 
+        "error_code": "TOKEN_BLACKLISTED"
+    }
+}
+
 class JWTLocalValidator:
-    """JWT本地验证器 - 供业务微服务进行本地JWT验证"""
+    """
+    JWT本地验证器 - 供业务微服务进行本地JWT验证
+
+    - 异步接口 averify_token：JWKS/配置/黑名单过期后仍先用旧值验证（stale-while-revalidate），
+      由后台任务刷新，仅首次加载时等待；
+    - HMAC 密钥在 JWKS 变化（密钥轮换）时解码一次，黑名单保存为集合；
+    - 验证通过的令牌按哈希缓存至其 exp，命中时仍检查黑名单；
+    - 同步接口 verify_token 保留，供脚本等非事件循环场景使用。
+    """
     
-    def __init__(self, cache_ttl: int = 3600, blacklist_cache_ttl: int = 300):
+    def __init__(self, cache_ttl: int = 3600, blacklist_cache_ttl: int = 300, token_cache_size: Optional[int] = None):
         """
         初始化JWT本地验证器
         
         Args:
             cache_ttl: 缓存时间（秒），默认1小时
             blacklist_cache_ttl: 黑名单缓存时间（秒），默认5分钟
+            token_cache_size: 已验证令牌缓存条数上限，默认取配置，0表示禁用
         """
         self.user_service_url = settings.auth_user_service_url.rstrip('/')
         self.cache_ttl = cache_ttl
         self.blacklist_cache_ttl = blacklist_cache_ttl
+        self.token_cache_size = settings.auth_token_cache_max_entries if token_cache_size is None else token_cache_size
         self._jwks_cache = None
         self._jwks_cache_time = None
         self._config_cache = None
         self._config_cache_time = None
-        self._blacklist_cache = None
+        self._blacklist_cache: FrozenSet[str] = frozenset()
         self._blacklist_cache_time = None
+        self._secret_key = None
+        self._token_cache: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self.token_cache_hits = 0
+        self.token_cache_misses = 0
         self._client = None
+        self._async_client = None
+        self._refresh_lock: Optional[asyncio.Lock] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._refresh_retry_at = 0.0
     
     def _get_client(self) -> httpx.Client:
         """获取HTTP客户端"""
@@ -44,30 +76,50 @@ class JWTLocalValidator:
             self._client = httpx.Client(timeout=10)
         return self._client
     
-    def _is_cache_valid(self, cache_time: Optional[datetime]) -> bool:
+    def _get_async_client(self) -> httpx.AsyncClient:
+        """获取异步HTTP客户端"""
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(timeout=10)
+        return self._async_client
+    
+    @staticmethod
+    def _is_cache_valid(cache_time: Optional[float], ttl: int) -> bool:
         """检查缓存是否有效"""
         if cache_time is None:
             return False
-        return (datetime.utcnow() - cache_time).total_seconds() < self.cache_ttl
+        return time.monotonic() - cache_time < ttl
+    
+    def _parse_jwks_response(self, response: httpx.Response, url: str) -> Dict[str, Any]:
+        if response.status_code == 200:
+            return response.json()
+        raise JWTValidationError(
+            f"获取JWKS失败: {response.status_code}",
+            "JWKS_FETCH_ERROR",
+            {"status_code": response.status_code, "url": url}
+        )
+    
+    def _parse_config_response(self, response: httpx.Response, url: str) -> Dict[str, Any]:
+        if response.status_code == 200:
+            result = response.json()
+            return result.get("data", result)
+        raise JWTValidationError(
+            f"获取JWT配置失败: {response.status_code}",
+            "CONFIG_FETCH_ERROR",
+            {"status_code": response.status_code, "url": url}
+        )
+    
+    def _parse_blacklist_response(self, response: httpx.Response) -> Optional[List[str]]:
+        if response.status_code == 200:
+            result = response.json()
+            return result.get("data", {}).get("blacklisted_tokens", [])
+        logging.warning(f"获取黑名单失败: {response.status_code}")
+        return None
     
     def _fetch_jwks(self) -> Dict[str, Any]:
         """获取JWKS"""
+        url = f"{self.user_service_url}{settings.auth_jwks_endpoint}"
         try:
-            client = self._get_client()
-            # 从配置中获取JWKS端点
-            jwks_endpoint = settings.auth_jwks_endpoint
-            url = f"{self.user_service_url}{jwks_endpoint}"
-            
-            response = client.get(url)
-            if response.status_code == 200:
-                return response.json()
-            else:
-                raise JWTValidationError(
-                    f"获取JWKS失败: {response.status_code}",
-                    "JWKS_FETCH_ERROR",
-                    {"status_code": response.status_code, "url": url}
-                )
-                
+            return self._parse_jwks_response(self._get_client().get(url), url)
         except JWTValidationError:
             raise
         except Exception as e:
@@ -76,89 +128,163 @@ class JWTLocalValidator:
     
     def _fetch_jwt_config(self) -> Dict[str, Any]:
         """获取JWT配置"""
+        url = f"{self.user_service_url}{settings.auth_jwt_config_endpoint}"
         try:
-            client = self._get_client()
-            # 从配置中获取JWT配置端点
-            jwt_config_endpoint = settings.auth_jwt_config_endpoint
-            url = f"{self.user_service_url}{jwt_config_endpoint}"
-            
-            response = client.get(url)
-            if response.status_code == 200:
-                result = response.json()
-                return result.get("data", result)
-            else:
-                raise JWTValidationError(
-                    f"获取JWT配置失败: {response.status_code}",
-                    "CONFIG_FETCH_ERROR",
-                    {"status_code": response.status_code, "url": url}
-                )
-                
+            return self._parse_config_response(self._get_client().get(url), url)
         except JWTValidationError:
             raise
         except Exception as e:
             logging.error(f"获取JWT配置异常: {e}")
             raise JWTValidationError(f"获取JWT配置异常: {e}", "CONFIG_FETCH_EXCEPTION")
     
-    def _fetch_blacklist(self) -> List[str]:
-        """获取黑名单令牌列表"""
+    def _fetch_blacklist(self) -> Optional[List[str]]:
+        """获取黑名单令牌列表，失败返回 None（保留旧黑名单）"""
+        url = f"{self.user_service_url}{settings.auth_blacklist_endpoint}"
         try:
-            client = self._get_client()
-            # 从配置中获取黑名单端点
-            blacklist_endpoint = settings.auth_blacklist_endpoint
-            url = f"{self.user_service_url}{blacklist_endpoint}"
-            
-            response = client.get(url)
-            if response.status_code == 200:
-                result = response.json()
-                return result.get("data", {}).get("blacklisted_tokens", [])
-            else:
-                logging.warning(f"获取黑名单失败: {response.status_code}")
-                return []
-                
+            return self._parse_blacklist_response(self._get_client().get(url))
         except Exception as e:
             logging.error(f"获取黑名单异常: {e}")
-            return []
+            return None
     
-    def _is_token_blacklisted(self, token: str) -> bool:
-        """检查令牌是否在黑名单中"""
+    async def _afetch_jwks(self) -> Dict[str, Any]:
+        """异步获取JWKS"""
+        url = f"{self.user_service_url}{settings.auth_jwks_endpoint}"
         try:
-            # 获取黑名单（带缓存）
-            blacklist = self._get_blacklist_cache()
-            
-            # 检查令牌是否在黑名单中
-            # 注意：这里使用令牌的哈希值进行比较，避免存储完整令牌
-            token_hash = hashlib.sha256(token.encode()).hexdigest()
-            
-            return token_hash in blacklist
-            
+            return self._parse_jwks_response(await self._get_async_client().get(url), url)
+        except JWTValidationError:
+            raise
         except Exception as e:
-            logging.error(f"检查黑名单异常: {e}")
-            return False
+            logging.error(f"获取JWKS异常: {e}")
+            raise JWTValidationError(f"获取JWKS异常: {e}", "JWKS_FETCH_EXCEPTION")
+    
+    async def _afetch_jwt_config(self) -> Dict[str, Any]:
+        """异步获取JWT配置"""
+        url = f"{self.user_service_url}{settings.auth_jwt_config_endpoint}"
+        try:
+            return self._parse_config_response(await self._get_async_client().get(url), url)
+        except JWTValidationError:
+            raise
+        except Exception as e:
+            logging.error(f"获取JWT配置异常: {e}")
+            raise JWTValidationError(f"获取JWT配置异常: {e}", "CONFIG_FETCH_EXCEPTION")
+    
+    async def _afetch_blacklist(self) -> Optional[List[str]]:
+        """异步获取黑名单令牌列表，失败返回 None（保留旧黑名单）"""
+        url = f"{self.user_service_url}{settings.auth_blacklist_endpoint}"
+        try:
+            return self._parse_blacklist_response(await self._get_async_client().get(url))
+        except Exception as e:
+            logging.error(f"获取黑名单异常: {e}")
+            return None
+    
+    @staticmethod
+    def _decode_secret_key(jwks: Dict[str, Any]) -> Optional[str]:
+        """从JWKS中解码对称密钥"""
+        for key in (jwks or {}).get("keys", []):
+            if key.get("kty") == "oct":  # 对称密钥
+                k = key.get("k", "")
+                # 补齐base64填充
+                k += "=" * (4 - len(k) % 4)
+                return base64.urlsafe_b64decode(k).decode('utf-8')
+        return None
+    
+    def _set_jwks(self, jwks: Dict[str, Any]) -> None:
+        """更新JWKS；密钥轮换时重新解码密钥并清空已验证令牌缓存"""
+        secret_key = self._decode_secret_key(jwks)
+        if secret_key != self._secret_key:
+            self._token_cache.clear()
+        self._jwks_cache = jwks
+        self._secret_key = secret_key
+        self._jwks_cache_time = time.monotonic()
+    
+    def _set_jwt_config(self, config: Dict[str, Any]) -> None:
+        """更新JWT配置；算法/签发者/受众变化时清空已验证令牌缓存"""
+        if config != self._config_cache:
+            self._token_cache.clear()
+        self._config_cache = config
+        self._config_cache_time = time.monotonic()
     
-    def _get_blacklist_cache(self) -> List[str]:
+    def _set_blacklist(self, blacklist: Optional[List[str]]) -> None:
+        """更新黑名单；拉取失败（None）时保留旧黑名单"""
+        if blacklist is not None:
+            self._blacklist_cache = frozenset(blacklist)
+        self._blacklist_cache_time = time.monotonic()
+    
+    def _is_token_blacklisted(self, token_hash: str) -> bool:
+        """检查令牌是否在黑名单中（黑名单中为令牌的sha256哈希，避免存储完整令牌）"""
+        return token_hash in self._blacklist_cache
+    
+    def _get_blacklist_cache(self) -> FrozenSet[str]:
         """获取黑名单缓存"""
-        if not self._is_cache_valid(self._blacklist_cache_time):
-            self._blacklist_cache = self._fetch_blacklist()
-            self._blacklist_cache_time = datetime.utcnow()
-        
-        return self._blacklist_cache or []
+        if not self._is_cache_valid(self._blacklist_cache_time, self.blacklist_cache_ttl):
+            self._set_blacklist(self._fetch_blacklist())
+        return self._blacklist_cache
     
     def get_jwks(self) -> Dict[str, Any]:
         """获取JWKS（带缓存）"""
-        if not self._is_cache_valid(self._jwks_cache_time):
-            self._jwks_cache = self._fetch_jwks()
-            self._jwks_cache_time = datetime.utcnow()
-        
+        if not self._is_cache_valid(self._jwks_cache_time, self.cache_ttl):
+            self._set_jwks(self._fetch_jwks())
         return self._jwks_cache
     
     def get_jwt_config(self) -> Dict[str, Any]:
         """获取JWT配置（带缓存）"""
-        if not self._is_cache_valid(self._config_cache_time):
-            self._config_cache = self._fetch_jwt_config()
-            self._config_cache_time = datetime.utcnow()
-        
+        if not self._is_cache_valid(self._config_cache_time, self.cache_ttl):
+            self._set_jwt_config(self._fetch_jwt_config())
         return self._config_cache
     
+    def _stale_sources(self) -> List[str]:
+        stale = []
+        if not self._is_cache_valid(self._config_cache_time, self.cache_ttl):
+            stale.append("config")
+        if not self._is_cache_valid(self._jwks_cache_time, self.cache_ttl):
+            stale.append("jwks")
+        if not self._is_cache_valid(self._blacklist_cache_time, self.blacklist_cache_ttl):
+            stale.append("blacklist")
+        return stale
+    
+    async def _refresh(self, sources: List[str]) -> None:
+        """并发刷新指定的数据源；JWKS/配置失败时抛出异常，已有旧值不受影响"""
+        fetchers = {"config": self._afetch_jwt_config, "jwks": self._afetch_jwks, "blacklist": self._afetch_blacklist}
+        results = await asyncio.gather(*(fetchers[name]() for name in sources), return_exceptions=True)
+        error = None
+        for name, result in zip(sources, results):
+            if isinstance(result, BaseException):
+                error = error or result
+            elif name == "config":
+                self._set_jwt_config(result)
+            elif name == "jwks":
+                self._set_jwks(result)
+            else:
+                self._set_blacklist(result)
+        if error is not None:
+            raise error
+    
+    async def _background_refresh(self, sources: List[str]) -> None:
+        try:
+            async with self._refresh_lock:
+                await self._refresh([name for name in sources if name in self._stale_sources()])
+        except Exception as e:
+            self._refresh_retry_at = time.monotonic() + settings.auth_refresh_retry_interval
+            logging.warning(f"后台刷新JWT验证数据失败，继续使用旧数据: {e}")
+    
+    async def _ensure_fresh(self) -> None:
+        """首次加载时等待拉取；之后过期数据继续使用，由后台任务刷新"""
+        stale = self._stale_sources()
+        if not stale:
+            return
+        if self._refresh_lock is None:
+            self._refresh_lock = asyncio.Lock()
+        
+        if self._config_cache is None or self._jwks_cache is None:
+            async with self._refresh_lock:
+                stale = self._stale_sources()
+                if self._config_cache is None or self._jwks_cache is None:
+                    await self._refresh(stale)
+            return
+        
+        if (self._refresh_task is None or self._refresh_task.done()) and time.monotonic() >= self._refresh_retry_at:
+            self._refresh_task = asyncio.create_task(self._background_refresh(stale))
+    
     def _validate_payload_fields(self, payload: Dict[str, Any]) -> None:
         """验证JWT payload中的必需字段"""
         # 验证必需字段
@@ -187,112 +313,103 @@ class JWTLocalValidator:
                 {"user_id": payload.get("sub")}
             )
     
-    def verify_token(self, token: str) -> Dict[str, Any]:
-        """
-        本地验证JWT令牌
+    def _cache_token(self, token_hash: str, data: Dict[str, Any]) -> None:
+        exp = data.get("exp")
+        if self.token_cache_size <= 0 or not isinstance(exp, (int, float)):
+            return
+        self._token_cache[token_hash] = (exp, data)
+        if len(self._token_cache) > self.token_cache_size:
+            self._token_cache.popitem(last=False)
+    
+    def _verify_local(self, token: str) -> Dict[str, Any]:
+        """使用当前缓存的配置、密钥与黑名单验证令牌（不做任何网络请求）"""
+        token_hash = hashlib.sha256(token.encode()).hexdigest()
         
-        Args:
-            token: JWT令牌
-            
-        Returns:
-            Dict: 验证结果
-        """
-        try:
-            # 获取JWT配置
-            config = self.get_jwt_config()
-            algorithm = config.get("algorithm", "HS256")
-            issuer = config.get("issuer")
-            audience = config.get("audience")
-            
-            # 获取JWKS
-            jwks = self.get_jwks()
-            
-            # 从JWKS中获取密钥
-            secret_key = None
-            for key in jwks.get("keys", []):
-                if key.get("kty") == "oct":  # 对称密钥
-                    # 解码base64密钥
-                    k = key.get("k", "")
-                    # 补齐base64填充
-                    k += "=" * (4 - len(k) % 4)
-                    secret_key = base64.urlsafe_b64decode(k).decode('utf-8')
-                    break
-            
-            if not secret_key:
-                return {
-                    "success": False,
-                    "message": "无法获取验证密钥",
-                    "data": {"valid": False, "reason": "no_key", "error_code": "NO_SECRET_KEY"}
-                }
-            
-            # 验证JWT令牌
-            payload = jwt.decode(
-                token,
-                secret_key,
-                algorithms=[algorithm],
-                issuer=issuer,
-                audience=audience,
-                options={
-                    "verify_signature": True,
-                    "verify_exp": True,
-                    "verify_iat": True,
-                    "verify_iss": True,
-                    "verify_aud": True
-                }
-            )
-            
-            # 验证payload字段
-            self._validate_payload_fields(payload)
-            
-            # 检查令牌类型（可选验证）
-            token_type = payload.get("type")
-            if token_type and token_type != "access":
-                return {
-                    "success": False,
-                    "message": "令牌类型错误",
-                    "data": {
-                        "valid": False, 
-                        "reason": "wrong_token_type", 
-                        "error_code": "INVALID_TOKEN_TYPE",
-                        "expected_type": "access",
-                        "actual_type": token_type
-                    }
-                }
-            
-            # 检查令牌是否在黑名单中
-            if self._is_token_blacklisted(token):
-                return {
-                    "success": False,
-                    "message": "令牌已被注销",
-                    "data": {
-                        "valid": False, 
-                        "reason": "token_blacklisted", 
-                        "error_code": "TOKEN_BLACKLISTED"
-                    }
-                }
-            
-            # 验证成功
+        cached = self._token_cache.get(token_hash)
+        if cached is not None:
+            if cached[0] > time.time():
+                self._token_cache.move_to_end(token_hash)
+                self.token_cache_hits += 1
+                if self._is_token_blacklisted(token_hash):
+                    return _BLACKLISTED_RESULT
+                return {"success": True, "message": "令牌验证成功", "data": dict(cached[1])}
+            del self._token_cache[token_hash]
+        self.token_cache_misses += 1
+        
+        config = self._config_cache or {}
+        algorithm = config.get("algorithm", "HS256")
+        issuer = config.get("issuer")
+        audience = config.get("audience")
+        
+        if not self._secret_key:
             return {
-                "success": True,
-                "message": "令牌验证成功",
+                "success": False,
+                "message": "无法获取验证密钥",
+                "data": {"valid": False, "reason": "no_key", "error_code": "NO_SECRET_KEY"}
+            }
+        
+        # 验证JWT令牌
+        payload = jwt.decode(
+            token,
+            self._secret_key,
+            algorithms=[algorithm],
+            issuer=issuer,
+            audience=audience,
+            options={
+                "verify_signature": True,
+                "verify_exp": True,
+                "verify_iat": True,
+                "verify_iss": True,
+                "verify_aud": True
+            }
+        )
+        
+        # 验证payload字段
+        self._validate_payload_fields(payload)
+        
+        # 检查令牌类型（可选验证）
+        token_type = payload.get("type")
+        if token_type and token_type != "access":
+            return {
+                "success": False,
+                "message": "令牌类型错误",
                 "data": {
-                    "valid": True,
-                    "user_id": payload.get("sub"),
-                    "username": payload.get("username"),
-                    "roles": payload.get("roles", []),
-                    "email": payload.get("email"),
-                    "phone": payload.get("phone"),
-                    "full_name": payload.get("full_name"),
-                    "is_superuser": payload.get("is_superuser", False),
-                    "is_active": payload.get("is_active", True),
-                    "exp": payload.get("exp"),
-                    "iat": payload.get("iat"),
-                    "iss": payload.get("iss"),
-                    "aud": payload.get("aud")
+                    "valid": False, 
+                    "reason": "wrong_token_type", 
+                    "error_code": "INVALID_TOKEN_TYPE",
+                    "expected_type": "access",
+                    "actual_type": token_type
                 }
             }
-            
-        except JWTValidationError as e:
+        
+        # 检查令牌是否在黑名单中
+        if self._is_token_blacklisted(token_hash):
+            return _BLACKLISTED_RESULT
+        
+        data = {
+            "valid": True,
+            "user_id": payload.get("sub"),
+            "username": payload.get("username"),
+            "roles": payload.get("roles", []),
+            "email": payload.get("email"),
+            "phone": payload.get("phone"),
+            "full_name": payload.get("full_name"),
+            "is_superuser": payload.get("is_superuser", False),
+            "is_active": payload.get("is_active", True),
+            "exp": payload.get("exp"),
+            "iat": payload.get("iat"),
+            "iss": payload.get("iss"),
+            "aud": payload.get("aud")
+        }
+        self._cache_token(token_hash, data)
+        
+        # 验证成功
+        return {"success": True, "message": "令牌验证成功", "data": dict(data)}
+    
+    @staticmethod
+    def _error_result(e: Exception) -> Dict[str, Any]:
+        """将验证过程中的异常转换为验证结果"""
+        if isinstance(e, JWTValidationError):
             logging.warning(f"JWT验证失败: {e.message} (错误码: {e.error_code})")
             return {
                 "success": False,
@@ -304,20 +421,65 @@ class JWTLocalValidator:
                     "details": e.details
                 }
             }
-        except JWTError as e:
+        if isinstance(e, JWTError):
             logging.warning(f"JWT解析失败: {e}")
             return {
                 "success": False,
                 "message": f"JWT验证失败: {str(e)}",
                 "data": {"valid": False, "reason": "jwt_error", "error_code": "JWT_DECODE_ERROR"}
             }
+        logging.error(f"令牌验证异常: {e}")
+        return {
+            "success": False,
+            "message": f"令牌验证异常: {str(e)}",
+            "data": {"valid": False, "reason": "exception", "error_code": "VALIDATION_EXCEPTION"}
+        }
+    
+    def verify_token(self, token: str) -> Dict[str, Any]:
+        """
+        本地验证JWT令牌（同步，缓存过期时阻塞拉取；事件循环中请使用 averify_token）
+        
+        Args:
+            token: JWT令牌
+            
+        Returns:
+            Dict: 验证结果
+        """
+        try:
+            self.get_jwt_config()
+            self.get_jwks()
+            self._get_blacklist_cache()
+            return self._verify_local(token)
         except Exception as e:
-            logging.error(f"令牌验证异常: {e}")
-            return {
-                "success": False,
-                "message": f"令牌验证异常: {str(e)}",
-                "data": {"valid": False, "reason": "exception", "error_code": "VALIDATION_EXCEPTION"}
-            }
+            return self._error_result(e)
+    
+    async def averify_token(self, token: str) -> Dict[str, Any]:
+        """
+        本地验证JWT令牌（异步，过期数据由后台刷新，不阻塞请求）
+        
+        Args:
+            token: JWT令牌
+            
+        Returns:
+            Dict: 验证结果
+        """
+        try:
+            await self._ensure_fresh()
+            return self._verify_local(token)
+        except Exception as e:
+            return self._error_result(e)
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """已验证令牌缓存统计"""
+        lookups = self.token_cache_hits + self.token_cache_misses
+        return {
+            "entries": len(self._token_cache),
+            "max_entries": self.token_cache_size,
+            "hits": self.token_cache_hits,
+            "misses": self.token_cache_misses,
+            "hit_rate": self.token_cache_hits / lookups if lookups else 0.0,
+            "blacklist_size": len(self._blacklist_cache),
+        }
     
     def extract_user_info(self, token: str) -> Dict[str, Any]:
         """
@@ -421,12 +583,13 @@ class JWTLocalValidator:
         self._jwks_cache_time = None
         self._config_cache = None
         self._config_cache_time = None
-        self._blacklist_cache = None
+        self._blacklist_cache = frozenset()
         self._blacklist_cache_time = None
+        self._secret_key = None
+        self._token_cache.clear()
     
     def refresh_blacklist_cache(self):
-        """刷新黑名单缓存"""
-        self._blacklist_cache = None
+        """刷新黑名单缓存（下次验证时重新拉取，期间沿用旧黑名单）"""
         self._blacklist_cache_time = None
     
     def close(self):
@@ -434,6 +597,16 @@ class JWTLocalValidator:
         if self._client:
             self._client.close()
             self._client = None
+    
+    async def aclose(self):
+        """关闭客户端连接（含异步客户端与后台刷新任务）"""
+        if self._refresh_task and not self._refresh_task.done():
+            self._refresh_task.cancel()
+        self._refresh_task = None
+        if self._async_client:
+            await self._async_client.aclose()
+            self._async_client = None
+        self.close()
 
 # 便捷函数
 def create_jwt_validator(cache_ttl: int = 3600) -> JWTLocalValidator:
@@ -49,7 +49,7 @@ class JWTAuthMiddleware:
         token = auth_header[7:]  # 去掉"Bearer "前缀
         
         # 验证令牌
-        result = self.validator.verify_token(token)
+        result = await self.validator.averify_token(token)
         
         if not result.get("success") or not result.get("data", {}).get("valid"):
             return self._handle_auth_failed(
@@ -108,7 +108,7 @@ class JWTAuthDependency:
         """
         self.validator = JWTLocalValidator(cache_ttl, blacklist_cache_ttl)
     
-    def __call__(self, request: Request):
+    async def __call__(self, request: Request):
         """依赖函数"""
         # 获取Authorization头
         auth_header = request.headers.get("Authorization")
@@ -131,7 +131,7 @@ class JWTAuthDependency:
         token = auth_header[7:]  # 去掉"Bearer "前缀
         
         # 验证令牌
-        result = self.validator.verify_token(token)
+        result = await self.validator.averify_token(token)
         
         if not result.get("success") or not result.get("data", {}).get("valid"):
             raise HTTPException(
@@ -143,9 +143,9 @@ class JWTAuthDependency:
         # 返回用户信息
         return result.get("data", {})
     
-    def close(self):
+    async def close(self):
         """关闭验证器"""
-        self.validator.close()
+        await self.validator.aclose()
 
 # 便捷函数
 def create_jwt_middleware(
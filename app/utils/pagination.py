@@ -0,0 +1,48 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+from sqlalchemy import tuple_
+from sqlalchemy.sql import Select
+
+
+def encode_cursor(created_at: datetime, record_id: str) -> str:
+    """将排序键 (created_at, id) 编码为不透明游标"""
+    payload = json.dumps([created_at.isoformat(), record_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """解析游标，格式不合法时抛出 ValueError"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, record_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(created_at), str(record_id)
+    except Exception as e:
+        raise ValueError(f"无效的分页游标: {cursor}") from e
+
+
+def keyset_page(query: Select, model: Any, page_size: int, cursor: Optional[str] = None) -> Select:
+    """
+    按 (created_at DESC, id DESC) 做键集分页：游标之后的记录直接走索引定位，
+    与 OFFSET 不同，翻到多深代价都一样；多取一条用于判断是否还有下一页。
+
+    Args:
+        query: 已带过滤条件的查询
+        model: 含 created_at、id 列的模型
+        page_size: 每页数量
+        cursor: 上一页返回的 next_cursor，为空表示第一页
+    """
+    if cursor:
+        created_at, record_id = decode_cursor(cursor)
+        query = query.where(tuple_(model.created_at, model.id) < tuple_(created_at, record_id))
+    return query.order_by(model.created_at.desc(), model.id.desc()).limit(page_size + 1)
+
+
+def split_page(rows: Sequence[Any], page_size: int) -> Tuple[List[Any], Optional[str]]:
+    """截取 keyset_page 多取的一条，返回本页记录与下一页游标（没有下一页时为 None）"""
+    items = list(rows[:page_size])
+    if len(rows) <= page_size or not items:
+        return items, None
+    last = items[-1]
+    return items, encode_cursor(last.created_at, last.id)
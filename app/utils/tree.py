@@ -0,0 +1,53 @@
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Type, TypeVar
+from pydantic import BaseModel
+
+
+TreeT = TypeVar("TreeT", bound=BaseModel)
+
+
+def _default_sort_key(record: Any):
+    return getattr(record, "created_at", None) or datetime.min
+
+
+def build_tree(
+    records: Iterable[Any],
+    tree_cls: Type[TreeT],
+    children_field: str = "children",
+    sort_key: Optional[Callable[[Any], Any]] = None,
+) -> List[TreeT]:
+    """
+    单次遍历将带 parent_id 的记录列表构建为树（O(n log n)，排序为主要开销）
+
+    每条记录只做一次 Pydantic 校验，随后按 parent_id 挂接到父节点的 children 上。
+    父节点不在 records 中的记录（如被权限过滤掉的子树）与原递归实现一致，不会出现在结果中。
+
+    Args:
+        records: ORM 记录列表，需有 id、parent_id 属性
+        tree_cls: 树节点模型，如 ArchElementTree、SceneTree
+        children_field: 子节点字段名
+        sort_key: 同级节点排序键，默认按 created_at 升序
+
+    Returns:
+        根节点列表
+    """
+    key = sort_key or _default_sort_key
+    fields = [name for name in tree_cls.model_fields if name != children_field]
+
+    nodes: Dict[str, TreeT] = {}
+    ordered = []
+    # 全局稳定排序一次，挂接时各父节点下的 children 自然有序
+    for record in sorted(records, key=key):
+        node = tree_cls.model_validate({name: getattr(record, name, None) for name in fields})
+        nodes[record.id] = node
+        ordered.append((record.parent_id, node))
+
+    roots: List[TreeT] = []
+    for parent_id, node in ordered:
+        if parent_id is None:
+            roots.append(node)
+            continue
+        parent = nodes.get(parent_id)
+        if parent is not None:
+            getattr(parent, children_field).append(node)
+    return roots
@@ -0,0 +1,88 @@
+"""
+bulk 序列化基准测试（不需要 ES，只比较序列化）
+
+文档含 datetime / date / Decimal / UUID 字段与 numpy 向量，对比：
+- client：逐条 deepcopy 后用 json.dumps + 客户端序列化器同样的类型转换（旧实现的等价开销）；
+- bulk：BulkIndexer 使用的 _dumps（不深拷贝，直接序列化）。
+先校验两者对每条文档的解码结果一致，再计时。
+
+用法:
+    python benchmarks/bench_bulk_serialization.py --docs 5000 --dim 1024
+"""
+import argparse
+import copy
+import json
+import os
+import sys
+import time
+import uuid
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from app.infrastructure.vector_store.bulk import _dumps
+
+
+def _client_default(o):
+    # ES 客户端 JSONSerializer.default 的类型转换
+    if isinstance(o, (date, datetime)):
+        return o.isoformat()
+    if isinstance(o, Decimal):
+        return float(o)
+    if isinstance(o, uuid.UUID):
+        return str(o)
+    if isinstance(o, np.ndarray):
+        return o.tolist()
+    if isinstance(o, np.generic):
+        return o.item()
+    raise TypeError(f"Unable to serialize {o!r}")
+
+
+def _make_docs(count: int, dim: int) -> list:
+    now = datetime.now(timezone.utc)
+    return [
+        {
+            "id": str(i),
+            "doc_id": uuid.uuid4(),
+            "create_time": now,
+            "create_date": now.date(),
+            "score": Decimal("0.75"),
+            "content_with_weight": "批量写入序列化基准文本。" * 20,
+            "q_vec": np.random.rand(dim).astype(np.float32),
+            "rank": np.int64(i),
+        }
+        for i in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=5000)
+    parser.add_argument("--dim", type=int, default=1024)
+    args = parser.parse_args()
+
+    docs = _make_docs(args.docs, args.dim)
+    for doc in docs[:50]:
+        expected = json.loads(json.dumps(doc, default=_client_default))
+        assert json.loads(_dumps(doc)) == expected, "bulk 序列化结果与客户端序列化器不一致"
+    print("check: datetime/date/Decimal/UUID/numpy 字段序列化与客户端一致")
+
+    start = time.perf_counter()
+    for doc in docs:
+        json.dumps(copy.deepcopy(doc), default=_client_default).encode("utf-8")
+    client = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for doc in docs:
+        _dumps(doc)
+    bulk = time.perf_counter() - start
+
+    print(f"docs={args.docs} dim={args.dim}")
+    print(f"client (deepcopy + dumps): {client * 1000:.1f} ms")
+    print(f"bulk   (_dumps)          : {bulk * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
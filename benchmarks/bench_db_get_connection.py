@@ -0,0 +1,86 @@
+"""
+get_db() 并发获取会话基准测试（SQLite）
+
+对比旧实现（每次 get_connection 都加全局锁 + 内联健康检查）与新实现（无锁快路径 + 后台健康检查）
+在 N 个并发调用方下的 p50/p99 延迟。两种实现使用相同的健康检查间隔，默认分别报告间隔 1 秒与 30 秒两种配置。
+间隔最小取 1 秒：间隔为 0 时新实现的后台检查任务会空转（sleep(0) + 健康检查），反而拖慢被测调用。
+
+用法:
+    python benchmarks/bench_db_get_connection.py --callers 200 --rounds 20
+    python benchmarks/bench_db_get_connection.py --health-interval 30
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_TYPE", "sqlite")
+
+from sqlalchemy import text
+from app.infrastructure.database.factory import DatabaseFactory
+
+
+# 间隔为 0 时新实现的后台检查循环会空转，占满事件循环
+MIN_HEALTH_INTERVAL = 1
+
+
+class LegacyDatabaseFactory(DatabaseFactory):
+    """旧实现：每次获取连接都经过全局锁，并在锁内执行健康检查"""
+
+    async def get_connection(self, db_type: str = None):
+        async with self._connection_lock:
+            if not self._connection:
+                await self._swap_connection(await self._create_connection())
+            if time.time() - self._last_health_check > self._health_check_interval:
+                if not await self._health_check():
+                    await self._swap_connection(await self._create_connection())
+                self._last_health_check = time.time()
+            return self._connection
+
+
+async def _one_request(factory: DatabaseFactory, latencies: list):
+    start = time.perf_counter()
+    conn = await factory.get_connection()
+    async with conn.get_session() as session:
+        await session.execute(text("SELECT 1"))
+    latencies.append(time.perf_counter() - start)
+
+
+async def _run(factory: DatabaseFactory, callers: int, rounds: int, health_interval: int) -> list:
+    factory._health_check_interval = health_interval
+    latencies: list = []
+    # 预热，排除首次建连开销
+    await _one_request(factory, [])
+    for _ in range(rounds):
+        await asyncio.gather(*(_one_request(factory, latencies) for _ in range(callers)))
+    await factory.close()
+    return latencies
+
+
+def _report(name: str, health_interval: int, latencies: list):
+    latencies = sorted(latencies)
+    p50 = statistics.median(latencies) * 1000
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000
+    print(f"{name:<8} interval={health_interval:<4} requests={len(latencies):<7} p50={p50:8.3f}ms  p99={p99:8.3f}ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="get_db 并发基准测试")
+    parser.add_argument("--callers", type=int, default=200, help="每轮并发调用方数量")
+    parser.add_argument("--rounds", type=int, default=20, help="轮数")
+    parser.add_argument("--health-interval", type=int, nargs="+", default=[MIN_HEALTH_INTERVAL, 30],
+                        help=f"健康检查间隔（秒），可传多个，小于 {MIN_HEALTH_INTERVAL} 按 {MIN_HEALTH_INTERVAL} 处理")
+    args = parser.parse_args()
+
+    for interval in dict.fromkeys(max(MIN_HEALTH_INTERVAL, i) for i in args.health_interval):
+        before = await _run(LegacyDatabaseFactory(), args.callers, args.rounds, interval)
+        after = await _run(DatabaseFactory(), args.callers, args.rounds, interval)
+        _report("before", interval, before)
+        _report("after", interval, after)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
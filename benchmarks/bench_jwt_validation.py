@@ -0,0 +1,112 @@
+"""
+JWT本地验证吞吐基准测试（单进程单线程，即每核每秒验证次数）
+
+不发网络请求：JWKS/配置/黑名单直接注入验证器缓存，对比：
+- legacy：旧实现每次验证都解码 HMAC 密钥、jwt.decode，并在黑名单列表中线性查找；
+- cold：新实现禁用令牌缓存（密钥按轮换解码一次、黑名单为集合，仍每次 jwt.decode）；
+- cached：新实现启用令牌缓存，同一批令牌重复验证直至过期。
+
+用法:
+    python benchmarks/bench_jwt_validation.py --tokens 1000 --blacklist 10000 --seconds 3
+"""
+import argparse
+import asyncio
+import base64
+import hashlib
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jose import jwt
+from app.utils.auth.jwt_local_validator import JWTLocalValidator
+
+SECRET = "bench-secret-key-0123456789abcdef"
+CONFIG = {"algorithm": "HS256", "issuer": "user-service", "audience": "knowledge-service"}
+JWKS = {"keys": [{"kty": "oct", "k": base64.urlsafe_b64encode(SECRET.encode()).decode().rstrip("=")}]}
+
+
+def _make_tokens(count: int):
+    now = int(time.time())
+    return [
+        jwt.encode(
+            {
+                "sub": f"user-{i}",
+                "username": f"user{i}",
+                "roles": ["user"],
+                "type": "access",
+                "iss": CONFIG["issuer"],
+                "aud": CONFIG["audience"],
+                "iat": now,
+                "exp": now + 3600,
+            },
+            SECRET,
+            algorithm=CONFIG["algorithm"],
+        )
+        for i in range(count)
+    ]
+
+
+def _legacy_verify(token: str, blacklist: list) -> bool:
+    """旧实现的 CPU 路径：每次解码密钥 + jwt.decode + 列表查找"""
+    k = JWKS["keys"][0]["k"]
+    k += "=" * (4 - len(k) % 4)
+    secret_key = base64.urlsafe_b64decode(k).decode("utf-8")
+    payload = jwt.decode(token, secret_key, algorithms=[CONFIG["algorithm"]], issuer=CONFIG["issuer"], audience=CONFIG["audience"])
+    return payload.get("sub") is not None and hashlib.sha256(token.encode()).hexdigest() not in blacklist
+
+
+def _make_validator(blacklist: list, token_cache_size: int) -> JWTLocalValidator:
+    validator = JWTLocalValidator(token_cache_size=token_cache_size)
+    validator._set_jwt_config(CONFIG)
+    validator._set_jwks(JWKS)
+    validator._set_blacklist(blacklist)
+    return validator
+
+
+def _rate(fn, tokens, seconds: float) -> float:
+    count = 0
+    start = time.process_time()
+    while time.process_time() - start < seconds:
+        for token in tokens:
+            fn(token)
+        count += len(tokens)
+    return count / (time.process_time() - start)
+
+
+async def _async_rate(validator: JWTLocalValidator, tokens, seconds: float) -> float:
+    count = 0
+    start = time.process_time()
+    while time.process_time() - start < seconds:
+        for token in tokens:
+            result = await validator.averify_token(token)
+            assert result["success"], result
+        count += len(tokens)
+    return count / (time.process_time() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tokens", type=int, default=1000, help="不同令牌数")
+    parser.add_argument("--blacklist", type=int, default=10000, help="黑名单条数")
+    parser.add_argument("--seconds", type=float, default=3.0, help="每种方式的 CPU 测量时间")
+    args = parser.parse_args()
+
+    tokens = _make_tokens(args.tokens)
+    blacklist = [hashlib.sha256(f"revoked-{i}".encode()).hexdigest() for i in range(args.blacklist)]
+
+    legacy = _rate(lambda t: _legacy_verify(t, blacklist), tokens, args.seconds)
+    cold = asyncio.run(_async_rate(_make_validator(blacklist, 0), tokens, args.seconds))
+    cached_validator = _make_validator(blacklist, max(args.tokens, 1))
+    cached = asyncio.run(_async_rate(cached_validator, tokens, args.seconds))
+
+    print(f"tokens={args.tokens} blacklist={args.blacklist}")
+    print(f"legacy : {legacy:,.0f} validations/s/core")
+    print(f"cold   : {cold:,.0f} validations/s/core ({cold / legacy:.1f}x)")
+    print(f"cached : {cached:,.0f} validations/s/core ({cached / legacy:.1f}x)")
+    print(f"cache  : {cached_validator.get_cache_stats()}")
+
+
+if __name__ == "__main__":
+    main()
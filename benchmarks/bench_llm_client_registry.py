@@ -0,0 +1,129 @@
+"""
+模型实例复用基准测试（本地 OpenAI 兼容替身服务，需要 aiohttp 与 app/config/*_models.json）
+
+替身服务在本机监听 /v1/chat/completions，按 --server-delay-ms 模拟推理耗时。对比：
+- legacy：每个请求新建模型实例（各自新建 AsyncOpenAI 客户端与连接池，即旧的 create_model 行为）；
+- registry：BaseModelFactory.create_model 复用注册表中的实例，同主机共享 HTTP 连接池。
+本机明文 HTTP 下省掉的主要是客户端构建与 TCP 建连；真实服务为 HTTPS 时还会省掉每次的 TLS 握手。
+
+用法:
+    python benchmarks/bench_llm_client_registry.py --requests 500 --concurrency 20 --server-delay-ms 5
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aiohttp import web
+from openai import AsyncOpenAI
+from app.infrastructure.llms.base_factory import BaseModelFactory
+from app.infrastructure.llms.chat_models.base.base import CONNECTION_TIMEOUT, MAX_RETRY_ATTEMPTS
+from app.infrastructure.llms.chat_models.openai_llm import OpenAIModels
+from app.infrastructure.llms.http_pool import close_http_clients, get_http_pool_stats
+
+MODEL = "bench-model"
+
+
+class LegacyOpenAIModels(OpenAIModels):
+    """旧实现：每个实例自带 AsyncOpenAI 客户端与连接池"""
+
+    def __init__(self, api_key: str, model_name: str, base_url: str, language: str = "Chinese", **kwargs):
+        super(OpenAIModels, self).__init__(api_key, model_name, base_url, language, **kwargs)
+        self.client = AsyncOpenAI(api_key=api_key, base_url=base_url, timeout=CONNECTION_TIMEOUT, max_retries=MAX_RETRY_ATTEMPTS)
+
+
+class BenchFactory(BaseModelFactory):
+    """指向替身服务的工厂，配置直接在内存中给出"""
+
+    def __init__(self, base_url: str, model_class: type):
+        self.base_url = base_url
+        self.model_class = model_class
+        super().__init__("bench")
+
+    @property
+    def _models(self):
+        return {"local": self.model_class}
+
+    def load_config(self):
+        self._config = {
+            "default": {"provider": "local", "model": MODEL},
+            "models": {"local": {"is_valid": 1, "api_key": "bench", "base_url": self.base_url, "instances": {MODEL: {}}}},
+        }
+
+
+async def _start_server(delay: float) -> tuple:
+    async def completions(request: web.Request) -> web.Response:
+        await request.read()
+        if delay:
+            await asyncio.sleep(delay)
+        return web.json_response({
+            "id": "bench", "object": "chat.completion", "created": 0, "model": MODEL,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": "ok"}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 8, "completion_tokens": 1, "total_tokens": 9},
+        })
+
+    app = web.Application()
+    app.router.add_post("/v1/chat/completions", completions)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}/v1"
+
+
+async def _run(factory: BenchFactory, shared: bool, requests: int, concurrency: int) -> tuple:
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            model = factory.create_model("local", MODEL, shared=shared)
+            response, _ = await model.chat(system_prompt="", user_prompt="", user_question="ping")
+            if not response.success:
+                raise RuntimeError(response.content)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return latencies, requests / (time.perf_counter() - start)
+
+
+def _report(name: str, latencies: list, throughput: float) -> None:
+    latencies = sorted(latencies)
+    p50 = statistics.median(latencies) * 1000
+    p99 = latencies[max(int(len(latencies) * 0.99) - 1, 0)] * 1000
+    print(f"{name}: p50 {p50:.2f} ms, p99 {p99:.2f} ms, {throughput:,.0f} req/s")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--server-delay-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    runner, base_url = await _start_server(args.server_delay_ms / 1000)
+    print(f"requests={args.requests} concurrency={args.concurrency} server_delay_ms={args.server_delay_ms}")
+
+    legacy = BenchFactory(base_url, LegacyOpenAIModels)
+    await _run(legacy, False, args.concurrency, args.concurrency)  # 预热
+    _report("legacy  ", *await _run(legacy, False, args.requests, args.concurrency))
+
+    registry = BenchFactory(base_url, OpenAIModels)
+    await _run(registry, True, args.concurrency, args.concurrency)
+    _report("registry", *await _run(registry, True, args.requests, args.concurrency))
+    print(f"registry stats: {registry.get_registry_stats()}")
+    print(f"http pools: {get_http_pool_stats()}")
+
+    await close_http_clients()
+    await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
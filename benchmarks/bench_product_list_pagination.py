@@ -0,0 +1,111 @@
+"""
+产品列表分页基准测试（SQLite，需要 aiosqlite）
+
+向临时库写入 N 个产品（同一创建人），对比各翻页深度下单页查询延迟：
+- offset：旧实现，每页 COUNT(*) 子查询 + ORDER BY created_at OFFSET/LIMIT；
+- keyset：ProductMgmtService.get_product_list 传入上一页的 next_cursor，不计总数。
+
+用法:
+    python benchmarks/bench_product_list_pagination.py --products 1000000 --page-size 20
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("PRODUCT_LIST_COUNT_CACHE_TTL", "0")
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from app.infrastructure.database.models_base import Base
+from app.domains.product_mgmt.models.products import ProductRecord
+from app.domains.product_mgmt.services.product_mgmt import ProductMgmtService
+from app.utils.pagination import encode_cursor
+
+USER_ID = "bench-user"
+
+
+async def _legacy_page(db, page: int, page_size: int):
+    filtered = select(ProductRecord).where(ProductRecord.create_user_id == USER_ID)
+    total = (await db.execute(select(func.count()).select_from(filtered.subquery()))).scalar()
+    result = await db.execute(filtered.order_by(ProductRecord.created_at.desc()).offset((page - 1) * page_size).limit(page_size))
+    return result.scalars().all(), total
+
+
+async def _seed(engine, count: int) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        start = datetime(2020, 1, 1)
+        chunk = 50000
+        for offset in range(0, count, chunk):
+            rows = [
+                {
+                    "id": str(uuid.uuid4()),
+                    "name": f"product-{i}",
+                    "create_user_id": USER_ID,
+                    "owner_id": USER_ID,
+                    "created_at": start + timedelta(seconds=i),
+                    "updated_at": start + timedelta(seconds=i),
+                }
+                for i in range(offset, min(offset + chunk, count))
+            ]
+            await conn.execute(insert(ProductRecord.__table__), rows)
+
+
+async def _timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--products", type=int, default=1000000)
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "bench_products.db")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    print(f"写入 {args.products:,} 个产品 ...")
+    await _seed(engine, args.products)
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+
+    size = args.page_size
+    max_page = args.products // size
+    depths = sorted({p for p in (1, 10, 100, 1000, 10000, max_page // 2, max_page) if 1 <= p <= max_page})
+    print(f"page_size={size}")
+    print(f"{'page':>8} {'offset ms':>10} {'keyset ms':>10}")
+    async with session_maker() as db:
+        for page in depths:
+            # 游标取自上一页最后一条，等同于客户端顺序翻页拿到的 next_cursor
+            cursor = None
+            if page > 1:
+                prev = (await db.execute(
+                    select(ProductRecord.created_at, ProductRecord.id)
+                    .where(ProductRecord.create_user_id == USER_ID)
+                    .order_by(ProductRecord.created_at.desc(), ProductRecord.id.desc())
+                    .offset((page - 1) * size - 1).limit(1)
+                )).one()
+                cursor = encode_cursor(prev.created_at, prev.id)
+
+            offset_ms = await _timed(lambda: _legacy_page(db, page, size), args.repeat)
+            keyset_ms = await _timed(
+                lambda: ProductMgmtService.get_product_list(db, USER_ID, page_size=size, cursor=cursor, with_total=False),
+                args.repeat,
+            )
+            print(f"{page:>8} {offset_ms:>10.2f} {keyset_ms:>10.2f}")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
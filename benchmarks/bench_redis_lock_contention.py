@@ -0,0 +1,79 @@
+"""
+分布式锁争用基准测试（需要本地 Redis，连接参数取自 REDIS_HOST / REDIS_PORT 等配置）
+
+N 个协程争用同一把锁，每个各获取 M 次、持有 hold_ms，对比：
+- legacy：旧实现，SET NX 失败后每 100ms 自旋重试；
+- event：RedisDistributedLock，FIFO 排队 + Pub/Sub 释放通知。
+输出平均交接延迟（总耗时扣除持有时间后按获取次数平均）与每次获取的 Redis 命令数（含释放）。
+
+用法:
+    REDIS_HOST=localhost python benchmarks/bench_redis_lock_contention.py --workers 16 --rounds 20 --hold-ms 5
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.infrastructure.redis import REDIS_CONN, RedisSpaceEnum
+
+SPACE = RedisSpaceEnum.DEFAULT
+
+
+async def _legacy_worker(key: str, rounds: int, hold: float, counter: list) -> None:
+    client = REDIS_CONN._connet_pool.get_client(SPACE)
+    value = str(uuid.uuid4())
+    for _ in range(rounds):
+        while True:
+            counter[0] += 1
+            if await client.set(key, value, nx=True, ex=10):
+                break
+            await asyncio.sleep(0.1)
+        await asyncio.sleep(hold)
+        counter[0] += 1
+        await REDIS_CONN.delete_if_equal(key, value, SPACE)
+
+
+async def _event_worker(key: str, rounds: int, hold: float, counter: list) -> None:
+    for _ in range(rounds):
+        lock = REDIS_CONN.get_lock(key, timeout=10, blocking_timeout=60, space=SPACE)
+        async with lock:
+            await asyncio.sleep(hold)
+        counter[0] += lock.ops
+
+
+async def _run(worker, workers: int, rounds: int, hold: float):
+    key = f"bench:lock:{uuid.uuid4().hex}"
+    counter = [0]
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(key, rounds, hold, counter) for _ in range(workers)))
+    elapsed = time.perf_counter() - start
+    acquisitions = workers * rounds
+    handoff = (elapsed - acquisitions * hold) / acquisitions
+    return handoff, counter[0] / acquisitions
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--hold-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    if not await REDIS_CONN.is_alive(SPACE):
+        print("Redis 不可用，请检查 REDIS_HOST / REDIS_PORT 配置")
+        return
+
+    hold = args.hold_ms / 1000
+    print(f"workers={args.workers} rounds={args.rounds} hold_ms={args.hold_ms}")
+    for name, worker in (("legacy", _legacy_worker), ("event ", _event_worker)):
+        handoff, ops = await _run(worker, args.workers, args.rounds, hold)
+        print(f"{name}: handoff {handoff * 1000:.2f} ms, {ops:.1f} Redis ops / acquisition")
+    await REDIS_CONN.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,98 @@
+"""
+Redis Streams 消费吞吐基准测试（需要本地 Redis，连接参数取自 REDIS_HOST / REDIS_PORT 等配置）
+
+对同样数量的消息对比：
+- legacy：循环调用 RedisClient.queue_consumer 逐条读取、逐条处理、逐条 ack；
+- runtime：RedisStreamConsumer 批量读取、有界并发处理、批量 ack。
+处理函数以 asyncio.sleep 模拟 I/O 型业务耗时。
+
+用法:
+    REDIS_HOST=localhost python benchmarks/bench_redis_stream_consumer.py --messages 5000 --work-ms 2 --workers 32
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.infrastructure.redis import REDIS_CONN, RedisSpaceEnum
+
+SPACE = RedisSpaceEnum.DEFAULT
+
+
+async def _produce(queue: str, count: int) -> None:
+    async with REDIS_CONN.batch(SPACE) as batch:
+        for i in range(count):
+            batch.queue_product(queue, {"seq": i})
+
+
+async def _bench_legacy(count: int, work: float) -> float:
+    queue, group = f"bench:legacy:{uuid.uuid4().hex}", "bench"
+    await _produce(queue, count)
+    done = 0
+    start = time.perf_counter()
+    while done < count:
+        msg = await REDIS_CONN.queue_consumer(queue, group, "c1", space=SPACE)
+        if msg is None:
+            break
+        await asyncio.sleep(work)
+        await msg.ack()
+        done += 1
+    elapsed = time.perf_counter() - start
+    await REDIS_CONN.delete(queue, SPACE)
+    return done / elapsed
+
+
+async def _bench_runtime(count: int, work: float, workers: int, batch_size: int) -> float:
+    queue, group = f"bench:runtime:{uuid.uuid4().hex}", "bench"
+    await _produce(queue, count)
+    finished = asyncio.Event()
+    done = 0
+
+    async def handle(message, msg_id):
+        nonlocal done
+        await asyncio.sleep(work)
+        done += 1
+        if done >= count:
+            finished.set()
+
+    consumer = REDIS_CONN.stream_consumer(queue, group, "c1", handle, SPACE, max_workers=workers, batch_size=batch_size)
+    start = time.perf_counter()
+    await consumer.start()
+    await finished.wait()
+    elapsed = time.perf_counter() - start
+    await consumer.stop()
+    print(f"runtime stats: {consumer.get_stats()}")
+    await REDIS_CONN.delete(queue, SPACE)
+    return done / elapsed
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--work-ms", type=float, default=2.0, help="模拟的单条处理耗时（毫秒）")
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--batch-size", type=int, default=128)
+    parser.add_argument("--skip-legacy", action="store_true")
+    args = parser.parse_args()
+
+    work = args.work_ms / 1000
+    if not await REDIS_CONN.is_alive(SPACE):
+        print("Redis 不可用，请检查 REDIS_HOST / REDIS_PORT 配置")
+        return
+
+    print(f"messages={args.messages} work_ms={args.work_ms} workers={args.workers} batch_size={args.batch_size}")
+    legacy = None
+    if not args.skip_legacy:
+        legacy = await _bench_legacy(args.messages, work)
+        print(f"legacy : {legacy:,.0f} msg/s")
+    runtime = await _bench_runtime(args.messages, work, args.workers, args.batch_size)
+    print(f"runtime: {runtime:,.0f} msg/s" + (f" ({runtime / legacy:.1f}x)" if legacy else ""))
+    await REDIS_CONN.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
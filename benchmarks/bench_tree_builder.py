@@ -0,0 +1,81 @@
+"""
+元素树构建基准测试
+
+对比旧实现（每个节点扫描全量列表 + model_validate/model_dump/重新构造，O(n²)）
+与 app.utils.tree.build_tree（按 parent_id 分桶单次遍历）在 10k/50k 元素下的耗时。
+
+用法:
+    python benchmarks/bench_tree_builder.py --sizes 10000 50000
+    python benchmarks/bench_tree_builder.py --sizes 10000 50000 --skip-legacy
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.domains.arch_mgmt.schemes.architecture import ArchElementInfo, ArchElementTree
+from app.utils.tree import build_tree
+
+
+def _make_elements(n: int, fanout: int = 8) -> List[SimpleNamespace]:
+    """生成 n 个元素，父节点从已生成的元素中随机选取（约 fanout 个根）"""
+    base = datetime(2025, 1, 1)
+    version_id = str(uuid.uuid4())
+    elements: List[SimpleNamespace] = []
+    for i in range(n):
+        parent_id = None if i < fanout else random.choice(elements).id
+        elements.append(SimpleNamespace(
+            id=str(uuid.uuid4()), version_id=version_id, parent_id=parent_id,
+            element_type="component", name=f"element-{i}", create_user_id="u", owner_id="u",
+            code=f"E{i}", code_repo_url=None, code_repo_path=None, responsibility="职责说明" * 4,
+            definition=None, tech_stack="python", quality_attributes=None, constraints=None,
+            specifications=None, created_at=base + timedelta(seconds=i), updated_at=None,
+        ))
+    return elements
+
+
+def _legacy_to_tree(node, all_elements) -> ArchElementTree:
+    children = [e for e in all_elements if e.parent_id == node.id]
+    sorted_children = sorted(children, key=lambda x: x.created_at or datetime.min)
+    data = ArchElementInfo.model_validate(node).model_dump()
+    data["children"] = [_legacy_to_tree(c, all_elements) for c in sorted_children]
+    return ArchElementTree(**data)
+
+
+def _legacy_build(all_elements) -> List[ArchElementTree]:
+    roots = [e for e in all_elements if e.parent_id is None]
+    return [_legacy_to_tree(r, all_elements) for r in sorted(roots, key=lambda x: x.created_at or datetime.min)]
+
+
+def _timeit(fn, *args) -> float:
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="元素树构建基准测试")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 50000], help="元素数量")
+    parser.add_argument("--skip-legacy", action="store_true", help="跳过旧实现（50k 时旧实现耗时很长）")
+    args = parser.parse_args()
+
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 100000))
+    for n in args.sizes:
+        elements = _make_elements(n)
+        after = _timeit(lambda e: build_tree(e, ArchElementTree), elements)
+        line = f"n={n:<7} build_tree={after * 1000:10.1f}ms"
+        if not args.skip_legacy:
+            before = _timeit(_legacy_build, elements)
+            line += f"  legacy={before * 1000:10.1f}ms  speedup={before / after:6.1f}x"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
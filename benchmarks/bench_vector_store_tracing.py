@@ -0,0 +1,111 @@
+"""
+向量存储检索日志开销基准测试
+
+使用返回固定结果的假 ES 客户端（不发网络请求），在 INFO 日志级别下对比每次 search 的 CPU 时间：
+- legacy：旧实现在 logging.debug 的 f-string 中无条件 json.dumps 查询与结果（含向量）；
+- lazy：LazyJson + QueryTrace，追踪采样关闭时不做任何序列化。
+
+用法:
+    python benchmarks/bench_vector_store_tracing.py --hits 100 --dim 1024 --rounds 500
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.infrastructure.vector_store.es_conn import ESConnection
+from app.infrastructure.vector_store.base import SearchRequest, MatchTextExpr, MatchDenseExpr
+
+
+class _FakeES:
+    """只返回固定结果的假客户端"""
+
+    def __init__(self, result: dict):
+        self.result = result
+
+    async def ping(self):
+        return True
+
+    async def search(self, **kwargs):
+        return self.result
+
+
+def _make_result(hits: int, dim: int) -> dict:
+    return {
+        "took": 3,
+        "timed_out": False,
+        "hits": {
+            "total": {"value": hits, "relation": "eq"},
+            "max_score": 1.0,
+            "hits": [
+                {
+                    "_id": f"doc-{i}",
+                    "_score": 1.0 / (i + 1),
+                    "_source": {
+                        "content_with_weight": "向量检索基准测试文本。" * 40,
+                        "q_vec": [random.random() for _ in range(dim)],
+                    },
+                }
+                for i in range(hits)
+            ],
+        },
+    }
+
+
+def _make_request(dim: int) -> SearchRequest:
+    return SearchRequest(
+        condition={"kb_id": ["kb-1"]},
+        match_exprs=[
+            MatchTextExpr(["content_ltks"], "向量 检索 基准", 100),
+            MatchDenseExpr("q_vec", [random.random() for _ in range(dim)], "float", "cosine", 100),
+        ],
+        limit=100,
+    )
+
+
+async def _run(conn: ESConnection, request: SearchRequest, rounds: int, legacy: bool) -> float:
+    start = time.process_time()
+    for _ in range(rounds):
+        result = await conn.search(["bench"], request)
+        if legacy:
+            # 旧实现：f-string 在调用 logging.debug 之前就已完成序列化
+            logging.debug("search ['bench'] query: " + json.dumps({"knn": {"query_vector": list(request.match_exprs[1].embedding_data)}}))
+            logging.debug("search ['bench'] result: " + json.dumps(dict(result)))
+    return (time.process_time() - start) / rounds
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--hits", type=int, default=100)
+    parser.add_argument("--dim", type=int, default=1024)
+    parser.add_argument("--rounds", type=int, default=500)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.INFO)
+
+    conn = ESConnection("http://bench:9200")
+    conn.es = _FakeES(_make_result(args.hits, args.dim))
+    conn._last_health_check = time.time() + 10 ** 9  # 跳过健康检查
+    request = _make_request(args.dim)
+
+    async def bench():
+        await _run(conn, request, 10, legacy=False)  # 预热
+        legacy = await _run(conn, request, args.rounds, legacy=True)
+        lazy = await _run(conn, request, args.rounds, legacy=False)
+        return legacy, lazy
+
+    legacy, lazy = asyncio.run(bench())
+    print(f"hits={args.hits} dim={args.dim} rounds={args.rounds}")
+    print(f"legacy (eager json.dumps): {legacy * 1000:.3f} ms CPU / search")
+    print(f"lazy   (tracing off)     : {lazy * 1000:.3f} ms CPU / search")
+    print(f"speedup: {legacy / lazy:.1f}x")
+
+
+if __name__ == "__main__":
+    main()